@@ -6,7 +6,7 @@ from sqlalchemy.orm import aliased
 from app.utils.chat_utils import (
     execute_workflow, execute_document_chat, save_message, execute_multi_source_workflow)
 from app.api.validators.chat_validator import AskQuestion, InitiateCinversaction
-from app.config.db_config import DB
+from app.config.db_config import AsyncDB
 from app.config.logging_config import get_logger
 from app.api.db.data_sources import DataSources
 from app.api.db.chat_history import (Conversations, Messages)
@@ -19,7 +19,7 @@ import json
 logger = get_logger(__name__)
 
 
-async def ask_question(id: int, body: AskQuestion, db: DB):
+async def ask_question(id: int, body: AskQuestion, db: AsyncDB):
     try:
         all_dataset_ids = [body.dataset_id]
         if body.dataset_ids:
@@ -27,10 +27,10 @@ async def ask_question(id: int, body: AskQuestion, db: DB):
             # Remove duplicates
             all_dataset_ids = list(set(all_dataset_ids))
 
-        with db.session() as session:
-            data_sources = session.execute(
+        async with db.session() as session:
+            data_sources = (await session.execute(
                 select(DataSources).where(DataSources.id.in_(all_dataset_ids))
-            ).scalars().all()
+            )).scalars().all()
 
             if not data_sources and body.type != "task":
                 raise HTTPException(status_code=404, detail=create_response(
@@ -39,7 +39,7 @@ async def ask_question(id: int, body: AskQuestion, db: DB):
                     data={}
                 ))
 
-        save_message(
+        await save_message(
             conversation_id=body.conversaction_id,
             role="user",
             content={"question": body.question},
@@ -48,7 +48,7 @@ async def ask_question(id: int, body: AskQuestion, db: DB):
 
         # Multi-source analysis if more than one source
         if len(data_sources) > 1:
-            return execute_multi_source_workflow(
+            return await execute_multi_source_workflow(
                 question=body.question,
                 conversation_id=body.conversaction_id,
                 data_sources=data_sources,
@@ -59,7 +59,7 @@ async def ask_question(id: int, body: AskQuestion, db: DB):
         # Single source logic (existing)
         data_source = data_sources[0] if data_sources else None
         if body.type == "url" and data_source:
-            return execute_workflow(
+            return await execute_workflow(
                 question=body.question,
                 conversation_id=body.conversaction_id,
                 db_url=data_source.connection_url,
@@ -76,7 +76,7 @@ async def ask_question(id: int, body: AskQuestion, db: DB):
                 llm_model=body.llm_model
             )
         elif body.type == "spreadsheet":
-            return execute_workflow(
+            return await execute_workflow(
                 question=body.question,
                 conversation_id=body.conversaction_id,
                 table_list=[data_source.table_name],
@@ -84,8 +84,8 @@ async def ask_question(id: int, body: AskQuestion, db: DB):
                 llm_model=body.llm_model
             )
         else:
-            return execute_document_chat(
-                body.question, "sentence-transformers/all-MiniLM-L6-v2", data_source.table_name, body.conversaction_id, db, body.llm_model)
+            return await execute_document_chat(
+                body.question, data_source.table_name, body.conversaction_id, db, body.llm_model)
 
 
     except HTTPException as he:
@@ -111,11 +111,11 @@ async def ask_question(id: int, body: AskQuestion, db: DB):
         ))
 
 
-def initiate_convesactions(user_id: int, body: InitiateCinversaction, db: DB):
+async def initiate_convesactions(user_id: int, body: InitiateCinversaction, db: AsyncDB):
     try:
-        with db.session() as session:
-            data_source = session.execute(select(DataSources).where(
-                DataSources.id == body.data_source_id)).scalar_one_or_none()
+        async with db.session() as session:
+            data_source = (await session.execute(select(DataSources).where(
+                DataSources.id == body.data_source_id))).scalar_one_or_none()
 
             # Generate name
             current_time = datetime.now()
@@ -136,8 +136,8 @@ def initiate_convesactions(user_id: int, body: InitiateCinversaction, db: DB):
             )
 
             session.add(new_data_source)
-            session.commit()
-            session.refresh(new_data_source)
+            await session.commit()
+            await session.refresh(new_data_source)
 
         return JSONResponse(status_code=200, content=create_response(
             status_code=200,
@@ -172,9 +172,9 @@ def initiate_convesactions(user_id: int, body: InitiateCinversaction, db: DB):
         ))
 
 
-def get_convesactions(user_id: int, db: DB):
+async def get_convesactions(user_id: int, db: AsyncDB):
     try:
-        with db.session() as session:
+        async with db.session() as session:
             # Create a subquery to get first message for each conversation
             first_messages_subquery = (
                 select(
@@ -211,7 +211,7 @@ def get_convesactions(user_id: int, db: DB):
                 .order_by(Conversations.created_at.desc())
             )
 
-            result = session.execute(query).mappings().all()
+            result = (await session.execute(query)).mappings().all()
 
             conversations_list = []
             for row in result:
@@ -276,9 +276,9 @@ def get_convesactions(user_id: int, db: DB):
         )
 
 
-def get_conversaction_history(conversaction_id: int, db: DB):
+async def get_conversaction_history(conversaction_id: int, db: AsyncDB):
     try:
-        with db.session() as session:
+        async with db.session() as session:
             query = (
                 select(
                     Messages.id,
@@ -293,7 +293,7 @@ def get_conversaction_history(conversaction_id: int, db: DB):
                 .order_by(Messages.created_at.asc())
             )
 
-            result = session.execute(query).mappings().all()
+            result = (await session.execute(query)).mappings().all()
 
             messages = []
             for row in result:
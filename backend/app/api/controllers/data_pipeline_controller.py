@@ -1,31 +1,40 @@
 from fastapi import UploadFile, HTTPException
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import select, func
-from io import BytesIO
+from sqlalchemy import select, func, update, delete
+from functools import partial
 import pandas as pd
 from app.config.logging_config import get_logger
-from app.config.db_config import DB
+from app.config.env import METRICS_ADMIN_USER_IDS
+from app.config.db_config import DB, AsyncDB, engine_registry, vector_db
+from app.config.embedding_config import embedding_service
+from app.config.schema_catalog import schema_catalog
+from app.config.sql_cache import sql_cache
+from app.config.schema_retriever import schema_retriever
 from app.api.db.data_sources import DataSources
-from app.utils.reader_utils import (pdf_to_document, text_to_document)
-from app.config.db_config import VectorDB
+from app.api.db.column_statistics import ColumnStatistics
+from app.api.db.ingested_contents import IngestedContents
+from app.utils.ingest_utils import spool_upload, ingest_spreadsheet, ingest_document
+from app.utils.job_utils import ingestion_jobs
+from app.utils.stats_utils import describe_column_stats
 import uuid
 from app.api.validators.data_source_validator import (
     GetSourceTable, AddDataSource)
 from app.utils.response_utils import create_response
 from app.config.llm_config import LLM
 import json
+from typing import Dict, List, Optional
+import os
 
 # Set up logging
 logger = get_logger(__name__)
-vector_db = VectorDB()
  
 
-async def upload_spreadsheet(id: int, file: UploadFile, db: DB) -> JSONResponse:
-    buffer = None
+async def upload_spreadsheet(id: int, file: UploadFile, db: AsyncDB) -> JSONResponse:
+    spooled_path = None
     try:
         logger.info(f"Processing file: {file.filename}")
-        session = db.create_session()
         # Validate file extension
         if not file.filename.lower().endswith(('.csv', '.xlsx', '.xls')):
             return JSONResponse(status_code=400, content=create_response(
@@ -34,84 +43,44 @@ async def upload_spreadsheet(id: int, file: UploadFile, db: DB) -> JSONResponse:
                 data={}
             ))
 
-        # Read file contents
-        contents = await file.read()
-        buffer = BytesIO(contents)
-
-        # Determine file type and read accordingly
-        if file.filename.lower().endswith('.csv'):
-            df = pd.read_csv(buffer)
-        else:
-            df = pd.read_excel(buffer)
-
-        # Convert all column names to lowercase and replace spaces with underscores
-        df.columns = df.columns.str.lower().str.replace(' ', '_')
+        # Spool the upload to disk so large files never sit in memory, hashing it on the way
+        spooled_path, content_hash = await spool_upload(file)
 
         # Generate a unique table name
         base_name = file.filename.rsplit('.', 1)[0].lower()
         table_name = f"{base_name}_{uuid.uuid4().hex[:8]}"
 
-        # Insert data into database
-        rows_affected = await db.insert_dataframe(df, table_name)
-
-        # Create DataSources entry
-        new_data_source = DataSources(
-            name=file.filename,
-            type='spreadsheet',
-            table_name=table_name,
-            user_id=id
-        )
-
-        session.add(new_data_source)
-        session.commit()
-        session.refresh(new_data_source)
-
-        logger.info(f"Successfully processed file. Rows: {rows_affected}")
-        return JSONResponse(status_code=201, content=create_response(
-            status_code=201,
-            message="Data uploaded successfully",
-            data={
-                "table_name": table_name,
-                "rows_processed": rows_affected,
-                "data_source_id": new_data_source.id
-            }
+        # Parse and load the file in the background, the job owns the spooled file from here
+        job = ingestion_jobs.submit(
+            id, 'spreadsheet', file.filename,
+            partial(ingest_spreadsheet, user_id=id, db=db.sync, path=spooled_path,
+                    file_name=file.filename, table_name=table_name, content_hash=content_hash),
+            cleanup=partial(os.remove, spooled_path))
+        spooled_path = None
+
+        return JSONResponse(status_code=202, content=create_response(
+            status_code=202,
+            message="Upload accepted, processing in the background",
+            data=job
         ))
 
-    except HTTPException as he:
-        return JSONResponse(status_code=500, content=create_response(
-            status_code=500,
-            message="Something went wrong",
-            data={"error": str(he)}
-        ))
-        
-    except SQLAlchemyError as e:
-        logger.error(f"Database error: {str(e)}")
-        return JSONResponse(status_code=500, content=create_response(
-            status_code=500,
-            message="Database error occurred",
-            data={"error": str(e)}
-        ))
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+        logger.exception(f"Unexpected error: {str(e)}")
         return JSONResponse(status_code=500, content=create_response(
             status_code=500,
             message="An unexpected error occurred",
             data={"error": str(e)}
         ))
 
-
     finally:
-        if buffer:
-            buffer.close()
-        logger.info("Upload process completed")
+        if spooled_path and os.path.exists(spooled_path):
+            os.remove(spooled_path)
 
 
-async def upload_document(id: int, file: UploadFile, db: DB) -> JSONResponse:
-    buffer = None
+async def upload_document(id: int, file: UploadFile, db: AsyncDB) -> JSONResponse:
+    spooled_path = None
     try:
         logger.info(f"Processing file: {file.filename}")
-        session = db.create_session()
-        vector_db.initialize_embedding(model_name="sentence-transformers/all-MiniLM-L6-v2")
         # Validate file extension
         if not file.filename.lower().endswith(('.pdf', '.doc', '.txt')):
             return JSONResponse(status_code=400, content=create_response(
@@ -123,52 +92,23 @@ async def upload_document(id: int, file: UploadFile, db: DB) -> JSONResponse:
         base_name = file.filename.rsplit('.', 1)[0].lower()
         table_name = f"{base_name}_{uuid.uuid4().hex[:8]}"
 
-        # Read file contents
-        contents = await file.read()
-        buffer = BytesIO(contents)
-
-        if file.filename.lower().endswith((".pdf")):
-            documents = pdf_to_document(buffer, table_name)
-        elif file.filename.lower().endswith(('.doc', '.txt')):
-            documents = text_to_document(buffer, table_name)
-
-        print(documents)
-        await vector_db.insert_data(documents, table_name)
-        # Create DataSources entry
-        new_data_source = DataSources(
-            name=file.filename,
-            type='document',
-            table_name=table_name,
-            user_id=id
-        )
-
-        session.add(new_data_source)
-        session.commit()
-        session.refresh(new_data_source)
-
-        return JSONResponse(status_code=201, content=create_response(
-            status_code=201,
-            message="Data uploaded successfully",
-            data={
-                "table_name": table_name,
-                "data_source_id": new_data_source.id
-            },
+        spooled_path, content_hash = await spool_upload(file)
+
+        # Parse and embed the file in the background, the job owns the spooled file from here
+        job = ingestion_jobs.submit(
+            id, 'document', file.filename,
+            partial(ingest_document, user_id=id, db=db.sync, vector_db=vector_db,
+                    path=spooled_path, file_name=file.filename, table_name=table_name,
+                    content_hash=content_hash),
+            cleanup=partial(os.remove, spooled_path))
+        spooled_path = None
+
+        return JSONResponse(status_code=202, content=create_response(
+            status_code=202,
+            message="Upload accepted, processing in the background",
+            data=job
         ))
 
-    except HTTPException as he:
-        return JSONResponse(status_code=500, content=create_response(
-            status_code=500,
-            message="Something went wrong",
-            data={"error": str(he)}
-        ))
-        
-    except SQLAlchemyError as e:
-        logger.error(f"Database error: {str(e)}")
-        return JSONResponse(status_code=500, content=create_response(
-            status_code=500,
-            message="Database error occurred",
-            data={"error": str(e)}
-        ))
     except Exception as e:
         logger.exception(f"Unexpected error: {str(e)}")
         return JSONResponse(status_code=500, content=create_response(
@@ -177,36 +117,59 @@ async def upload_document(id: int, file: UploadFile, db: DB) -> JSONResponse:
             data={"error": str(e)}
         ))
     finally:
-        if buffer:
-            buffer.close()
-        logger.info("Upload process completed")
+        if spooled_path and os.path.exists(spooled_path):
+            os.remove(spooled_path)
 
 
-async def add_datasource(data: AddDataSource, id: int, db: DB) -> JSONResponse:
-    try:
-        session = db.create_session()
-        # Create DataSources entry
-        new_data_source = DataSources(
-            name=data.table_name,
-            type='url',
-            connection_url=data.source_name,
-            user_id=id
-        )
-
-        session.add(new_data_source)
-        session.commit()
-        session.refresh(new_data_source)
-
-        return JSONResponse(status_code=201, content=create_response(
-            status_code=201,
-            message="Data uploaded successfully",
-            data={
-                "table_name": data.table_name,
-                "connection_url": data.source_name,
-                "id": new_data_source.id
-            }
+async def get_ingestion_job(job_id: str, user_id: int) -> JSONResponse:
+    job = ingestion_jobs.get(job_id, user_id)
+    if not job:
+        return JSONResponse(status_code=404, content=create_response(
+            status_code=404,
+            message="Ingestion job not found",
+            data={}
         ))
 
+    return JSONResponse(status_code=200, content=create_response(
+        status_code=200,
+        message="Ingestion job fetched successfully",
+        data=job
+    ))
+
+
+async def get_ingestion_jobs(user_id: int) -> JSONResponse:
+    return JSONResponse(status_code=200, content=create_response(
+        status_code=200,
+        message="Ingestion jobs fetched successfully",
+        data={"jobs": ingestion_jobs.list(user_id)}
+    ))
+
+
+async def add_datasource(data: AddDataSource, id: int, db: AsyncDB) -> JSONResponse:
+    try:
+        async with db.session() as session:
+            # Create DataSources entry
+            new_data_source = DataSources(
+                name=data.table_name,
+                type='url',
+                connection_url=data.source_name,
+                user_id=id
+            )
+
+            session.add(new_data_source)
+            await session.commit()
+            await session.refresh(new_data_source)
+
+            return JSONResponse(status_code=201, content=create_response(
+                status_code=201,
+                message="Data uploaded successfully",
+                data={
+                    "table_name": data.table_name,
+                    "connection_url": data.source_name,
+                    "id": new_data_source.id
+                }
+            ))
+
     except HTTPException as he:
         return JSONResponse(status_code=500, content=create_response(
             status_code=500,
@@ -231,9 +194,9 @@ async def add_datasource(data: AddDataSource, id: int, db: DB) -> JSONResponse:
 
 
 
-async def get_data_source_list(id: int, db: DB) -> JSONResponse:
+async def get_data_source_list(id: int, db: AsyncDB) -> JSONResponse:
     try:
-        with db.session() as session:
+        async with db.session() as session:
             query = select(
                 DataSources.id,
                 DataSources.name,
@@ -244,7 +207,7 @@ async def get_data_source_list(id: int, db: DB) -> JSONResponse:
                              'YYYY-MM-DD').label('created_at')
             ).where(DataSources.user_id == id)
 
-            result = session.execute(query)
+            result = await session.execute(query)
             data_sources = result.mappings().all()
 
         # Convert to list of dicts and return
@@ -282,7 +245,8 @@ async def get_data_source_list(id: int, db: DB) -> JSONResponse:
 async def get_source_tables(source: GetSourceTable) -> JSONResponse:
     try:
         db = DB(source.db_url)
-        tables = db.inspector.get_table_names()
+        schemas = await run_in_threadpool(db.get_all_schemas)
+        tables = [schema["table_name"] for schema in schemas]
         return JSONResponse(status_code=200, content=create_response(
             status_code=200,
             message="Tables fetched successfully",
@@ -308,16 +272,13 @@ async def get_source_tables(source: GetSourceTable) -> JSONResponse:
             message="An unexpected error occurred",
             data={"error": str(e)}
         ))
-    finally:
-        if 'engine' in locals():
-            db.engine.dispose()
 
 
-async def suggest_questions(source_id: int, db: DB) -> JSONResponse:
+async def suggest_questions(source_id: int, db: AsyncDB) -> JSONResponse:
     try:
-        with db.session() as session:
-            data_source = session.execute(select(DataSources).where(
-                DataSources.id == source_id)).scalar_one_or_none()
+        async with db.session() as session:
+            data_source = (await session.execute(select(DataSources).where(
+                DataSources.id == source_id))).scalar_one_or_none()
 
             if not data_source:
                 return JSONResponse(status_code=404, content=create_response(
@@ -329,13 +290,16 @@ async def suggest_questions(source_id: int, db: DB) -> JSONResponse:
             schema_info = ""
             if data_source.type in ['spreadsheet', 'url']:
                 # For spreadsheets or SQL, get the table schema
-                target_db = db
+                table_names = [data_source.name if data_source.type == 'url' else data_source.table_name]
                 if data_source.type == 'url':
                     target_db = DB(data_source.connection_url)
-                
-                table_names = [data_source.name if data_source.type == 'url' else data_source.table_name]
-                schema = target_db.get_schemas(table_names)
+                    schema = await run_in_threadpool(target_db.get_schemas, table_names)
+                else:
+                    schema = await db.get_schemas(table_names)
                 schema_info = f"Database Schema: {str(schema)}"
+                column_statistics = await load_column_statistics(session, data_source.id)
+                if column_statistics:
+                    schema_info += f"\n\nColumn Statistics:\n{describe_column_stats(column_statistics)}"
             else:
                 # For documents, we don't have a fixed schema, but we know the name
                 schema_info = f"Document Name: {data_source.name}. This is a text/PDF document."
@@ -354,7 +318,7 @@ async def suggest_questions(source_id: int, db: DB) -> JSONResponse:
             Example: ["What is the total sales by month?", "Who is the top performing employee?", ...]
             """
             
-            response = model.invoke(prompt)
+            response = await model.ainvoke(prompt)
             content = response.content.strip()
             
             # Basic cleaning if AI includes markdown blocks
@@ -389,25 +353,29 @@ async def suggest_questions(source_id: int, db: DB) -> JSONResponse:
         ))
 
 
-async def analyze_health(source_id: int, db: DB) -> JSONResponse:
+async def analyze_health(source_id: int, db: AsyncDB) -> JSONResponse:
     try:
-        with db.session() as session:
-            data_source = session.execute(select(DataSources).where(
-                DataSources.id == source_id)).scalar_one_or_none()
+        async with db.session() as session:
+            data_source = (await session.execute(select(DataSources).where(
+                DataSources.id == source_id))).scalar_one_or_none()
 
             if not data_source:
                 return JSONResponse(status_code=404, content=create_response(status_code=404, message="Data source not found", data={}))
 
-            # 1. Fetch a sample of data for profiling
+            # 1. Use the statistics computed at upload, or fetch a sample of data for profiling
             sample_data = ""
-            if data_source.type in ['spreadsheet', 'url']:
-                target_db = db
+            column_statistics = await load_column_statistics(session, data_source.id)
+            if column_statistics:
+                sample_data = f"Column statistics of the whole table:\n{describe_column_stats(column_statistics)}"
+            elif data_source.type in ['spreadsheet', 'url']:
+                target_db = db.sync
                 if data_source.type == 'url':
                     target_db = DB(data_source.connection_url)
                 
                 table_name = data_source.name if data_source.type == 'url' else data_source.table_name
                 # Get first 10 rows
-                df = pd.read_sql(f'SELECT * FROM "{table_name}" LIMIT 10', target_db.engine)
+                df = await run_in_threadpool(
+                    pd.read_sql, f'SELECT * FROM "{table_name}" LIMIT 10', target_db.engine)
                 sample_data = df.to_string()
             else:
                 return JSONResponse(status_code=200, content=create_response(status_code=200, message="Document health check not yet implemented", data={"suggestions": []}))
@@ -417,17 +385,17 @@ async def analyze_health(source_id: int, db: DB) -> JSONResponse:
             model = llm_instance.groq("llama-3.3-70b-versatile")
 
             prompt = f"""
-            You are a Data Quality Agent. Analyze this sample of data and provide 3-5 specific suggestions for cleaning or normalizing it to improve analysis.
+            You are a Data Quality Agent. Analyze this data profile and provide 3-5 specific suggestions for cleaning or normalizing it to improve analysis.
             Focus on inconsistencies, null patterns, or formatting issues.
             
-            Data Sample:
+            Data Profile:
             {sample_data}
             
             Return ONLY a JSON object with a key 'suggestions' containing a list of objects with 'issue' and 'fix' keys.
             Example: {{"suggestions": [{{"issue": "Inconsistent city names", "fix": "Normalize NYC/New York"}}]}}
             """
             
-            response = model.invoke(prompt)
+            response = await model.ainvoke(prompt)
             content = response.content.strip()
             
             # Clean JSON blocks
@@ -449,14 +417,36 @@ async def analyze_health(source_id: int, db: DB) -> JSONResponse:
         logger.exception(f"Error analyzing health: {str(e)}")
         return JSONResponse(status_code=500, content=create_response(status_code=500, message="Failed to analyze health", data={"error": str(e)}))
 
-async def delete_datasource(source_id: int, user_id: int, db: DB) -> JSONResponse:
+async def release_content(session, table_name: str) -> bool:
+    """
+    Drop one reference to an uploaded table or collection.
+
+    Returns True when nothing points at it anymore and its storage can go.
+    """
+    ref_count = (await session.execute(
+        update(IngestedContents)
+        .where(IngestedContents.table_name == table_name)
+        .values(ref_count=IngestedContents.ref_count - 1)
+        .returning(IngestedContents.ref_count)
+    )).scalar_one_or_none()
+    if ref_count is None:
+        # Uploaded before the content index existed, never shared
+        return True
+    if ref_count > 0:
+        logger.info(f"Kept {table_name}, still used by {ref_count} data sources")
+        return False
+    await session.execute(delete(IngestedContents).where(IngestedContents.table_name == table_name))
+    return True
+
+
+async def delete_datasource(source_id: int, user_id: int, db: AsyncDB) -> JSONResponse:
     try:
-        with db.session() as session:
+        async with db.session() as session:
             # 1. Fetch data source
-            data_source = session.execute(select(DataSources).where(
+            data_source = (await session.execute(select(DataSources).where(
                 DataSources.id == source_id,
                 DataSources.user_id == user_id
-            )).scalar_one_or_none()
+            ))).scalar_one_or_none()
 
             if not data_source:
                 return JSONResponse(status_code=404, content=create_response(
@@ -465,18 +455,18 @@ async def delete_datasource(source_id: int, user_id: int, db: DB) -> JSONRespons
                     data={}
                 ))
 
-            # 2. Cleanup underlying storage
-            if data_source.type == 'spreadsheet':
-                if data_source.table_name:
-                    db.drop_table(data_source.table_name)
-            elif data_source.type == 'document':
-                if data_source.table_name:
-                    vector_db.delete_collection(data_source.table_name)
+            # 2. Cleanup underlying storage once no other data source shares it
+            if data_source.type in ('spreadsheet', 'document') and data_source.table_name:
+                if await release_content(session, data_source.table_name):
+                    if data_source.type == 'spreadsheet':
+                        await db.drop_table(data_source.table_name)
+                    else:
+                        await run_in_threadpool(vector_db.delete_collection, data_source.table_name)
             # For 'url' (SQL), we don't drop the user's external database tables!
 
             # 3. Delete Metadata
-            session.delete(data_source)
-            session.commit()
+            await session.delete(data_source)
+            await session.commit()
 
             return JSONResponse(status_code=200, content=create_response(
                 status_code=200,
@@ -491,3 +481,264 @@ async def delete_datasource(source_id: int, user_id: int, db: DB) -> JSONRespons
             message="Failed to delete data source",
             data={"error": str(e)}
         ))
+
+
+async def load_column_statistics(session, source_id: int) -> List[Dict]:
+    """Column statistics computed when the data source was uploaded."""
+    rows = (await session.execute(select(ColumnStatistics).where(
+        ColumnStatistics.data_source_id == source_id
+    ).order_by(ColumnStatistics.id))).scalars().all()
+    return [{
+        "column_name": row.column_name,
+        "data_type": row.data_type,
+        "row_count": row.row_count,
+        "null_count": row.null_count,
+        "distinct_count": row.distinct_count,
+        "min_value": row.min_value,
+        "max_value": row.max_value,
+        "top_values": row.top_values,
+        "histogram": row.histogram,
+    } for row in rows]
+
+
+async def get_column_statistics(source_id: int, user_id: int, db: AsyncDB) -> JSONResponse:
+    try:
+        async with db.session() as session:
+            data_source = (await session.execute(select(DataSources).where(
+                DataSources.id == source_id,
+                DataSources.user_id == user_id
+            ))).scalar_one_or_none()
+
+            if not data_source:
+                return JSONResponse(status_code=404, content=create_response(
+                    status_code=404,
+                    message="Data source not found",
+                    data={}
+                ))
+
+            column_statistics = await load_column_statistics(session, source_id)
+
+        return JSONResponse(status_code=200, content=create_response(
+            status_code=200,
+            message="Column statistics fetched successfully",
+            data={"data_source_id": source_id, "columns": column_statistics}
+        ))
+    except Exception as e:
+        logger.exception(f"Error fetching column statistics: {str(e)}")
+        return JSONResponse(status_code=500, content=create_response(
+            status_code=500,
+            message="Failed to fetch column statistics",
+            data={"error": str(e)}
+        ))
+
+
+def metrics_forbidden() -> JSONResponse:
+    """Response for users outside METRICS_ADMIN_USER_IDS asking for process-wide metrics."""
+    return JSONResponse(status_code=403, content=create_response(
+        status_code=403,
+        message="Only administrators can read these metrics",
+        data=None
+    ))
+
+
+async def get_embedding_metrics(user_id: int) -> JSONResponse:
+    if user_id not in METRICS_ADMIN_USER_IDS:
+        return metrics_forbidden()
+    return JSONResponse(status_code=200, content=create_response(
+        status_code=200,
+        message="Embedding metrics fetched successfully",
+        data={**embedding_service.metrics(), "cache": vector_db.embeddings.stats()}
+    ))
+
+
+async def get_sql_cache_metrics(user_id: int) -> JSONResponse:
+    if user_id not in METRICS_ADMIN_USER_IDS:
+        return metrics_forbidden()
+    return JSONResponse(status_code=200, content=create_response(
+        status_code=200,
+        message="SQL cache metrics fetched successfully",
+        data=sql_cache.stats()
+    ))
+
+
+async def get_schema_retrieval_metrics(user_id: int) -> JSONResponse:
+    if user_id not in METRICS_ADMIN_USER_IDS:
+        return metrics_forbidden()
+    return JSONResponse(status_code=200, content=create_response(
+        status_code=200,
+        message="Schema retrieval metrics fetched successfully",
+        data=schema_retriever.stats()
+    ))
+
+
+async def get_vector_indexes(user_id: int, db: AsyncDB) -> JSONResponse:
+    try:
+        async with db.session() as session:
+            table_names = (await session.execute(select(DataSources.table_name).where(
+                DataSources.user_id == user_id,
+                DataSources.type == 'document'
+            ))).scalars().all()
+
+        indexes = await run_in_threadpool(vector_db.index_status, list(set(table_names)))
+        return JSONResponse(status_code=200, content=create_response(
+            status_code=200,
+            message="Vector indexes fetched successfully",
+            data={"indexes": indexes}
+        ))
+    except Exception as e:
+        logger.exception(f"Error fetching vector indexes: {str(e)}")
+        return JSONResponse(status_code=500, content=create_response(
+            status_code=500,
+            message="Failed to fetch vector indexes",
+            data={"error": str(e)}
+        ))
+
+
+async def get_document_source(session, source_id: int, user_id: int):
+    return (await session.execute(select(DataSources).where(
+        DataSources.id == source_id,
+        DataSources.user_id == user_id,
+        DataSources.type == 'document'
+    ))).scalar_one_or_none()
+
+
+async def build_vector_index(source_id: int, user_id: int, db: AsyncDB,
+                             quantization: Optional[str] = None) -> JSONResponse:
+    try:
+        async with db.session() as session:
+            data_source = await get_document_source(session, source_id, user_id)
+
+        if not data_source:
+            return JSONResponse(status_code=404, content=create_response(
+                status_code=404,
+                message="Document data source not found",
+                data={}
+            ))
+
+        if quantization:
+            index = await run_in_threadpool(vector_db.quantize_collection, data_source.table_name, quantization)
+        else:
+            index = await run_in_threadpool(vector_db.build_ann_index, data_source.table_name, force=True)
+        return JSONResponse(status_code=200, content=create_response(
+            status_code=200,
+            message="Vector index built successfully" if index
+            else "No vector index built, indexes are disabled or the document has no chunks",
+            data={"index": index}
+        ))
+    except ValueError as e:
+        return JSONResponse(status_code=400, content=create_response(
+            status_code=400,
+            message=str(e),
+            data={}
+        ))
+    except Exception as e:
+        logger.exception(f"Error building vector index: {str(e)}")
+        return JSONResponse(status_code=500, content=create_response(
+            status_code=500,
+            message="Failed to build vector index",
+            data={"error": str(e)}
+        ))
+
+
+async def evaluate_vector_index(source_id: int, user_id: int, db: AsyncDB,
+                                k: int = 10, queries: int = 20) -> JSONResponse:
+    try:
+        async with db.session() as session:
+            data_source = await get_document_source(session, source_id, user_id)
+
+        if not data_source:
+            return JSONResponse(status_code=404, content=create_response(
+                status_code=404,
+                message="Document data source not found",
+                data={}
+            ))
+
+        evaluation = await run_in_threadpool(
+            vector_db.evaluate_recall, data_source.table_name, min(max(k, 1), 100), min(max(queries, 1), 100))
+        return JSONResponse(status_code=200, content=create_response(
+            status_code=200,
+            message="Vector index evaluated successfully",
+            data={"evaluation": evaluation}
+        ))
+    except Exception as e:
+        logger.exception(f"Error evaluating vector index: {str(e)}")
+        return JSONResponse(status_code=500, content=create_response(
+            status_code=500,
+            message="Failed to evaluate vector index",
+            data={"error": str(e)}
+        ))
+
+
+async def get_pool_metrics(user_id: int, db: AsyncDB, check_health: bool = False) -> JSONResponse:
+    try:
+        # Administrators see every pool, other users only those of their own
+        # external data sources, and only those are health checked
+        db_urls = None
+        if user_id not in METRICS_ADMIN_USER_IDS:
+            async with db.session() as session:
+                db_urls = (await session.execute(select(DataSources.connection_url).where(
+                    DataSources.user_id == user_id,
+                    DataSources.type == 'url'
+                ))).scalars().all()
+        pools = await run_in_threadpool(engine_registry.metrics, check_health, db_urls)
+        return JSONResponse(status_code=200, content=create_response(
+            status_code=200,
+            message="Connection pool metrics fetched successfully",
+            data={"pools": pools}
+        ))
+    except Exception as e:
+        logger.exception(f"Error fetching pool metrics: {str(e)}")
+        return JSONResponse(status_code=500, content=create_response(
+            status_code=500,
+            message="Failed to fetch pool metrics",
+            data={"error": str(e)}
+        ))
+
+
+async def refresh_schema(source_id: int, user_id: int, db: AsyncDB) -> JSONResponse:
+    try:
+        async with db.session() as session:
+            data_source = (await session.execute(select(DataSources).where(
+                DataSources.id == source_id,
+                DataSources.user_id == user_id
+            ))).scalar_one_or_none()
+
+        if not data_source:
+            return JSONResponse(status_code=404, content=create_response(
+                status_code=404,
+                message="Data source not found",
+                data={}
+            ))
+
+        if data_source.type == 'url':
+            target_db = DB(data_source.connection_url)
+            schema_catalog.invalidate(target_db.db_url)
+            schemas = await run_in_threadpool(target_db.get_all_schemas)
+        elif data_source.type == 'spreadsheet':
+            target_db = db.sync
+            schema_catalog.invalidate(target_db.db_url, data_source.table_name)
+            schemas = await run_in_threadpool(target_db.get_schemas, [data_source.table_name])
+        else:
+            return JSONResponse(status_code=400, content=create_response(
+                status_code=400,
+                message="Documents don't have a table schema",
+                data={}
+            ))
+
+        return JSONResponse(status_code=200, content=create_response(
+            status_code=200,
+            message="Schema refreshed successfully",
+            data={
+                "tables": len(schemas),
+                "fingerprint": schema_catalog.fingerprint(
+                    target_db.db_url, [schema["table_name"] for schema in schemas])
+            }
+        ))
+
+    except Exception as e:
+        logger.exception(f"Error refreshing schema: {str(e)}")
+        return JSONResponse(status_code=500, content=create_response(
+            status_code=500,
+            message="Failed to refresh schema",
+            data={"error": str(e)}
+        ))
@@ -3,18 +3,18 @@ from fastapi.responses import JSONResponse
 from sqlalchemy import select, update, delete
 from app.api.db.tasks import Tasks
 from app.api.validators.task_validator import TaskCreate, TaskUpdate
-from app.config.db_config import DB
+from app.config.db_config import AsyncDB
 from app.utils.response_utils import create_response
 from app.config.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
-async def get_user_tasks(user_id: int, db: DB):
+async def get_user_tasks(user_id: int, db: AsyncDB):
     try:
-        with db.session() as session:
+        async with db.session() as session:
             query = select(Tasks).where(Tasks.user_id == user_id).order_by(Tasks.created_at.desc())
-            result = session.execute(query).scalars().all()
+            result = (await session.execute(query)).scalars().all()
             
             # Manual serialization for simplicity
             tasks_list = []
@@ -39,9 +39,9 @@ async def get_user_tasks(user_id: int, db: DB):
         return JSONResponse(status_code=500, content=create_response(status_code=500, message="Failed to retrieve tasks", data={"error": str(e)}))
 
 
-async def create_task(user_id: int, body: TaskCreate, db: DB):
+async def create_task(user_id: int, body: TaskCreate, db: AsyncDB):
     try:
-        with db.session() as session:
+        async with db.session() as session:
             new_task = Tasks(
                 user_id=user_id,
                 title=body.title,
@@ -51,8 +51,8 @@ async def create_task(user_id: int, body: TaskCreate, db: DB):
                 data_source_id=body.data_source_id
             )
             session.add(new_task)
-            session.commit()
-            session.refresh(new_task)
+            await session.commit()
+            await session.refresh(new_task)
             
             return JSONResponse(status_code=201, content=create_response(
                 status_code=201,
@@ -64,18 +64,18 @@ async def create_task(user_id: int, body: TaskCreate, db: DB):
         return JSONResponse(status_code=500, content=create_response(status_code=500, message="Failed to create task", data={"error": str(e)}))
 
 
-async def update_task(user_id: int, task_id: int, body: TaskUpdate, db: DB):
+async def update_task(user_id: int, task_id: int, body: TaskUpdate, db: AsyncDB):
     try:
-        with db.session() as session:
+        async with db.session() as session:
             # check ownership
-            task = session.execute(select(Tasks).where(Tasks.id == task_id, Tasks.user_id == user_id)).scalar_one_or_none()
+            task = (await session.execute(select(Tasks).where(Tasks.id == task_id, Tasks.user_id == user_id))).scalar_one_or_none()
             if not task:
                 return JSONResponse(status_code=404, content=create_response(status_code=404, message="Task not found", data={}))
             
             update_data = body.dict(exclude_unset=True)
             if update_data:
-                session.execute(update(Tasks).where(Tasks.id == task_id).values(**update_data))
-                session.commit()
+                await session.execute(update(Tasks).where(Tasks.id == task_id).values(**update_data))
+                await session.commit()
             
             return JSONResponse(status_code=200, content=create_response(
                 status_code=200,
@@ -87,15 +87,15 @@ async def update_task(user_id: int, task_id: int, body: TaskUpdate, db: DB):
         return JSONResponse(status_code=500, content=create_response(status_code=500, message="Failed to update task", data={"error": str(e)}))
 
 
-async def delete_task(user_id: int, task_id: int, db: DB):
+async def delete_task(user_id: int, task_id: int, db: AsyncDB):
     try:
-        with db.session() as session:
-            task = session.execute(select(Tasks).where(Tasks.id == task_id, Tasks.user_id == user_id)).scalar_one_or_none()
+        async with db.session() as session:
+            task = (await session.execute(select(Tasks).where(Tasks.id == task_id, Tasks.user_id == user_id))).scalar_one_or_none()
             if not task:
                 return JSONResponse(status_code=404, content=create_response(status_code=404, message="Task not found", data={}))
             
-            session.execute(delete(Tasks).where(Tasks.id == task_id))
-            session.commit()
+            await session.execute(delete(Tasks).where(Tasks.id == task_id))
+            await session.commit()
             
             return JSONResponse(status_code=200, content=create_response(
                 status_code=200,
@@ -1,2 +1,2 @@
 from .base_class import Base
-from .models import User, DataSources, Conversations, Messages, Tasks, tasks
+from .models import User, DataSources, Conversations, Messages, Tasks, tasks, ColumnStatistics, IngestedContents
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from datetime import datetime
+from .base_class import Base
+
+
+class ColumnStatistics(Base):
+    __tablename__ = "column_statistics"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    data_source_id = Column(Integer, ForeignKey("data_sources.id", ondelete="CASCADE"), index=True)
+    column_name = Column(String(400))
+    data_type = Column(String(50))
+    row_count = Column(Integer)
+    null_count = Column(Integer)
+    distinct_count = Column(Integer)
+    min_value = Column(JSON, nullable=True)
+    max_value = Column(JSON, nullable=True)
+    top_values = Column(JSON, nullable=True)
+    histogram = Column(JSON, nullable=True)
+    created_at = Column("created_at", DateTime, default=datetime.utcnow)
+
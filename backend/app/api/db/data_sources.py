@@ -13,7 +13,7 @@ class DataSources(Base):
     name = Column(String(50), index=True)  # Changed name to String
     type = Column(String(50))
     connection_url = Column(String(400), nullable=True, unique=True)
-    table_name = Column(String(400), nullable=True, unique=True)
+    table_name = Column(String(400), nullable=True, index=True)
     created_at = Column("created_at", DateTime, default=datetime.utcnow)
 
     # Add this relationship
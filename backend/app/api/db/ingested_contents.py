@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from datetime import datetime
+from .base_class import Base
+
+
+# Content-addressed index of uploaded files and the table or collection built from them
+class IngestedContents(Base):
+    __tablename__ = "ingested_contents"
+    __table_args__ = (UniqueConstraint("content_hash", "type"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    # sha256 of the uploaded bytes
+    content_hash = Column(String(64))
+    type = Column(String(50))
+    table_name = Column(String(400), unique=True)
+    # Number of data sources pointing at table_name
+    ref_count = Column(Integer, default=1)
+    created_at = Column("created_at", DateTime, default=datetime.utcnow)
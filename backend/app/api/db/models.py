@@ -1,11 +1,13 @@
 # File: app/db/models.py
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Enum, DateTime, ForeignKey, JSON, text, Text
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Enum, DateTime, ForeignKey, JSON, text, Text, UniqueConstraint, LargeBinary
 from app.config.env import DATABASE_URL
 import logging
 from .chat_history import Conversations, Messages
 from .user import User
 from .data_sources import DataSources
 from .tasks import Tasks
+from .column_statistics import ColumnStatistics
+from .ingested_contents import IngestedContents
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +33,8 @@ data_sources = Table(
     Column("user_id", Integer, ForeignKey("users.id")),
     Column("name", String(50)),
     Column("type", String(50)),
-    Column("table_name", String(400), nullable=True, unique=True),
+    # Not unique, data sources of identical uploads share their table
+    Column("table_name", String(400), nullable=True, index=True),
     Column("connection_url", String(400), nullable=True, unique=True),
     Column("created_at", DateTime, server_default=text('CURRENT_TIMESTAMP'))
 )
@@ -76,11 +79,82 @@ tasks = Table(
         'CURRENT_TIMESTAMP'), onupdate=text('CURRENT_TIMESTAMP')),
 )
 
+column_statistics = Table(
+    "column_statistics",
+    meta,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("data_source_id", Integer, ForeignKey("data_sources.id", ondelete="CASCADE"), index=True),
+    Column("column_name", String(400)),
+    Column("data_type", String(50)),
+    Column("row_count", Integer),
+    Column("null_count", Integer),
+    Column("distinct_count", Integer),
+    Column("min_value", JSON, nullable=True),
+    Column("max_value", JSON, nullable=True),
+    Column("top_values", JSON, nullable=True),
+    Column("histogram", JSON, nullable=True),
+    Column("created_at", DateTime, server_default=text('CURRENT_TIMESTAMP')),
+)
+
+ingested_contents = Table(
+    "ingested_contents",
+    meta,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("content_hash", String(64), nullable=False),
+    Column("type", String(50), nullable=False),
+    Column("table_name", String(400), nullable=False, unique=True),
+    Column("ref_count", Integer, nullable=False, server_default=text('1')),
+    Column("created_at", DateTime, server_default=text('CURRENT_TIMESTAMP')),
+    UniqueConstraint("content_hash", "type"),
+)
+
+embedding_cache = Table(
+    "embedding_cache",
+    meta,
+    Column("model_name", String(200), primary_key=True),
+    # sha256 of the embedded text, prefixed with whether it was a query or a document
+    Column("text_hash", String(64), primary_key=True),
+    # float32 vector bytes
+    Column("embedding", LargeBinary, nullable=False),
+    Column("created_at", DateTime, server_default=text('CURRENT_TIMESTAMP')),
+)
+
+sql_cache = Table(
+    "sql_cache",
+    meta,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    # sha256 of the sources and tables a question was asked against
+    Column("source_key", String(64), nullable=False, index=True),
+    Column("schema_fingerprint", String(64), nullable=False),
+    Column("model_name", String(200), nullable=False),
+    Column("question", Text, nullable=False),
+    # float32 vector bytes of the question embedding
+    Column("embedding", LargeBinary, nullable=False),
+    Column("sql_query", Text, nullable=False),
+    Column("parsed_question", JSON, nullable=True),
+    Column("hit_count", Integer, nullable=False, server_default=text('0')),
+    Column("created_at", DateTime, server_default=text('CURRENT_TIMESTAMP')),
+    Column("last_used_at", DateTime, server_default=text('CURRENT_TIMESTAMP')),
+)
+
+
+def migrate_db():
+    """Bring tables created by older versions up to date."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        # Identical uploads now share a table, so table_name is no longer unique
+        conn.execute(text(
+            "ALTER TABLE data_sources DROP CONSTRAINT IF EXISTS data_sources_table_name_key"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_data_sources_table_name ON data_sources (table_name)"))
+
 
 def init_db():
     try:
         # This will create both the enum type and tables
         meta.create_all(engine)
+        migrate_db()
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
@@ -1,7 +1,8 @@
+from typing import Optional
 from fastapi import Depends, APIRouter, UploadFile, Request
 from app.api.controllers import data_pipeline_controller
 from app.dependencies.database import get_db
-from app.config.db_config import DB
+from app.config.db_config import AsyncDB
 from app.api.validators.data_source_validator import (
     AddDataSource, GetSourceTable)
 
@@ -10,25 +11,25 @@ data_pipeline_router = APIRouter()
 
 
 @data_pipeline_router.post("/upload-spreadsheet")
-async def upload_spreadsheet(request: Request, file: UploadFile, db: DB = Depends(get_db)):
+async def upload_spreadsheet(request: Request, file: UploadFile, db: AsyncDB = Depends(get_db)):
     user_id = request.state.user_id
     return await data_pipeline_controller.upload_spreadsheet(user_id, file, db)
 
 
 @data_pipeline_router.post("/upload-document")
-async def upload_document(request: Request, file: UploadFile, db: DB = Depends(get_db)):
+async def upload_document(request: Request, file: UploadFile, db: AsyncDB = Depends(get_db)):
     user_id = request.state.user_id
     return await data_pipeline_controller.upload_document(user_id, file, db)
 
 
 @data_pipeline_router.post("/add-data-source")
-async def add_datasource(request: Request, data: AddDataSource, db: DB = Depends(get_db)):
+async def add_datasource(request: Request, data: AddDataSource, db: AsyncDB = Depends(get_db)):
     user_id = request.state.user_id
     return await data_pipeline_controller.add_datasource(data, user_id, db)
 
 
 @data_pipeline_router.get("/get-data-sources")
-async def get_data_source_list(request: Request, db: DB = Depends(get_db)):
+async def get_data_source_list(request: Request, db: AsyncDB = Depends(get_db)):
     user_id = request.state.user_id
     return await data_pipeline_controller.get_data_source_list(user_id, db)
 
@@ -39,16 +40,84 @@ async def get_source_tables(source: GetSourceTable):
 
 
 @data_pipeline_router.get("/suggest-questions/{source_id}")
-async def suggest_questions(source_id: int, db: DB = Depends(get_db)):
+async def suggest_questions(source_id: int, db: AsyncDB = Depends(get_db)):
     return await data_pipeline_controller.suggest_questions(source_id, db)
 
 
 @data_pipeline_router.get("/analyze-health/{source_id}")
-async def analyze_health(source_id: int, db: DB = Depends(get_db)):
+async def analyze_health(source_id: int, db: AsyncDB = Depends(get_db)):
     return await data_pipeline_controller.analyze_health(source_id, db)
 
 
 @data_pipeline_router.delete("/delete-data-source/{source_id}")
-async def delete_datasource(request: Request, source_id: int, db: DB = Depends(get_db)):
+async def delete_datasource(request: Request, source_id: int, db: AsyncDB = Depends(get_db)):
     user_id = request.state.user_id
     return await data_pipeline_controller.delete_datasource(source_id, user_id, db)
+
+
+@data_pipeline_router.get("/pool-metrics")
+async def get_pool_metrics(request: Request, check_health: bool = False, db: AsyncDB = Depends(get_db)):
+    user_id = request.state.user_id
+    return await data_pipeline_controller.get_pool_metrics(user_id, db, check_health)
+
+
+@data_pipeline_router.get("/embedding-metrics")
+async def get_embedding_metrics(request: Request):
+    user_id = request.state.user_id
+    return await data_pipeline_controller.get_embedding_metrics(user_id)
+
+
+@data_pipeline_router.get("/sql-cache-metrics")
+async def get_sql_cache_metrics(request: Request):
+    user_id = request.state.user_id
+    return await data_pipeline_controller.get_sql_cache_metrics(user_id)
+
+
+@data_pipeline_router.get("/schema-retrieval-metrics")
+async def get_schema_retrieval_metrics(request: Request):
+    user_id = request.state.user_id
+    return await data_pipeline_controller.get_schema_retrieval_metrics(user_id)
+
+
+@data_pipeline_router.post("/refresh-schema/{source_id}")
+async def refresh_schema(request: Request, source_id: int, db: AsyncDB = Depends(get_db)):
+    user_id = request.state.user_id
+    return await data_pipeline_controller.refresh_schema(source_id, user_id, db)
+
+
+@data_pipeline_router.get("/ingestion-jobs")
+async def get_ingestion_jobs(request: Request):
+    user_id = request.state.user_id
+    return await data_pipeline_controller.get_ingestion_jobs(user_id)
+
+
+@data_pipeline_router.get("/ingestion-jobs/{job_id}")
+async def get_ingestion_job(request: Request, job_id: str):
+    user_id = request.state.user_id
+    return await data_pipeline_controller.get_ingestion_job(job_id, user_id)
+
+
+@data_pipeline_router.get("/column-statistics/{source_id}")
+async def get_column_statistics(request: Request, source_id: int, db: AsyncDB = Depends(get_db)):
+    user_id = request.state.user_id
+    return await data_pipeline_controller.get_column_statistics(source_id, user_id, db)
+
+
+@data_pipeline_router.get("/vector-indexes")
+async def get_vector_indexes(request: Request, db: AsyncDB = Depends(get_db)):
+    user_id = request.state.user_id
+    return await data_pipeline_controller.get_vector_indexes(user_id, db)
+
+
+@data_pipeline_router.post("/vector-indexes/{source_id}")
+async def build_vector_index(request: Request, source_id: int, quantization: Optional[str] = None,
+                             db: AsyncDB = Depends(get_db)):
+    user_id = request.state.user_id
+    return await data_pipeline_controller.build_vector_index(source_id, user_id, db, quantization)
+
+
+@data_pipeline_router.get("/vector-indexes/{source_id}/recall")
+async def evaluate_vector_index(request: Request, source_id: int, k: int = 10, queries: int = 20,
+                                db: AsyncDB = Depends(get_db)):
+    user_id = request.state.user_id
+    return await data_pipeline_controller.evaluate_vector_index(source_id, user_id, db, k, queries)
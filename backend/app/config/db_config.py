@@ -1,31 +1,331 @@
 from typing import List, Dict, Any
-from sqlalchemy import create_engine, inspect, text, inspect
+from collections import OrderedDict
+from itertools import islice
+import hashlib
+import threading
+import time
+import uuid
+from sqlalchemy import (
+    create_engine, inspect, text, bindparam, Table, MetaData, Column,
+    BigInteger, Boolean, Date, DateTime, Double, Integer, Interval,
+    SmallInteger, Text)
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, Session
-from langchain_huggingface import HuggingFaceEmbeddings
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine)
+from fastapi.concurrency import run_in_threadpool
+from langchain_core.embeddings import Embeddings
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from app.config.embedding_config import EmbeddingService, embedding_service
 from app.config.logging_config import get_logger
+from app.config.schema_catalog import schema_catalog
+from app.utils.sql_utils import limit_rows, sqlglot_dialect
 # from langchain_community.vectorstores import PGVector
 from langchain_postgres.vectorstores import PGVector
 from fastapi import HTTPException
 from langchain_core.documents import Document
+import numpy as np
 import pandas as pd
-from app.config.env import (DATABASE_URL)
-from typing import List, Optional
+from io import StringIO
+from app.config.env import (
+    DATABASE_URL, EXTERNAL_DB_POOL_SIZE, EXTERNAL_DB_MAX_OVERFLOW,
+    EXTERNAL_DB_POOL_RECYCLE, ENGINE_REGISTRY_MAX_ENGINES, ENGINE_IDLE_TIMEOUT,
+    QUERY_MAX_ROWS, QUERY_MAX_BYTES, QUERY_FETCH_BATCH, COPY_CHUNK_ROWS,
+    EMBED_BATCH_SIZE, TEXT_SEARCH_CONFIG, RETRIEVAL_K, RETRIEVAL_CANDIDATES,
+    RETRIEVAL_SEMANTIC_WEIGHT, RETRIEVAL_KEYWORD_WEIGHT, RRF_K, ANN_INDEX_TYPE,
+    ANN_MIN_ROWS, HNSW_M, HNSW_EF_CONSTRUCTION, HNSW_EF_SEARCH, IVFFLAT_LISTS, IVFFLAT_PROBES,
+    VECTOR_STORAGE, VECTOR_QUANTIZATION, QUANTIZED_RERANK_FACTOR,
+    VECTOR_STORE_CACHE_SIZE)
+from typing import List, Optional, Iterable, Callable, Tuple, NamedTuple
+import json
 
 logger = get_logger(__name__)
 
 
+class EngineRegistry:
+    """
+    Process-wide registry of SQLAlchemy engines keyed by connection URL.
+
+    Engines are created once per URL with a bounded connection pool and reused
+    by every DB instance pointing at the same database. The least recently
+    used engines are disposed once the registry is full or they sit idle for
+    longer than the idle timeout.
+    """
+
+    def __init__(self, max_engines: int = ENGINE_REGISTRY_MAX_ENGINES,
+                 idle_timeout: int = ENGINE_IDLE_TIMEOUT):
+        self.max_engines = max_engines
+        self.idle_timeout = idle_timeout
+        self._engines: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get_engine(self, db_url: str) -> Engine:
+        """Return the pooled engine for a URL, creating it on first use."""
+        with self._lock:
+            entry = self._engines.get(db_url)
+            if entry is None:
+                entry = {
+                    "engine": self._create_engine(db_url),
+                    "created_at": time.time(),
+                    "hits": 0,
+                }
+                self._engines[db_url] = entry
+                logger.info(
+                    f"Created pooled engine for {self._label(db_url)}")
+            else:
+                entry["hits"] += 1
+                self._engines.move_to_end(db_url)
+            entry["last_used"] = time.time()
+            self._evict(keep=db_url)
+            return entry["engine"]
+
+    def _create_engine(self, db_url: str) -> Engine:
+        options = {"pool_pre_ping": True}
+        # SQLite uses its own pool classes which don't accept sizing options
+        if make_url(db_url).get_backend_name() != "sqlite":
+            options.update(
+                pool_size=EXTERNAL_DB_POOL_SIZE,
+                max_overflow=EXTERNAL_DB_MAX_OVERFLOW,
+                pool_recycle=EXTERNAL_DB_POOL_RECYCLE,
+            )
+        return create_engine(db_url, **options)
+
+    def _evict(self, keep: Optional[str] = None):
+        """Dispose idle engines past the idle timeout or over capacity."""
+        now = time.time()
+        for url in list(self._engines.keys()):
+            if url == keep:
+                continue
+            over_capacity = len(self._engines) > self.max_engines
+            entry = self._engines[url]
+            expired = now - entry["last_used"] > self.idle_timeout
+            if not (over_capacity or expired):
+                continue
+            if not self._is_idle(entry["engine"]):
+                continue
+            self._engines.pop(url)
+            entry["engine"].dispose()
+            logger.info(f"Disposed idle engine for {self._label(url)}")
+
+    @staticmethod
+    def _is_idle(engine: Engine) -> bool:
+        checkedout = getattr(engine.pool, "checkedout", None)
+        return checkedout is None or checkedout() == 0
+
+    @staticmethod
+    def _label(db_url: str) -> str:
+        # Never leak credentials into logs or metrics
+        return make_url(db_url).render_as_string(hide_password=True)
+
+    def check_health(self, db_url: str) -> bool:
+        """Run a trivial query against the pooled engine for a URL."""
+        return self._ping(self.get_engine(db_url), db_url)
+
+    def _ping(self, engine: Engine, db_url: str) -> bool:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.error(
+                f"Health check failed for {self._label(db_url)}: {str(e)}")
+            return False
+
+    def metrics(self, check_health: bool = False,
+                db_urls: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Pool metrics for the registered engines of the given URLs, or of every data source."""
+        with self._lock:
+            self._evict()
+            entries = list(self._engines.items())
+        if db_urls is not None:
+            db_urls = set(db_urls)
+            entries = [(url, entry) for url, entry in entries if url in db_urls]
+        metrics = []
+        for url, entry in entries:
+            pool = entry["engine"].pool
+            metric = {
+                "source": self._label(url),
+                "status": pool.status(),
+                "size": pool.size() if hasattr(pool, "size") else None,
+                "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+                "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+                "hits": entry["hits"],
+                "idle_seconds": round(time.time() - entry["last_used"], 1),
+            }
+            if check_health:
+                metric["healthy"] = self._ping(entry["engine"], url)
+            metrics.append(metric)
+        return metrics
+
+    def dispose(self, db_url: Optional[str] = None):
+        """Dispose one engine, or every engine when no URL is given."""
+        with self._lock:
+            urls = [db_url] if db_url else list(self._engines.keys())
+            for url in urls:
+                entry = self._engines.pop(url, None)
+                if entry:
+                    entry["engine"].dispose()
+
+
+engine_registry = EngineRegistry()
+
+
+# One query returning every column of the current schema, per dialect
+INFORMATION_SCHEMA_QUERIES = {
+    "postgresql": """
+        SELECT table_name, column_name, data_type, is_nullable
+        FROM information_schema.columns
+        WHERE table_schema = current_schema(){table_filter}
+        ORDER BY table_name, ordinal_position
+    """,
+    "mysql": """
+        SELECT table_name, column_name, data_type, is_nullable
+        FROM information_schema.columns
+        WHERE table_schema = DATABASE(){table_filter}
+        ORDER BY table_name, ordinal_position
+    """,
+}
+
+
+# Statements that make the transaction a query runs in read-only
+READ_ONLY_STATEMENTS = {
+    "postgresql": "SET TRANSACTION READ ONLY",
+    "mysql": "SET TRANSACTION READ ONLY",
+    "mariadb": "SET TRANSACTION READ ONLY",
+    "sqlite": "PRAGMA query_only = ON",
+}
+
+
+def collect_rows(rows: Iterable[Any], serialize: Optional[Callable[[Any], Any]] = None,
+                 max_rows: int = QUERY_MAX_ROWS, max_bytes: int = QUERY_MAX_BYTES) -> Dict[str, Any]:
+    """
+    Consume rows until the row cap or the byte budget is reached.
+
+    The byte budget is measured on the JSON encoding of each serialized row,
+    which is what ends up in the workflow state and the response stream.
+    """
+    collected, size, truncated = [], 0, False
+    for row in rows:
+        if len(collected) >= max_rows:
+            truncated = True
+            break
+        item = serialize(row) if serialize else row
+        size += len(json.dumps(item, default=str))
+        if size > max_bytes:
+            truncated = True
+            break
+        collected.append(item)
+    return {"rows": collected, "truncated": truncated}
+
+
+def _is_date_only(series: pd.Series) -> bool:
+    """True for naive datetime columns whose values all fall on midnight."""
+    if getattr(series.dtype, "tz", None) is not None:
+        return False
+    values = series.dropna()
+    return len(values) > 0 and bool((values.dt.normalize() == values).all())
+
+
+def sql_types_for_frame(df: pd.DataFrame) -> Dict[str, Any]:
+    """Map every DataFrame column to the narrowest SQLAlchemy column type for its dtype."""
+    column_types = {}
+    for name, dtype in df.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            column_types[name] = Boolean()
+        elif pd.api.types.is_integer_dtype(dtype):
+            if dtype.itemsize <= 2:
+                column_types[name] = SmallInteger()
+            elif dtype.itemsize <= 4:
+                column_types[name] = Integer()
+            else:
+                column_types[name] = BigInteger()
+        elif pd.api.types.is_float_dtype(dtype):
+            # float32 only saves memory in pandas, REAL would round sums and averages
+            column_types[name] = Double()
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            if _is_date_only(df[name]):
+                column_types[name] = Date()
+            else:
+                column_types[name] = DateTime(timezone=getattr(dtype, "tz", None) is not None)
+        elif pd.api.types.is_timedelta64_dtype(dtype):
+            column_types[name] = Interval()
+        else:
+            column_types[name] = Text()
+    return column_types
+
+
+# Families of column types from narrowest to widest; other mismatches widen to Text
+TYPE_WIDENING_ORDERS = (
+    (SmallInteger, Integer, BigInteger),
+    (Date, DateTime),
+)
+INTEGER_TYPES = TYPE_WIDENING_ORDERS[0]
+
+
+def widen_sql_type(current: Any, incoming: Any) -> Any:
+    """Smallest column type able to hold values of both types."""
+    if type(current) is type(incoming) or isinstance(current, Text):
+        return current
+    for order in TYPE_WIDENING_ORDERS:
+        if type(current) in order and type(incoming) in order:
+            return max(current, incoming, key=lambda column_type: order.index(type(column_type)))
+    if {type(current), type(incoming)} <= set(INTEGER_TYPES + (Double,)):
+        # Integers mixed with floats only fit double precision without loss
+        return current if isinstance(current, Double) else Double()
+    return Text()
+
+
+def describe_tables(inspector, table_names: List[str]) -> List[Dict]:
+    """Collect column information for the given tables from an inspector."""
+    # Initialize an array to hold the schema information for all tables
+    schemas_info = []
+
+    for table_name in table_names:
+        schema_info = {
+            "table_name": table_name,
+            "schema": []
+        }
+
+        # Get the columns for the specified table
+        columns = inspector.get_columns(table_name)
+        # Collect column information
+        for column in columns:
+            schema_info["schema"].append({
+                "name": column['name'],
+                "type": str(column['type']),
+                "nullable": column['nullable']
+            })
+
+        # Append the schema information for the current table to the list
+        schemas_info.append(schema_info)
+
+    # Return the schema information for all tables
+    return schemas_info
+
+
 class DB:
     def __init__(self, db_url: str):
         """
         Initialize the database connection.
 
+        The engine is shared through the process-wide engine registry, so
+        constructing a DB for a URL that was seen before is cheap.
+
         Args:
             db_url (str): Database URL
         """
-        self.engine = create_engine(db_url)
+        self.db_url = db_url
+        self.engine = engine_registry.get_engine(db_url)
         self.session = sessionmaker(
             autocommit=False, autoflush=False, bind=self.engine)
-        self.inspector = inspect(self.engine)
+        self._inspector = None
+
+    @property
+    def inspector(self):
+        if self._inspector is None:
+            self._inspector = inspect(self.engine)
+        return self._inspector
 
     def execute_query(self, query: str) -> list:
         print(f"DEBUG_SQL: Executing Query: {query}")
@@ -40,68 +340,204 @@ class DB:
                 print("DEBUG_SQL: Query executed successfully (no rows returned)")
                 return []
 
+    def stream_query(self, query: str, serialize: Optional[Callable[[Any], Any]] = None,
+                     max_rows: int = QUERY_MAX_ROWS, max_bytes: int = QUERY_MAX_BYTES) -> Dict[str, Any]:
+        """
+        Execute a query through a server-side cursor and keep at most
+        `max_rows` rows or `max_bytes` of serialized data.
+
+        The query runs in a read-only transaction that is rolled back
+        afterwards, so generated SQL never changes the data. Drivers without
+        server-side cursors, like mysqlconnector, buffer the whole result, so
+        the query is capped with a LIMIT one row past `max_rows` instead.
+
+        Returns a dict with the collected `rows` and a `truncated` flag.
+        """
+        with self.engine.connect() as conn:
+            if conn.dialect.name in ("mysql", "mariadb") and not conn.dialect.supports_server_side_cursors:
+                query = limit_rows(query, max_rows + 1, sqlglot_dialect(conn.dialect.name))
+            read_only = READ_ONLY_STATEMENTS.get(conn.dialect.name)
+            if read_only:
+                # Issued before the query, so the transaction it runs in is read-only
+                conn.exec_driver_sql(read_only)
+            try:
+                result = conn.execution_options(
+                    stream_results=True, yield_per=QUERY_FETCH_BATCH).execute(text(query))
+                if not result.returns_rows:
+                    return {"rows": [], "truncated": False}
+                try:
+                    collected = collect_rows(result, serialize, max_rows, max_bytes)
+                finally:
+                    # Closes the server-side cursor without draining remaining rows
+                    result.close()
+            finally:
+                conn.rollback()
+                if conn.dialect.name == "sqlite":
+                    conn.exec_driver_sql("PRAGMA query_only = OFF")
+        if collected["truncated"]:
+            logger.info(
+                f"Query result truncated at {len(collected['rows'])} rows")
+        return collected
+
     def create_session(self) -> Session:
         return self.session()
 
     def get_schemas(self, table_names: List[str]) -> List[Dict]:
         try:
-            # Create an inspector object
-            inspector = inspect(self.engine)
+            return schema_catalog.get_schemas(self.db_url, table_names, self._load_schemas)
 
-            # Initialize an array to hold the schema information for all tables
-            schemas_info = []
+        except Exception as e:
+            logger.error(f"An error occurred: {e}")
+            return []  # Return an empty list in case of an error
 
-            for table_name in table_names:
-                schema_info = {
-                    "table_name": table_name,
-                    "schema": []
-                }
+    def get_all_schemas(self) -> List[Dict]:
+        """Schemas of every table in the database, served from the catalog."""
+        return schema_catalog.get_all_schemas(self.db_url, self._load_schemas)
 
-                # Get the columns for the specified table
-                columns = inspector.get_columns(table_name)
-                # Collect column information
-                for column in columns:
-                    schema_info["schema"].append({
-                        "name": column['name'],
-                        "type": str(column['type']),
-                        "nullable": column['nullable']
-                    })
+    def _load_schemas(self, table_names: Optional[List[str]] = None) -> List[Dict]:
+        """Read table schemas from the database, all of them when no names are given."""
+        query = INFORMATION_SCHEMA_QUERIES.get(self.engine.dialect.name)
+        if query is None:
+            # Create an inspector object
+            inspector = inspect(self.engine)
+            if table_names is None:
+                table_names = inspector.get_table_names()
+            return describe_tables(inspector, table_names)
 
-                # Append the schema information for the current table to the list
-                schemas_info.append(schema_info)
+        statement = text(query.format(
+            table_filter="" if table_names is None else " AND table_name IN :table_names"))
+        params = {}
+        if table_names is not None:
+            statement = statement.bindparams(bindparam("table_names", expanding=True))
+            params["table_names"] = list(table_names)
 
-            # Return the schema information for all tables
-            return schemas_info
+        schemas_info: Dict[str, Dict] = {}
+        with self.engine.connect() as conn:
+            for row in conn.execute(statement, params):
+                table_name, column_name, data_type, is_nullable = row
+                schema_info = schemas_info.setdefault(
+                    table_name, {"table_name": table_name, "schema": []})
+                schema_info["schema"].append({
+                    "name": column_name,
+                    "type": data_type.upper(),
+                    "nullable": is_nullable == "YES"
+                })
+        return list(schemas_info.values())
 
-        except Exception as e:
-            logger.error(f"An error occurred: {e}")
-            return []  # Return an empty list in case of an error
+    def insert_dataframe(self, df: pd.DataFrame, table_name: str,
+                         if_exists: str = 'replace') -> Dict[str, Any]:
+        """
+        Insert pandas DataFrame into database.
 
-    async def insert_dataframe(self, df: pd.DataFrame, table_name: str) -> Dict[str, Any]:
-        """Insert pandas DataFrame into database"""
+        Postgres tables are created with column types derived from the frame
+        and filled through COPY; other dialects fall back to `to_sql`.
+        """
         try:
-            with self.session() as session:
+            started = time.perf_counter()
+            column_types = sql_types_for_frame(df)
+            if self.engine.dialect.name == "postgresql":
+                self._copy_dataframe(df, table_name, column_types, if_exists)
+            else:
+                # Cast float32 columns through their printed values, a plain cast
+                # would store 19.99 as 19.9899997711182
+                narrow = [name for name, dtype in df.dtypes.items() if dtype == "float32"]
+                if narrow:
+                    df = df.astype({name: str for name in narrow}).astype(
+                        {name: "float64" for name in narrow})
                 df.to_sql(
                     name=table_name,
-                    con=session.get_bind(),
-                    if_exists='replace',
-                    index=False
+                    con=self.engine,
+                    if_exists=if_exists,
+                    index=False,
+                    dtype=column_types,
+                    chunksize=COPY_CHUNK_ROWS
                 )
-                return {
-                    "message": f"Successfully inserted data into table {table_name}",
-                    "rows_processed": len(df)
-                }
+            elapsed = time.perf_counter() - started
+            schema_catalog.invalidate(self.db_url, table_name)
+            return {
+                "message": f"Successfully inserted data into table {table_name}",
+                "rows_processed": len(df),
+                "seconds": round(elapsed, 3),
+                "rows_per_second": round(len(df) / elapsed, 1) if elapsed > 0 else None
+            }
         except Exception as e:
             logger.error(f"Data insertion error: {str(e)}")
             raise HTTPException(
                 status_code=500, detail="Failed to insert data into database")
 
+    def _copy_dataframe(self, df: pd.DataFrame, table_name: str,
+                        column_types: Dict[str, Any], if_exists: str):
+        """Stream a DataFrame into Postgres with COPY ... FROM STDIN in CSV chunks."""
+        table = Table(table_name, MetaData(),
+                      *[Column(name, column_type) for name, column_type in column_types.items()])
+        with self.engine.begin() as conn:
+            if if_exists == 'replace':
+                table.drop(conn, checkfirst=True)
+                table.create(conn)
+            elif if_exists == 'append':
+                table.create(conn, checkfirst=True)
+            else:
+                table.create(conn)
+
+            preparer = conn.dialect.identifier_preparer
+            columns = ", ".join(preparer.quote(str(name)) for name in df.columns)
+            copy_sql = (f"COPY {preparer.quote(table_name)} ({columns}) "
+                        f"FROM STDIN WITH (FORMAT csv)")
+
+            # Only one chunk is rendered to CSV at a time
+            chunks = (
+                df.iloc[start:start + COPY_CHUNK_ROWS].to_csv(index=False, header=False, na_rep='')
+                for start in range(0, len(df), COPY_CHUNK_ROWS)
+            )
+            cursor = conn.connection.cursor()
+            try:
+                if hasattr(cursor, "copy_expert"):
+                    # psycopg2
+                    for chunk in chunks:
+                        cursor.copy_expert(copy_sql, StringIO(chunk))
+                else:
+                    # psycopg 3
+                    with cursor.copy(copy_sql) as copy:
+                        for chunk in chunks:
+                            copy.write(chunk)
+            finally:
+                cursor.close()
+
+    def widen_columns(self, table_name: str, column_types: Dict[str, Any],
+                      df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Alter table columns whose type can't hold the values of a new chunk.
+
+        Returns the column types of the table after widening.
+        """
+        widened = dict(column_types)
+        incoming = sql_types_for_frame(df)
+        with self.engine.begin() as conn:
+            preparer = conn.dialect.identifier_preparer
+            for name, incoming_type in incoming.items():
+                # Columns without values in this chunk can't conflict
+                if name not in widened or df[name].isna().all():
+                    continue
+                new_type = widen_sql_type(widened[name], incoming_type)
+                if new_type is widened[name]:
+                    continue
+                type_sql = new_type.compile(dialect=conn.dialect)
+                column = preparer.quote(str(name))
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.quote(table_name)} ALTER COLUMN {column} "
+                    f"TYPE {type_sql} USING {column}::{type_sql}"))
+                logger.info(f"Widened column {name} of {table_name} to {type_sql}")
+                widened[name] = new_type
+        schema_catalog.invalidate(self.db_url, table_name)
+        return widened
+
     def drop_table(self, table_name: str):
         """Drop a table from the database"""
         try:
             with self.session() as session:
                 session.execute(text(f'DROP TABLE IF EXISTS "{table_name}" CASCADE'))
                 session.commit()
+                schema_catalog.invalidate(self.db_url, table_name)
                 logger.info(f"Dropped table: {table_name}")
         except Exception as e:
             logger.error(f"Error dropping table {table_name}: {str(e)}")
@@ -109,85 +545,713 @@ class DB:
                 status_code=500, detail=f"Failed to drop table: {str(e)}")
 
 
-class VectorDB:
-    def __init__(self):
-        """Initialize VectorDB with connection string"""
-        self.connection_string = DATABASE_URL
-        self._embedding: Optional[HuggingFaceEmbeddings] = None
+# Async drivers used for each backend of the system database
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+}
+
 
-    def initialize_embedding(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+def to_async_url(db_url: str) -> str:
+    """Rewrite a database URL to use the async driver for its backend."""
+    url = make_url(db_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for backend: {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+class AsyncDB:
+    def __init__(self, db_url: str):
         """
-        Initialize the embedding model.
+        Initialize the async connection to the system database.
+
+        Controllers use the async sessions so a slow query doesn't block the
+        event loop. Work that needs a synchronous connection (pandas, the
+        LangGraph nodes) goes through `sync`, which shares the pooled engine
+        from the engine registry, and is run in the threadpool.
+
+        Args:
+            db_url (str): Database URL
         """
-        if self._embedding is None:
-            logger.info(f"Initializing HuggingFaceEmbeddings with model: {model_name}")
-            self._embedding = HuggingFaceEmbeddings(model_name=model_name)
-            return "Embedding model initialized successfully."
-        return "Embedding model already initialized."
+        self.db_url = db_url
+        self.engine: AsyncEngine = create_async_engine(
+            to_async_url(db_url), pool_pre_ping=True)
+        self.session = async_sessionmaker(
+            self.engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+        self.sync = DB(db_url)
+
+    def create_session(self) -> AsyncSession:
+        return self.session()
+
+    async def execute_query(self, query: str) -> list:
+        async with self.session() as session:
+            result = await session.execute(text(query))
+            if result.returns_rows:
+                return list(result.fetchall())
+            await session.commit()
+            return []
+
+    async def get_schemas(self, table_names: List[str]) -> List[Dict]:
+        # Cached schemas are returned without leaving the event loop
+        cached = schema_catalog.cached_schemas(self.db_url, table_names)
+        if cached is not None:
+            return cached
+        return await run_in_threadpool(self.sync.get_schemas, table_names)
+
+    async def insert_dataframe(self, df: pd.DataFrame, table_name: str,
+                               if_exists: str = 'replace') -> Dict[str, Any]:
+        """Insert pandas DataFrame into database without blocking the event loop"""
+        return await run_in_threadpool(self.sync.insert_dataframe, df, table_name, if_exists)
+
+    async def drop_table(self, table_name: str):
+        """Drop a table from the database"""
+        try:
+            async with self.session() as session:
+                await session.execute(text(f'DROP TABLE IF EXISTS "{table_name}" CASCADE'))
+                await session.commit()
+                schema_catalog.invalidate(self.db_url, table_name)
+                logger.info(f"Dropped table: {table_name}")
+        except Exception as e:
+            logger.error(f"Error dropping table {table_name}: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail=f"Failed to drop table: {str(e)}")
+
+    async def dispose(self):
+        await self.engine.dispose()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings backed by a persistent cache in the system database.
+
+    Vectors are stored per (model name, sha256 of the text), so re-uploaded
+    chunks and repeated questions are only encoded once. Queries and
+    documents are keyed separately since some models encode them differently.
+    Cache errors are logged and fall back to encoding.
+    """
+
+    def __init__(self, embeddings: EmbeddingService = embedding_service, db_url: str = DATABASE_URL):
+        self.embeddings = embeddings
+        self.db_url = db_url
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def engine(self) -> Engine:
+        return engine_registry.get_engine(self.db_url)
+
+    @staticmethod
+    def _hash(text_value: str, kind: str) -> str:
+        return hashlib.sha256(f"{kind}:{text_value}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, hashes: List[str]) -> Dict[str, List[float]]:
+        query = text(
+            "SELECT text_hash, embedding FROM embedding_cache "
+            "WHERE model_name = :model_name AND text_hash IN :hashes"
+        ).bindparams(bindparam("hashes", expanding=True))
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(query, {"model_name": self.embeddings.model_name,
+                                            "hashes": hashes}).fetchall()
+            return {row[0]: np.frombuffer(row[1], dtype=np.float32).tolist() for row in rows}
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {str(e)}")
+            return {}
+
+    def _store(self, vectors: Dict[str, List[float]]):
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    "INSERT INTO embedding_cache (model_name, text_hash, embedding) "
+                    "VALUES (:model_name, :text_hash, :embedding) ON CONFLICT DO NOTHING"
+                ), [{"model_name": self.embeddings.model_name, "text_hash": text_hash,
+                     "embedding": np.asarray(vector, dtype=np.float32).tobytes()}
+                    for text_hash, vector in vectors.items()])
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {str(e)}")
+
+    def _record(self, hits: int, misses: int):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        hashes = [self._hash(text_value, "document") for text_value in texts]
+        cached = self._lookup(list(set(hashes)))
+
+        # Encode each missing text once, even when it repeats in the batch
+        missing = {text_hash: text_value for text_hash, text_value in zip(hashes, texts)
+                   if text_hash not in cached}
+        computed = {}
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self._store(computed)
+
+        hits = sum(text_hash in cached for text_hash in hashes)
+        self._record(hits, len(texts) - hits)
+        return [cached.get(text_hash) or computed[text_hash] for text_hash in hashes]
+
+    def embed_query(self, text_value: str) -> List[float]:
+        text_hash = self._hash(text_value, "query")
+        cached = self._lookup([text_hash])
+        if text_hash in cached:
+            self._record(1, 0)
+            return cached[text_hash]
+        vector = self.embeddings.embed_query(text_value)
+        self._store({text_hash: vector})
+        self._record(0, 1)
+        return vector
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+# Turns a question into an OR of its stemmed words, so any word may match like in BM25
+_OR_TSQUERY = ("to_tsquery(CAST(:config AS regconfig), replace("
+               "plainto_tsquery(CAST(:config AS regconfig), :query)::text, ' & ', ' | '))")
+
+
+class HybridRetriever(BaseRetriever):
+    """Retriever fusing vector similarity and full text ranking of one vector collection."""
+
+    vector_db: Any
+    collection_name: str
+    k: int = RETRIEVAL_K
+    semantic_weight: float = RETRIEVAL_SEMANTIC_WEIGHT
+    keyword_weight: float = RETRIEVAL_KEYWORD_WEIGHT
+    rrf_k: int = RRF_K
+
+    def _get_relevant_documents(self, query: str, *,
+                                run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.vector_db.hybrid_search(
+            self.collection_name, query, k=self.k, semantic_weight=self.semantic_weight,
+            keyword_weight=self.keyword_weight, rrf_k=self.rrf_k)
+
+
+SHARED_STORAGE = "shared"
+TABLE_STORAGE = "table"
+
+NO_QUANTIZATION = "none"
+HALF_QUANTIZATION = "half"
+BINARY_QUANTIZATION = "binary"
+QUANTIZATIONS = (NO_QUANTIZATION, HALF_QUANTIZATION, BINARY_QUANTIZATION)
+# halfvec and binary_quantize arrived in pgvector 0.7.0
+QUANTIZATION_MIN_PGVECTOR = (0, 7, 0)
+
+
+def _format_version(version: Tuple[int, ...]) -> str:
+    return ".".join(str(part) for part in version)
+
+
+def _collection_table(collection_id: uuid.UUID) -> str:
+    """Own table of a collection stored with the "table" storage."""
+    return f'"embedding_{collection_id.hex}"'
+
+
+class VectorCollection(NamedTuple):
+    """Where the chunks of one collection are stored and how its ANN index is quantized."""
+
+    name: str
+    id: uuid.UUID
+    storage: str
+    dims: int
+    quantization: str = NO_QUANTIZATION
+
+    @property
+    def table(self) -> str:
+        if self.storage == TABLE_STORAGE:
+            return _collection_table(self.id)
+        return "langchain_pg_embedding"
+
+    @property
+    def scope(self) -> str:
+        """Condition on the table aliased `e` selecting the collection's chunks."""
+        if self.storage == TABLE_STORAGE:
+            return "TRUE"
+        return f"e.collection_id = '{self.id}'"
+
+    def full_vector(self, alias: str = "e.") -> str:
+        """Full precision embedding expression with fixed dimensions."""
+        if self.storage == TABLE_STORAGE:
+            return f"{alias}embedding"
+        return f"{alias}embedding::vector({self.dims})"
+
+    def index_vector(self, alias: str = "e.") -> str:
+        """Embedding expression the ANN index is built on, quantized or not."""
+        if self.quantization == HALF_QUANTIZATION:
+            return f"({self.full_vector(alias)})::halfvec({self.dims})"
+        if self.quantization == BINARY_QUANTIZATION:
+            return f"binary_quantize({self.full_vector(alias)})::bit({self.dims})"
+        return self.full_vector(alias)
+
+    def index_query(self, parameter: str = ":embedding") -> str:
+        """Query vector in the form compared against `index_vector`."""
+        if self.quantization == HALF_QUANTIZATION:
+            return f"CAST({parameter} AS halfvec({self.dims}))"
+        if self.quantization == BINARY_QUANTIZATION:
+            return f"binary_quantize(CAST({parameter} AS vector({self.dims})))::bit({self.dims})"
+        return f"CAST({parameter} AS vector({self.dims}))"
+
+    @property
+    def index_operator(self) -> str:
+        return "<~>" if self.quantization == BINARY_QUANTIZATION else "<=>"
+
+    @property
+    def index_opclass(self) -> str:
+        return {HALF_QUANTIZATION: "halfvec_cosine_ops",
+                BINARY_QUANTIZATION: "bit_hamming_ops"}.get(self.quantization, "vector_cosine_ops")
+
+    def semantic_ranking(self, shortlist: str = ":shortlist", limit: str = ":candidates") -> str:
+        """
+        SELECT ranking the collection's chunks by cosine distance to :embedding.
+
+        The ANN index shortlists chunks by the indexed, possibly quantized,
+        vectors, which are then reranked by their full precision distance.
+        """
+        return f"""
+            SELECT c.id, row_number() OVER (ORDER BY c.distance) AS rank
+            FROM (
+                SELECT e.id, {self.full_vector()} <=> CAST(:embedding AS vector({self.dims})) AS distance
+                FROM {self.table} e
+                WHERE {self.scope}
+                ORDER BY {self.index_vector()} {self.index_operator} {self.index_query()}
+                LIMIT {shortlist}
+            ) c
+            ORDER BY c.distance
+            LIMIT {limit}
+        """
+
+
+class VectorDB:
+    """
+    Document collections in pgvector.
+
+    Default retrievers and collection layouts are kept in a small LRU cache
+    per collection, all sharing the pooled engine of the registry, so
+    answering a question doesn't set anything up again.
+    """
+
+    def __init__(self, embeddings: Optional[Embeddings] = None, cache_size: int = VECTOR_STORE_CACHE_SIZE):
+        """Initialize VectorDB with connection string and the cached shared embedding model"""
+        self.connection_string = DATABASE_URL
+        self._embedding = embeddings or CachedEmbeddings()
+        self._keyword_index_ready = False
+        self._keyword_index_lock = threading.Lock()
+        self.cache_size = cache_size
+        # Collection name -> {"retriever", "collection"}, least recently used first
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pgvector_version: Optional[Tuple[int, ...]] = None
 
     @property
-    def embeddings(self):
-        if self._embedding is None:
-            raise ValueError(
-                "Embedding model not initialized. Call initialize_embedding() first.")
+    def embeddings(self) -> Embeddings:
         return self._embedding
 
-    async def insert_data(self, documents: List[Document], collection_name: str) -> PGVector:
-        """Insert documents into vector store"""
+    def _cached(self, collection_name: str, key: str) -> Any:
+        with self._cache_lock:
+            entry = self._cache.get(collection_name)
+            if entry is None or key not in entry:
+                return None
+            self._cache.move_to_end(collection_name)
+            return entry[key]
+
+    def _remember(self, collection_name: str, key: str, value: Any) -> Any:
+        with self._cache_lock:
+            self._cache.setdefault(collection_name, {})[key] = value
+            self._cache.move_to_end(collection_name)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def invalidate(self, collection_name: str):
+        """Forget everything cached about a collection."""
+        with self._cache_lock:
+            self._cache.pop(collection_name, None)
+
+    def _new_vector_store(self, collection_name: str, **kwargs) -> PGVector:
+        # PGVector creates its tables and the collection row when missing
+        return PGVector(
+            connection=self._get_engine(),
+            embeddings=self.embeddings,
+            collection_name=collection_name,
+            use_jsonb=True,
+            **kwargs,
+        )
+
+    def insert_data(self, documents: Iterable[Document], collection_name: str,
+                    progress: Optional[Callable[[int], None]] = None,
+                    storage: str = VECTOR_STORAGE,
+                    quantization: str = VECTOR_QUANTIZATION) -> int:
+        """
+        Insert documents into vector store, embedding them in batches.
+
+        `documents` may be a generator, batches are embedded as they arrive.
+        New collections are kept in the shared PGVector table or, with the
+        "table" storage, in a table of their own, and their ANN index is
+        quantized as requested. An existing collection keeps its settings.
+        Returns the number of documents inserted.
+        """
+        if quantization != NO_QUANTIZATION and not self.supports_quantization():
+            logger.warning(f"pgvector {_format_version(self.pgvector_version())} can't quantize, "
+                           f"indexing {collection_name} at full precision")
+            quantization = NO_QUANTIZATION
         try:
-            return PGVector.from_documents(
-                embedding=self.embeddings,
-                documents=documents,
-                collection_name=collection_name,
-                connection=self.connection_string,
-                use_jsonb=True,
-            )
+            # Only needed for the insert, retrieval goes through the hybrid retriever
+            vector_store = self._new_vector_store(
+                collection_name, collection_metadata={"storage": storage, "quantization": quantization})
+            self.ensure_keyword_index()
+            collection_id, storage = self._collection_row(collection_name)
+            documents = iter(documents)
+            inserted = 0
+            while batch := list(islice(documents, EMBED_BATCH_SIZE)):
+                if storage == TABLE_STORAGE:
+                    self._insert_into_table(collection_id, batch)
+                else:
+                    vector_store.add_documents(batch)
+                inserted += len(batch)
+                if progress:
+                    progress(inserted)
         except Exception as e:
             logger.exception(f"Vector store insertion error: {str(e)}")
             raise HTTPException(
                 status_code=500, detail=f"Failed to insert documents into vector store: {str(e)}")
 
-    def get_vector_store(self, collection_name: str) -> PGVector:
-        """Get existing vector store"""
         try:
-            return PGVector(
-                connection=self.connection_string,
-                embeddings=self.embeddings,
-                collection_name=collection_name,
-                use_jsonb=True,
-            )
+            # Built once after the bulk insert, far cheaper than maintaining it row by row
+            self.build_ann_index(collection_name)
         except Exception as e:
-            logger.exception(f"Vector store retrieval error: {str(e)}")
-            raise HTTPException(
-                status_code=500, detail=f"Failed to retrieve vector store: {str(e)}")
+            # Searches fall back to an exact scan, the upload itself is fine
+            logger.warning(f"Could not build ANN index for {collection_name}: {str(e)}")
+        return inserted
 
-    def get_all_documents(self, collection_name: str) -> List[Document]:
-        """Fetch all documents for a collection from the database"""
-        try:
-            documents = []
+    def _collection_row(self, collection_name: str) -> Tuple[uuid.UUID, str]:
+        with self._get_engine().connect() as conn:
+            row = conn.execute(text(
+                "SELECT uuid, cmetadata->>'storage' FROM langchain_pg_collection WHERE name = :name"),
+                {"name": collection_name}).one()
+        # Collections created before storage was configurable live in the shared table
+        return uuid.UUID(str(row[0])), row[1] or SHARED_STORAGE
+
+    def _insert_into_table(self, collection_id: uuid.UUID, documents: List[Document]):
+        """Embed documents and write them to the collection's own table, creating it first."""
+        vectors = self.embeddings.embed_documents([doc.page_content for doc in documents])
+        table = _collection_table(collection_id)
+        with self._get_engine().begin() as conn:
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    id varchar PRIMARY KEY,
+                    embedding vector({len(vectors[0])}),
+                    document varchar,
+                    cmetadata jsonb,
+                    document_tsv tsvector GENERATED ALWAYS AS
+                        (to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(document, ''))) STORED
+                )
+            """))
+            conn.execute(text(
+                f'CREATE INDEX IF NOT EXISTS "ix_embedding_tsv_{collection_id.hex}" '
+                f"ON {table} USING gin (document_tsv)"))
+            conn.execute(text(
+                f"INSERT INTO {table} (id, embedding, document, cmetadata) "
+                "VALUES (:id, CAST(:embedding AS vector), :document, CAST(:cmetadata AS jsonb))"),
+                [{"id": doc.id or str(uuid.uuid4()), "embedding": json.dumps(vector),
+                  "document": doc.page_content, "cmetadata": json.dumps(doc.metadata)}
+                 for doc, vector in zip(documents, vectors)])
+
+    def ensure_keyword_index(self):
+        """
+        Add a full text search column and its GIN index to the embedding table.
+
+        The column is generated, so Postgres fills it for existing chunks once
+        and keeps it up to date on every insert. PGVector creates the table,
+        so this runs after the first vector store is built, once per process.
+        """
+        if self._keyword_index_ready:
+            return
+        with self._keyword_index_lock:
+            if self._keyword_index_ready:
+                return
+            with self._get_engine().begin() as conn:
+                conn.execute(text(
+                    "ALTER TABLE langchain_pg_embedding ADD COLUMN IF NOT EXISTS document_tsv tsvector "
+                    f"GENERATED ALWAYS AS (to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(document, ''))) STORED"))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_langchain_pg_embedding_document_tsv "
+                    "ON langchain_pg_embedding USING gin (document_tsv)"))
+                # Every lookup is scoped to one collection
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_langchain_pg_embedding_collection_id "
+                    "ON langchain_pg_embedding (collection_id)"))
+            self._keyword_index_ready = True
+
+    def hybrid_search(self, collection_name: str, query: str, k: int = RETRIEVAL_K,
+                      semantic_weight: float = RETRIEVAL_SEMANTIC_WEIGHT,
+                      keyword_weight: float = RETRIEVAL_KEYWORD_WEIGHT,
+                      rrf_k: int = RRF_K) -> List[Document]:
+        """
+        Return the k chunks of a collection ranked best by vector and full text search.
+
+        Both rankings run in one statement and are fused with weighted reciprocal
+        rank fusion: score = sum(weight / (rrf_k + rank)) over the rankings a
+        chunk appears in. Each ranking only considers its top candidates.
+        """
+        self.ensure_keyword_index()
+        embedding = self.embeddings.embed_query(query)
+        with self._get_engine().begin() as conn:
+            collection = self._collection(conn, collection_name)
+            if collection is None:
+                return []
+            candidates = max(k, RETRIEVAL_CANDIDATES)
+            shortlist = self._set_search_params(conn, collection, candidates)
+            # The collection scope and vector expression are written out so the
+            # planner can match the collection's ANN index, see build_ann_index
+            rows = conn.execute(text(f"""
+                WITH q AS (SELECT {_OR_TSQUERY} AS query),
+                semantic AS ({collection.semantic_ranking()}),
+                keyword AS (
+                    SELECT e.id, row_number() OVER (ORDER BY ts_rank_cd(e.document_tsv, q.query) DESC) AS rank
+                    FROM {collection.table} e CROSS JOIN q
+                    WHERE {collection.scope} AND e.document_tsv @@ q.query
+                    ORDER BY ts_rank_cd(e.document_tsv, q.query) DESC
+                    LIMIT :candidates
+                ),
+                fused AS (
+                    SELECT coalesce(s.id, kw.id) AS id,
+                           coalesce(CAST(:semantic_weight AS double precision) / (:rrf_k + s.rank), 0)
+                           + coalesce(CAST(:keyword_weight AS double precision) / (:rrf_k + kw.rank), 0) AS score
+                    FROM semantic s FULL OUTER JOIN keyword kw ON s.id = kw.id
+                )
+                SELECT e.document, e.cmetadata
+                FROM fused f JOIN {collection.table} e ON e.id = f.id
+                ORDER BY f.score DESC
+                LIMIT :k
+            """), {"config": TEXT_SEARCH_CONFIG, "query": query, "embedding": json.dumps(embedding),
+                   "candidates": candidates, "shortlist": shortlist, "semantic_weight": semantic_weight,
+                   "keyword_weight": keyword_weight, "rrf_k": rrf_k, "k": k}).fetchall()
+        return [Document(page_content=row[0], metadata=row[1] or {}) for row in rows]
+
+    @staticmethod
+    def _set_search_params(conn, collection: VectorCollection, candidates: int) -> int:
+        """Size the ANN search for the current transaction, returns the shortlist size."""
+        shortlist = candidates
+        if collection.quantization != NO_QUANTIZATION:
+            shortlist *= QUANTIZED_RERANK_FACTOR
+        # HNSW never returns more rows than ef_search
+        conn.execute(text(
+            "SELECT set_config('hnsw.ef_search', :ef_search, true), "
+            "set_config('ivfflat.probes', :probes, true)"),
+            {"ef_search": str(max(HNSW_EF_SEARCH, shortlist)), "probes": str(IVFFLAT_PROBES)})
+        return shortlist
+
+    def get_hybrid_retriever(self, collection_name: str, **kwargs) -> HybridRetriever:
+        """Retriever over a collection, `kwargs` override k, the fusion weights and rrf_k."""
+        if kwargs:
+            return HybridRetriever(vector_db=self, collection_name=collection_name, **kwargs)
+        return self._cached(collection_name, "retriever") or self._remember(
+            collection_name, "retriever", HybridRetriever(vector_db=self, collection_name=collection_name))
+
+    def _collection(self, conn, collection_name: str) -> Optional[VectorCollection]:
+        """Storage of a collection, None while it has no chunks."""
+        collection = self._cached(collection_name, "collection")
+        if collection is None:
+            row = conn.execute(text(
+                "SELECT uuid, cmetadata->>'storage', cmetadata->>'quantization' "
+                "FROM langchain_pg_collection WHERE name = :name"),
+                {"name": collection_name}).fetchone()
+            if row is None:
+                return None
+            collection = VectorCollection(collection_name, uuid.UUID(str(row[0])),
+                                          row[1] or SHARED_STORAGE, 0, row[2] or NO_QUANTIZATION)
+            if collection.storage == TABLE_STORAGE and conn.execute(
+                    text("SELECT to_regclass(:table)"), {"table": collection.table}).scalar() is None:
+                return None
+            dims = conn.execute(text(
+                f"SELECT vector_dims(e.embedding) FROM {collection.table} e WHERE {collection.scope} LIMIT 1"
+            )).scalar()
+            if dims is None:
+                return None
+            collection = self._remember(collection_name, "collection", collection._replace(dims=int(dims)))
+        return collection
+
+    @staticmethod
+    def _ann_index_name(collection_id: uuid.UUID) -> str:
+        return f"ix_embedding_ann_{collection_id.hex}"
+
+    def build_ann_index(self, collection_name: str, index_type: str = ANN_INDEX_TYPE,
+                        force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        (Re)build the approximate nearest neighbour index of one collection.
+
+        In the shared table the embedding column has no fixed dimensions, so
+        each collection gets a partial index on the embedding cast to its
+        dimensions. Collections in their own table are indexed whole. With
+        half or binary quantization the index holds halfvec or bit vectors,
+        the full precision embeddings stay in the table for reranking.
+        Collections smaller than ANN_MIN_ROWS are skipped unless forced, an
+        exact scan of them is fast enough. The index is built concurrently so
+        inserts into other collections aren't blocked. Returns the index
+        state, or None when none was built.
+        """
+        if index_type not in ("hnsw", "ivfflat"):
+            return None
+        with self._get_engine().connect() as conn:
+            collection = self._collection(conn, collection_name)
+            if collection is None:
+                return None
+            chunks = conn.execute(text(
+                f"SELECT count(*) FROM {collection.table} e WHERE {collection.scope}")).scalar()
+        if chunks < ANN_MIN_ROWS and not force:
+            return None
+
+        if index_type == "hnsw":
+            options = f"m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION}"
+        else:
+            options = f"lists = {IVFFLAT_LISTS or max(1, chunks // 1000)}"
+        definition = (f"{collection.table} USING {index_type} "
+                      f"(({collection.index_vector(alias='')}) {collection.index_opclass}) WITH ({options})")
+        if collection.storage == SHARED_STORAGE:
+            definition += f" WHERE collection_id = '{collection.id}'"
+        index_name = self._ann_index_name(collection.id)
+        started = time.perf_counter()
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with self._get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"'))
+            try:
+                conn.execute(text(f'CREATE INDEX CONCURRENTLY "{index_name}" ON {definition}'))
+            except Exception:
+                # A failed concurrent build leaves an invalid index behind
+                conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"'))
+                raise
+            # Fresh statistics, otherwise the planner keeps scanning the new chunks exactly
+            conn.execute(text(f"ANALYZE {collection.table}"))
+        logger.info(f"Built {index_type} index for {collection_name} ({chunks} chunks) "
+                    f"in {time.perf_counter() - started:.1f}s")
+        return self.index_status([collection_name])[0]
+
+    def index_status(self, collection_names: List[str]) -> List[Dict[str, Any]]:
+        """ANN index state of the given collections, collections without chunks are left out."""
+        statuses = []
+        with self._get_engine().connect() as conn:
+            for collection_name in sorted(collection_names):
+                collection = self._collection(conn, collection_name)
+                if collection is None:
+                    continue
+                chunks = conn.execute(text(
+                    f"SELECT count(*) FROM {collection.table} e WHERE {collection.scope}")).scalar()
+                index = conn.execute(text("""
+                    SELECT am.amname, pg_relation_size(i.oid), x.indisvalid
+                    FROM pg_class i
+                    JOIN pg_index x ON x.indexrelid = i.oid
+                    JOIN pg_am am ON am.oid = i.relam
+                    WHERE i.relname = :index_name
+                """), {"index_name": self._ann_index_name(collection.id)}).fetchone()
+                statuses.append({
+                    "collection_name": collection_name,
+                    "storage": collection.storage,
+                    "quantization": collection.quantization,
+                    "chunks": chunks,
+                    "index_name": self._ann_index_name(collection.id) if index else None,
+                    "index_type": index[0] if index else None,
+                    "size_bytes": index[1] if index else None,
+                    "valid": index[2] if index else None,
+                    "search": "ann" if index and index[2] else "exact",
+                })
+        return statuses
+
+    def pgvector_version(self) -> Tuple[int, ...]:
+        if self._pgvector_version is None:
             with self._get_engine().connect() as conn:
-                # 1. Find the collection UUID
-                query_coll = text("SELECT uuid FROM langchain_pg_collection WHERE name = :name")
-                res_coll = conn.execute(query_coll, {"name": collection_name}).fetchone()
-                
-                if not res_coll:
-                    return []
-                
-                collection_uuid = res_coll[0]
-                
-                # 2. Fetch all embeddings/documents for this collection
-                query_docs = text("SELECT document, cmetadata FROM langchain_pg_embedding WHERE collection_id = :id")
-                res_docs = conn.execute(query_docs, {"id": collection_uuid}).fetchall()
-                
-                for row in res_docs:
-                    content = row[0]
-                    metadata = row[1] if row[1] else {}
-                    documents.append(Document(page_content=content, metadata=metadata))
-            
-            return documents
-        except Exception as e:
-            logger.error(f"Error fetching documents for {collection_name}: {str(e)}")
-            return []
+                version = conn.execute(text(
+                    "SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+            self._pgvector_version = tuple(int(part) for part in (version or "0").split("."))
+        return self._pgvector_version
+
+    def supports_quantization(self) -> bool:
+        return self.pgvector_version() >= QUANTIZATION_MIN_PGVECTOR
+
+    def quantize_collection(self, collection_name: str, quantization: str) -> Optional[Dict[str, Any]]:
+        """
+        Switch the ANN index of an existing collection to another quantization.
+
+        Embeddings are always stored at full precision, so this only records
+        the setting and rebuilds the index. Returns the new index state.
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization {quantization}, expected one of {', '.join(QUANTIZATIONS)}")
+        if quantization != NO_QUANTIZATION and not self.supports_quantization():
+            raise ValueError(f"Quantization needs pgvector {_format_version(QUANTIZATION_MIN_PGVECTOR)}+, "
+                             f"the database has {_format_version(self.pgvector_version())}")
+        with self._get_engine().begin() as conn:
+            conn.execute(text("""
+                UPDATE langchain_pg_collection
+                SET cmetadata = (coalesce(cmetadata::jsonb, '{}'::jsonb)
+                                 || jsonb_build_object('quantization', CAST(:quantization AS text)))::json
+                WHERE name = :name
+            """), {"name": collection_name, "quantization": quantization})
+        self.invalidate(collection_name)
+        return self.build_ann_index(collection_name, force=True)
+
+    def evaluate_recall(self, collection_name: str, k: int = 10, queries: int = 20) -> Optional[Dict[str, Any]]:
+        """
+        Measure how the collection's ANN search compares with an exact scan.
+
+        Embeddings of randomly picked chunks serve as queries. Recall is the
+        share of the exact top k the ANN search also returns, latencies are
+        averaged per query.
+        """
+        engine = self._get_engine()
+        with engine.connect() as conn:
+            collection = self._collection(conn, collection_name)
+            if collection is None:
+                return None
+            samples = conn.execute(text(
+                f"SELECT e.embedding::text FROM {collection.table} e WHERE {collection.scope} "
+                "ORDER BY random() LIMIT :queries"), {"queries": queries}).scalars().all()
+
+        exact_sql = text(f"""
+            SELECT e.id FROM {collection.table} e
+            WHERE {collection.scope}
+            ORDER BY {collection.full_vector()} <=> CAST(:embedding AS vector({collection.dims}))
+            LIMIT :k
+        """)
+        ann_sql = text(collection.semantic_ranking(limit=":k"))
+        found = exact_seconds = ann_seconds = 0.0
+        for embedding in samples:
+            with engine.begin() as conn:
+                conn.execute(text("SELECT set_config('enable_indexscan', 'off', true)"))
+                started = time.perf_counter()
+                exact = set(conn.execute(exact_sql, {"embedding": embedding, "k": k}).scalars())
+                exact_seconds += time.perf_counter() - started
+            with engine.begin() as conn:
+                shortlist = self._set_search_params(conn, collection, k)
+                started = time.perf_counter()
+                ann = set(conn.execute(ann_sql, {"embedding": embedding, "k": k,
+                                                 "shortlist": shortlist}).scalars())
+                ann_seconds += time.perf_counter() - started
+            found += len(exact & ann) / max(len(exact), 1)
+
+        count = max(len(samples), 1)
+        index = self.index_status([collection_name])[0]
+        return {
+            "collection_name": collection_name,
+            "quantization": collection.quantization,
+            "index_type": index["index_type"],
+            "search": index["search"],
+            "k": k,
+            "queries": len(samples),
+            "recall": round(found / count, 3),
+            "exact_ms": round(1000 * exact_seconds / count, 2),
+            "ann_ms": round(1000 * ann_seconds / count, 2),
+        }
 
     def delete_collection(self, collection_name: str):
         """Delete a collection from the vector store"""
@@ -196,18 +1260,31 @@ class VectorDB:
             # langchain_postgres uses langchain_pg_collection and langchain_pg_embedding tables
             with self._get_engine().connect() as conn:
                 # Find collection id
-                res = conn.execute(text("SELECT uuid FROM langchain_pg_collection WHERE name = :name"), {"name": collection_name}).fetchone()
+                res = conn.execute(text(
+                    "SELECT uuid, cmetadata->>'storage' FROM langchain_pg_collection WHERE name = :name"),
+                    {"name": collection_name}).fetchone()
                 if res:
-                    collection_uuid = res[0]
-                    # Delete embeddings
-                    conn.execute(text("DELETE FROM langchain_pg_embedding WHERE collection_id = :id"), {"id": collection_uuid})
+                    collection_uuid = uuid.UUID(str(res[0]))
+                    if res[1] == TABLE_STORAGE:
+                        # A collection with its own table goes at once, without leaving dead rows
+                        conn.execute(text(f"DROP TABLE IF EXISTS {_collection_table(collection_uuid)}"))
+                    else:
+                        # The partial ANN index would outlive its rows
+                        conn.execute(text(f'DROP INDEX IF EXISTS "{self._ann_index_name(collection_uuid)}"'))
+                        # Delete embeddings
+                        conn.execute(text("DELETE FROM langchain_pg_embedding WHERE collection_id = :id"),
+                                     {"id": collection_uuid})
                     # Delete collection
                     conn.execute(text("DELETE FROM langchain_pg_collection WHERE uuid = :id"), {"id": collection_uuid})
                     conn.commit()
+                    self.invalidate(collection_name)
                     logger.info(f"Deleted vector collection: {collection_name}")
         except Exception as e:
             logger.error(f"Error deleting vector collection {collection_name}: {str(e)}")
 
-    def _get_engine(self):
-        # Helper to get engine for manual SQL
-        return create_engine(self.connection_string)
+    def _get_engine(self) -> Engine:
+        # Pooled engine shared with the embedding cache and every cached vector store
+        return engine_registry.get_engine(self.connection_string)
+
+
+vector_db = VectorDB()
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from langchain_huggingface import HuggingFaceEmbeddings
+from app.config.env import EMBEDDING_MODEL, EMBED_BATCH_SIZE, EMBED_WORKERS
+from app.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingService(Embeddings):
+    """
+    The one embedding model of the process.
+
+    Every encode call runs in a dedicated executor, so callers on the event
+    loop can await it and ingestion threads don't compete with request
+    threads for the model. Documents are encoded in fixed size batches.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, batch_size: int = EMBED_BATCH_SIZE,
+                 workers: int = EMBED_WORKERS):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed")
+        self._model: Optional[Embeddings] = None
+        self._load_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._chunks = 0
+        self._chunk_seconds = 0.0
+        self._queries = 0
+        self._query_seconds = 0.0
+
+    def load(self) -> Embeddings:
+        """Load the model once, later calls return the loaded model."""
+        with self._load_lock:
+            if self._model is None:
+                logger.info(f"Loading embedding model: {self.model_name}")
+                started = time.perf_counter()
+                self._model = HuggingFaceEmbeddings(
+                    model_name=self.model_name,
+                    encode_kwargs={"batch_size": self.batch_size})
+                logger.info(f"Loaded embedding model in {time.perf_counter() - started:.1f}s")
+            return self._model
+
+    def preload(self):
+        """Start loading the model in the background without waiting for it."""
+        def report(future):
+            if future.exception():
+                # Not fatal, the next encode call tries again
+                logger.error(f"Failed to load embedding model {self.model_name}: {future.exception()}")
+
+        self._executor.submit(self.load).add_done_callback(report)
+
+    def _encode_documents(self, texts: List[str]) -> List[List[float]]:
+        model = self.load()
+        started = time.perf_counter()
+        vectors = model.embed_documents(texts)
+        with self._metrics_lock:
+            self._chunks += len(texts)
+            self._chunk_seconds += time.perf_counter() - started
+        return vectors
+
+    def _encode_query(self, text: str) -> List[float]:
+        model = self.load()
+        started = time.perf_counter()
+        vector = model.embed_query(text)
+        with self._metrics_lock:
+            self._queries += 1
+            self._query_seconds += time.perf_counter() - started
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        futures = [self._executor.submit(self._encode_documents, texts[start:start + self.batch_size])
+                   for start in range(0, len(texts), self.batch_size)]
+        return [vector for future in futures for vector in future.result()]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._executor.submit(self._encode_query, text).result()
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        futures = [asyncio.wrap_future(self._executor.submit(
+            self._encode_documents, texts[start:start + self.batch_size]))
+            for start in range(0, len(texts), self.batch_size)]
+        return [vector for batch in await asyncio.gather(*futures) for vector in batch]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await asyncio.wrap_future(self._executor.submit(self._encode_query, text))
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            return {
+                "model_name": self.model_name,
+                "loaded": self._model is not None,
+                "batch_size": self.batch_size,
+                "chunks_embedded": self._chunks,
+                "chunks_per_second": round(self._chunks / self._chunk_seconds, 1)
+                if self._chunk_seconds > 0 else None,
+                "queries_embedded": self._queries,
+                "avg_query_ms": round(1000 * self._query_seconds / self._queries, 1)
+                if self._queries else None,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+embedding_service = EmbeddingService()
@@ -18,3 +18,92 @@ os.environ["HF_TOKEN"] = os.getenv("HF_TOKEN")
 os.environ["LANGCHAIN_PROJECT"] = os.getenv("LANGCHAIN_PROJECT")
 # Enable tracing
 os.environ["LANGCHAIN_TRACING_V2"] = "false"
+
+# Connection pooling for external data sources
+EXTERNAL_DB_POOL_SIZE = int(os.getenv("EXTERNAL_DB_POOL_SIZE", 5))
+EXTERNAL_DB_MAX_OVERFLOW = int(os.getenv("EXTERNAL_DB_MAX_OVERFLOW", 5))
+EXTERNAL_DB_POOL_RECYCLE = int(os.getenv("EXTERNAL_DB_POOL_RECYCLE", 1800))
+ENGINE_REGISTRY_MAX_ENGINES = int(os.getenv("ENGINE_REGISTRY_MAX_ENGINES", 32))
+ENGINE_IDLE_TIMEOUT = int(os.getenv("ENGINE_IDLE_TIMEOUT", 900))
+
+# Comma separated ids of users allowed to read process-wide metrics, other
+# users only see the connection pools of their own data sources
+METRICS_ADMIN_USER_IDS = {int(user_id) for user_id in
+                          os.getenv("METRICS_ADMIN_USER_IDS", "").split(",") if user_id.strip()}
+
+# Schema catalog cache lifetime for external data sources (seconds)
+SCHEMA_CACHE_TTL = int(os.getenv("SCHEMA_CACHE_TTL", 600))
+
+# Bounds on rows fetched for a generated SQL query
+QUERY_MAX_ROWS = int(os.getenv("QUERY_MAX_ROWS", 5000))
+QUERY_MAX_BYTES = int(os.getenv("QUERY_MAX_BYTES", 10 * 1024 * 1024))
+QUERY_FETCH_BATCH = int(os.getenv("QUERY_FETCH_BATCH", 1000))
+
+# Most rows copied from one table into DuckDB for a query joining several data
+# sources, queries over bigger tables are refused instead of copied whole
+FEDERATED_MAX_ROWS = int(os.getenv("FEDERATED_MAX_ROWS", 500000))
+
+# Times a failing generated query is sent back to the SQL fixer with the database error
+SQL_REPAIR_ATTEMPTS = int(os.getenv("SQL_REPAIR_ATTEMPTS", 2))
+
+# Question to SQL cache: cosine similarity needed to reuse the SQL of an earlier
+# question (above 1 disables the cache) and questions kept per data source
+SQL_CACHE_THRESHOLD = float(os.getenv("SQL_CACHE_THRESHOLD", 0.92))
+SQL_CACHE_MAX_ENTRIES = int(os.getenv("SQL_CACHE_MAX_ENTRIES", 500))
+
+# Schema retrieval: most tables and estimated tokens of schema put in a prompt
+SCHEMA_TOP_K = int(os.getenv("SCHEMA_TOP_K", 8))
+SCHEMA_TOKEN_BUDGET = int(os.getenv("SCHEMA_TOKEN_BUDGET", 4000))
+
+# Rows per COPY chunk when bulk loading data frames into Postgres
+COPY_CHUNK_ROWS = int(os.getenv("COPY_CHUNK_ROWS", 50000))
+
+# Spreadsheet ingestion: bytes per spooled read and rows per parsed chunk
+SPOOL_CHUNK_BYTES = int(os.getenv("SPOOL_CHUNK_BYTES", 1024 * 1024))
+INGEST_CHUNK_ROWS = int(os.getenv("INGEST_CHUNK_ROWS", 100000))
+
+# Background ingestion jobs: worker threads and how long finished jobs are kept (seconds)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 2))
+INGEST_JOB_RETENTION = int(os.getenv("INGEST_JOB_RETENTION", 3600))
+
+# Shared embedding model: texts encoded per batch and threads running encode calls
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", 1))
+
+# PDF extraction: worker processes and pages extracted per task
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", 4))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", 8))
+
+# Full text search configuration of the document keyword index
+TEXT_SEARCH_CONFIG = os.getenv("TEXT_SEARCH_CONFIG", "english")
+
+# Hybrid document retrieval: chunks returned, candidates per ranking, rank fusion weights and constant
+RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", 4))
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", 20))
+RETRIEVAL_SEMANTIC_WEIGHT = float(os.getenv("RETRIEVAL_SEMANTIC_WEIGHT", 0.5))
+RETRIEVAL_KEYWORD_WEIGHT = float(os.getenv("RETRIEVAL_KEYWORD_WEIGHT", 0.5))
+RRF_K = int(os.getenv("RRF_K", 60))
+
+# Approximate nearest neighbour indexes per document collection: hnsw, ivfflat or none.
+# Collections with fewer chunks than ANN_MIN_ROWS are searched exactly.
+ANN_INDEX_TYPE = os.getenv("ANN_INDEX_TYPE", "hnsw")
+ANN_MIN_ROWS = int(os.getenv("ANN_MIN_ROWS", 1000))
+HNSW_M = int(os.getenv("HNSW_M", 16))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", 64))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", 40))
+# 0 picks one list per 1000 chunks
+IVFFLAT_LISTS = int(os.getenv("IVFFLAT_LISTS", 0))
+IVFFLAT_PROBES = int(os.getenv("IVFFLAT_PROBES", 10))
+
+# Storage of new document collections: shared (one langchain_pg_embedding table) or table (one table each)
+VECTOR_STORAGE = os.getenv("VECTOR_STORAGE", "shared")
+
+# Quantization of the ANN index of new document collections: none, half (halfvec) or binary.
+# Both need pgvector 0.7+. Binary shortlists QUANTIZED_RERANK_FACTOR times more candidates
+# and reranks them with the full precision embeddings.
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")
+QUANTIZED_RERANK_FACTOR = int(os.getenv("QUANTIZED_RERANK_FACTOR", 4))
+
+# Document collections whose vector store, retriever and layout are kept ready in memory
+VECTOR_STORE_CACHE_SIZE = int(os.getenv("VECTOR_STORE_CACHE_SIZE", 64))
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.config.env import DATABASE_URL, SCHEMA_CACHE_TTL
+from app.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Loads table schemas for a list of table names, or every table when None
+SchemaLoader = Callable[[Optional[List[str]]], List[Dict]]
+
+
+def table_fingerprint(schema: Dict) -> str:
+    """Stable hash of a table's column names, types and nullability."""
+    payload = json.dumps(
+        {"table_name": schema["table_name"], "schema": schema["schema"]}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SchemaCatalog:
+    """
+    Process-wide cache of table schemas keyed by (source, table).
+
+    Tables of the system database are cached until they are invalidated by an
+    upload or a delete. Tables of external sources expire after the TTL since
+    their schema can change without us knowing.
+    """
+
+    def __init__(self, ttl: int = SCHEMA_CACHE_TTL, system_source: str = DATABASE_URL):
+        self.ttl = ttl
+        self.system_source = system_source
+        self._tables: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # Sources whose complete table list is cached, with their load time
+        self._complete: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self, source: str, loaded_at: float) -> bool:
+        if source == self.system_source:
+            return True
+        return time.time() - loaded_at < self.ttl
+
+    def _store(self, source: str, schemas: List[Dict]):
+        now = time.time()
+        for schema in schemas:
+            self._tables[(source, schema["table_name"])] = {
+                "schema": schema,
+                "fingerprint": table_fingerprint(schema),
+                "loaded_at": now,
+            }
+
+    def _lookup(self, source: str, table_names: List[str],
+                count: bool = True) -> Tuple[Dict[str, Dict], List[str]]:
+        found, missing = {}, []
+        with self._lock:
+            for table_name in table_names:
+                entry = self._tables.get((source, table_name))
+                if entry and self._is_fresh(source, entry["loaded_at"]):
+                    found[table_name] = entry["schema"]
+                else:
+                    missing.append(table_name)
+            if count:
+                self.hits += len(found)
+                self.misses += len(missing)
+        return found, missing
+
+    def cached_schemas(self, source: str, table_names: List[str]) -> Optional[List[Dict]]:
+        """Return the schemas only when every table is cached and fresh."""
+        found, missing = self._lookup(source, table_names, count=False)
+        if missing:
+            return None
+        with self._lock:
+            self.hits += len(found)
+        return [found[table_name] for table_name in table_names]
+
+    def get_schemas(self, source: str, table_names: List[str], loader: SchemaLoader) -> List[Dict]:
+        """Return schemas for the tables, loading every cache miss in one call."""
+        found, missing = self._lookup(source, table_names)
+        if missing:
+            loaded = loader(missing)
+            with self._lock:
+                self._store(source, loaded)
+            found.update({schema["table_name"]: schema for schema in loaded})
+        return [found[table_name] for table_name in table_names if table_name in found]
+
+    def get_all_schemas(self, source: str, loader: SchemaLoader) -> List[Dict]:
+        """Return schemas for every table of a source."""
+        with self._lock:
+            loaded_at = self._complete.get(source)
+            if loaded_at is not None and self._is_fresh(source, loaded_at):
+                self.hits += 1
+                return [entry["schema"] for (entry_source, _), entry in sorted(self._tables.items())
+                        if entry_source == source]
+            self.misses += 1
+
+        loaded = loader(None)
+        with self._lock:
+            self._drop(source)
+            self._store(source, loaded)
+            self._complete[source] = time.time()
+        return loaded
+
+    def fingerprint(self, source: str, table_names: Optional[List[str]] = None) -> Optional[str]:
+        """Combined fingerprint of the cached tables of a source."""
+        with self._lock:
+            fingerprints = sorted(
+                entry["fingerprint"] for (entry_source, table_name), entry in self._tables.items()
+                if entry_source == source and (table_names is None or table_name in table_names))
+        if not fingerprints:
+            return None
+        return hashlib.sha256("".join(fingerprints).encode("utf-8")).hexdigest()
+
+    def _drop(self, source: str, table_name: Optional[str] = None):
+        for key in list(self._tables.keys()):
+            if key[0] == source and (table_name is None or key[1] == table_name):
+                del self._tables[key]
+        self._complete.pop(source, None)
+
+    def invalidate(self, source: Optional[str] = None, table_name: Optional[str] = None):
+        """Forget one table, every table of a source, or everything."""
+        with self._lock:
+            if source is None:
+                self._tables.clear()
+                self._complete.clear()
+            else:
+                self._drop(source, table_name)
+        logger.info(f"Invalidated schema cache entries for table: {table_name or '*'}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tables": len(self._tables),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+schema_catalog = SchemaCatalog()
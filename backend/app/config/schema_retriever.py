@@ -0,0 +1,151 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from app.config.db_config import vector_db
+from app.config.env import SCHEMA_TOP_K, SCHEMA_TOKEN_BUDGET
+from app.config.logging_config import get_logger
+from app.config.schema_catalog import table_fingerprint
+
+logger = get_logger(__name__)
+
+# Table description vectors kept in memory, the embedding cache keeps the rest
+INDEX_CAPACITY = 10000
+
+
+def estimate_tokens(schema: List[Dict]) -> int:
+    """Rough token count of schemas as they are formatted into prompts."""
+    return len(str(schema)) // 4
+
+
+def _describe(table: Dict) -> str:
+    """Text embedded for a table, its name and column names as words."""
+    columns = ", ".join(column["name"].replace("_", " ") for column in table["schema"])
+    return f"{table['table_name'].replace('_', ' ')}: {columns}"
+
+
+def _mentions(question: str, name: str) -> bool:
+    """Whether a lower cased question names a table or column, as is or with spaces."""
+    return any(re.search(rf"\b{re.escape(form)}\b", question)
+               for form in {name.lower(), name.lower().replace("_", " ")})
+
+
+class SchemaRetriever:
+    """
+    Picks the tables relevant to a question before the schema is prompted.
+
+    Every table is described by its name and column names, and the
+    descriptions are embedded once per table fingerprint. Tables are ranked by
+    similarity to the question, tables named in the question first, and the
+    top k are kept as long as they fit the token budget. When even the best
+    table does not fit, its columns are cut, columns named in the question first.
+    """
+
+    def __init__(self, embeddings: Embeddings, top_k: int = SCHEMA_TOP_K,
+                 token_budget: int = SCHEMA_TOKEN_BUDGET):
+        self.embeddings = embeddings
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self._index: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.questions = 0
+        self.pruned = 0
+        self.tables_in = 0
+        self.tables_out = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    def _table_vectors(self, schema: List[Dict]) -> np.ndarray:
+        fingerprints = [table_fingerprint(table) for table in schema]
+        with self._lock:
+            vectors = {fingerprint: self._index[fingerprint]
+                       for fingerprint in fingerprints if fingerprint in self._index}
+            for fingerprint in vectors:
+                self._index.move_to_end(fingerprint)
+
+        missing = {fingerprint: table for fingerprint, table in zip(fingerprints, schema)
+                   if fingerprint not in vectors}
+        if missing:
+            encoded = self.embeddings.embed_documents([_describe(table) for table in missing.values()])
+            vectors.update({fingerprint: np.asarray(vector, dtype=np.float32)
+                            for fingerprint, vector in zip(missing.keys(), encoded)})
+            with self._lock:
+                for fingerprint in missing:
+                    self._index[fingerprint] = vectors[fingerprint]
+                while len(self._index) > INDEX_CAPACITY:
+                    self._index.popitem(last=False)
+        return np.vstack([vectors[fingerprint] for fingerprint in fingerprints])
+
+    def _rank(self, question: str, schema: List[Dict]) -> List[int]:
+        matrix = self._table_vectors(schema)
+        vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+        scores = matrix @ vector / np.where(norms > 0, norms, 1)
+        # Similarities are at most 1, a table named in the question outranks them all
+        lowered = question.lower()
+        scores += np.array([_mentions(lowered, table["table_name"]) for table in schema],
+                           dtype=np.float32)
+        return [int(position) for position in np.argsort(-scores, kind="stable")]
+
+    def _fit_columns(self, question: str, table: Dict) -> Dict:
+        """Cut the columns of a table until it fits the token budget."""
+        lowered = question.lower()
+        columns = sorted(table["schema"], key=lambda column: not _mentions(lowered, column["name"]))
+        while len(columns) > 1 and estimate_tokens([{**table, "schema": columns}]) > self.token_budget:
+            columns = columns[:-1]
+        kept = {column["name"] for column in columns}
+        return {**table, "schema": [column for column in table["schema"] if column["name"] in kept]}
+
+    def select(self, question: str, schema: List[Dict]) -> List[Dict]:
+        """The part of the schema to prompt for a question, in the original table order."""
+        tokens = estimate_tokens(schema)
+        selected = schema
+        if len(schema) > self.top_k or tokens > self.token_budget:
+            try:
+                kept, used = {}, 0
+                for position in self._rank(question, schema)[:self.top_k]:
+                    table_tokens = estimate_tokens([schema[position]])
+                    if not kept and table_tokens > self.token_budget:
+                        kept[position] = self._fit_columns(question, schema[position])
+                        break
+                    if used + table_tokens > self.token_budget:
+                        continue
+                    kept[position] = schema[position]
+                    used += table_tokens
+                selected = [kept[position] for position in sorted(kept)]
+            except Exception as e:
+                # Prompting the whole schema is slower but still answers the question
+                logger.warning(f"Schema retrieval failed, using the whole schema: {str(e)}")
+                selected = schema
+
+        with self._lock:
+            self.questions += 1
+            self.pruned += selected is not schema
+            self.tables_in += len(schema)
+            self.tables_out += len(selected)
+            self.tokens_in += tokens
+            self.tokens_out += estimate_tokens(selected)
+        if selected is not schema:
+            logger.info(f"Schema retrieval kept {len(selected)} of {len(schema)} tables")
+        return selected
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "top_k": self.top_k,
+                "token_budget": self.token_budget,
+                "indexed_tables": len(self._index),
+                "questions": self.questions,
+                "pruned": self.pruned,
+                "tables_in": self.tables_in,
+                "tables_out": self.tables_out,
+                "prompt_tokens_in": self.tokens_in,
+                "prompt_tokens_out": self.tokens_out,
+                "prompt_reduction": round(1 - self.tokens_out / self.tokens_in, 3)
+                if self.tokens_in else None,
+            }
+
+
+schema_retriever = SchemaRetriever(vector_db.embeddings)
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import JSON, bindparam, text
+from sqlalchemy.engine import Engine
+from langchain_core.embeddings import Embeddings
+from app.config.db_config import engine_registry, vector_db
+from app.config.embedding_config import embedding_service
+from app.config.env import DATABASE_URL, SQL_CACHE_THRESHOLD, SQL_CACHE_MAX_ENTRIES
+from app.config.logging_config import get_logger
+from app.config.schema_catalog import table_fingerprint
+
+logger = get_logger(__name__)
+
+# Quoted values, and numbers or dates like 10, 2.5, 2024-01-31 or 01/31/2024
+LITERAL_PATTERN = re.compile(r"(?<!\w)'[^']+'(?!\w)|\"[^\"]+\"|\d+(?:[.,/:-]\d+)*")
+
+
+# String literals of a query, with '' as an escaped quote
+SQL_STRING_PATTERN = re.compile(r"'((?:[^']|'')*)'")
+
+
+def question_literals(question: str) -> List[str]:
+    """Values a question asks about that embeddings barely tell apart, e.g. top 5 or top 10."""
+    return sorted(LITERAL_PATTERN.findall(question))
+
+
+def sql_values_in_question(sql_query: str, question: str) -> bool:
+    """
+    Whether every text value a query filters on, like 'North' in
+    region = 'North', is named in the question. Numbers are covered by
+    comparing the literals of both questions.
+    """
+    lowered = question.lower()
+    for value in SQL_STRING_PATTERN.findall(sql_query):
+        value = value.replace("''", "'").strip("%_ ").lower()
+        if re.search(r"[^\W\d_]", value) and value not in lowered:
+            return False
+    return True
+
+
+class SQLCache:
+    """
+    Validated SQL of earlier questions, reused for similar questions.
+
+    Entries are kept in the system database per data source and schema
+    fingerprint, and a question matches the entry whose question embedding is
+    closest by cosine similarity, when it passes the threshold and both
+    questions hold the same numbers, dates and quoted values, and the text
+    values the cached SQL filters on are named in the new question. Entries written
+    for an older schema of a source are dropped on its next lookup. Cache
+    errors are logged and count as misses.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, db_url: str = DATABASE_URL,
+                 threshold: float = SQL_CACHE_THRESHOLD, max_entries: int = SQL_CACHE_MAX_ENTRIES):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.db_url = db_url
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def engine(self) -> Engine:
+        return engine_registry.get_engine(self.db_url)
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold <= 1
+
+    @staticmethod
+    def source_key(sources: List[Tuple[str, str]]) -> str:
+        """Key of the (source url, table name) pairs a question is asked against."""
+        payload = json.dumps(sorted(set(sources)))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def schema_fingerprint(schema: List[Dict]) -> str:
+        """Combined fingerprint of the table schemas of the workflow state."""
+        fingerprints = sorted(table_fingerprint(table) for table in schema)
+        return hashlib.sha256("".join(fingerprints).encode("utf-8")).hexdigest()
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, source_key: str, fingerprint: str, question: str) -> Optional[Dict[str, Any]]:
+        """The cached entry closest to the question, or None below the threshold."""
+        try:
+            with self.engine.begin() as conn:
+                # Queries written for an older schema of the source may no longer run
+                conn.execute(text(
+                    "DELETE FROM sql_cache WHERE source_key = :source_key "
+                    "AND schema_fingerprint <> :fingerprint"
+                ), {"source_key": source_key, "fingerprint": fingerprint})
+                rows = conn.execute(text(
+                    "SELECT id, embedding, question, sql_query, parsed_question FROM sql_cache "
+                    "WHERE source_key = :source_key AND model_name = :model_name"
+                ).columns(parsed_question=JSON),
+                    {"source_key": source_key, "model_name": self.model_name}).fetchall()
+            if not rows:
+                self._record(False)
+                return None
+
+            matrix = np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+            vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+            similarities = matrix @ vector / np.where(norms > 0, norms, 1)
+            # SQL written for other literals answers a different question
+            literals = question_literals(question)
+            same_literals = np.array([question_literals(row[2]) == literals
+                                      and sql_values_in_question(row[3], question) for row in rows])
+            similarities = np.where(same_literals, similarities, -1)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self._record(False)
+                return None
+
+            entry_id, _, _, sql_query, parsed_question = rows[best]
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    "UPDATE sql_cache SET hit_count = hit_count + 1, last_used_at = CURRENT_TIMESTAMP "
+                    "WHERE id = :id"
+                ), {"id": entry_id})
+            self._record(True)
+            return {"id": entry_id, "sql_query": sql_query, "parsed_question": parsed_question,
+                    "similarity": round(float(similarities[best]), 4)}
+        except Exception as e:
+            logger.warning(f"SQL cache lookup failed: {str(e)}")
+            self._record(False)
+            return None
+
+    def store(self, source_key: str, fingerprint: str, question: str, sql_query: str,
+              parsed_question: Optional[Dict[str, Any]] = None):
+        """Remember the SQL that answered a question, keeping the most recently used entries."""
+        try:
+            vector = np.asarray(self.embeddings.embed_query(question), dtype=np.float32)
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    "INSERT INTO sql_cache (source_key, schema_fingerprint, model_name, question, "
+                    "embedding, sql_query, parsed_question) VALUES (:source_key, :fingerprint, "
+                    ":model_name, :question, :embedding, :sql_query, :parsed_question)"
+                ).bindparams(bindparam("parsed_question", type_=JSON)),
+                    {"source_key": source_key, "fingerprint": fingerprint,
+                     "model_name": self.model_name, "question": question,
+                     "embedding": vector.tobytes(), "sql_query": sql_query,
+                     "parsed_question": parsed_question})
+                conn.execute(text(
+                    "DELETE FROM sql_cache WHERE source_key = :source_key AND id NOT IN ("
+                    "SELECT id FROM sql_cache WHERE source_key = :source_key "
+                    "ORDER BY last_used_at DESC, id DESC LIMIT :max_entries)"
+                ), {"source_key": source_key, "max_entries": self.max_entries})
+        except Exception as e:
+            logger.warning(f"SQL cache write failed: {str(e)}")
+
+    def forget(self, entry_id: int):
+        """Drop an entry whose query stopped working."""
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text("DELETE FROM sql_cache WHERE id = :id"), {"id": entry_id})
+        except Exception as e:
+            logger.warning(f"SQL cache delete failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+sql_cache = SQLCache(vector_db.embeddings, embedding_service.model_name)
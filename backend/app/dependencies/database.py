@@ -1,14 +1,13 @@
-from app.config.db_config import DB
+from app.config.db_config import AsyncDB
 from app.config.env import DATABASE_URL
-from sqlalchemy.orm import Session
-from typing import Tuple
+from typing import AsyncGenerator
 
-db = DB(DATABASE_URL)
+db = AsyncDB(DATABASE_URL)
 
 
-def get_db() -> DB:
+async def get_db() -> AsyncGenerator[AsyncDB, None]:
     try:
         yield db
     finally:
-        # session.close()
+        # Sessions are scoped per request inside the controllers
         pass
@@ -12,6 +12,8 @@ from app.langgraph.prompt_templates.analyst_prompts import (
     conversational_prompt
 )
 from app.langgraph.prompt_templates.graph_prompts import get_prompt
+from app.utils.chart_utils import build_chart_data
+from app.utils.sql_utils import strip_ansi
 from app.config.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -86,17 +88,53 @@ class SQLAgent:
             raise ValueError("LLM or JSON Parser is not initialized.")
 
         chain = fix_sql_query_prompt | self.llm | self.json_parser
-        response = chain.invoke({"schema": schema, "sql_query": sql_query})
+        response = chain.invoke({"schema": schema, "sql_query": sql_query,
+                                 "sql_issues": strip_ansi(state.get("sql_issues") or "None")})
 
+        # The workflow validates the result again, these attempts bound that loop
+        repair_attempts = (state.get("repair_attempts") or 0) + 1
         if response["valid"] and response["issues"] is None:
-            return {"sql_query": sql_query, "sql_valid": True}
+            return {"sql_query": sql_query, "sql_valid": True, "repair_attempts": repair_attempts}
         else:
+            corrected_query = response.get("corrected_query")
+            if not corrected_query or corrected_query == "None":
+                corrected_query = sql_query
             return {
-                "sql_query": response["corrected_query"],
+                "sql_query": corrected_query,
                 "sql_valid": response["valid"],
-                "sql_issues": response["issues"]
+                "sql_issues": response["issues"],
+                "repair_attempts": repair_attempts,
             }
 
+    def repair_sql(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info("========= repair_sql ========")
+        required_keys = ["schema", "sql_query", "error"]
+        missing_keys = [key for key in required_keys if key not in state]
+
+        if missing_keys:
+            raise ValueError(
+                f"Missing required keys in state: {', '.join(missing_keys)}")
+
+        sql_query = state['sql_query']
+        issues = f"The query failed in the database with this error: {strip_ansi(state['error'])}"
+
+        if not self.llm or not self.json_parser:
+            raise ValueError("LLM or JSON Parser is not initialized.")
+
+        chain = fix_sql_query_prompt | self.llm | self.json_parser
+        response = chain.invoke(
+            {"schema": state['schema'], "sql_query": sql_query, "sql_issues": issues})
+
+        corrected_query = response.get("corrected_query")
+        if not corrected_query or corrected_query == "None":
+            corrected_query = sql_query
+        return {
+            "sql_query": corrected_query,
+            "sql_valid": False,
+            "sql_issues": issues,
+            "repair_attempts": (state.get("repair_attempts") or 0) + 1,
+        }
+
     def format_results(self, state: Dict[str, Any]) -> Dict[str, Any]:
         logger.info("========= format_results ========")
         required_keys = ["schema", "query_result"]
@@ -161,9 +199,15 @@ class SQLAgent:
         if results == "NOT_RELEVANT":
             return {"answer": "Sorry, I can only give answers relevant to the database."}
 
-        if recommended_visualization == "none":
+        if recommended_visualization == "none" or not results:
             return {"formatted_data_for_visualization": None}
 
+        # Shape the rows directly, the LLM is only asked when the column roles are unclear
+        chart_data = build_chart_data(results, recommended_visualization)
+        if chart_data is not None:
+            return {"formatted_data_for_visualization": chart_data}
+
+        logger.info(f"Ambiguous columns for a {recommended_visualization} chart, asking the LLM")
         prompt = get_prompt(recommended_visualization)
         chain = prompt | self.llm | self.json_parser
         response = chain.invoke({"question": question, "data": results})
@@ -178,6 +178,9 @@ fix_sql_query_prompt = ChatPromptTemplate.from_messages([
     ===Generated SQL query:
     {sql_query}
 
+    ===Issues found by the local validator:
+    {sql_issues}
+
     Respond in JSON format with the following structure. Only respond with the JSON Please return the result in a valid JSON format. Do not use backticks, code blocks, or any extra characters:
     {{
         "valid": boolean,
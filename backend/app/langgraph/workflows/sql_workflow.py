@@ -1,11 +1,16 @@
-from typing import List, Any, Annotated, Dict, Optional
+from typing import List, Any, Annotated, Dict, Optional, Tuple
 from typing_extensions import TypedDict
 import operator
 from langchain_core.language_models import BaseLLM
 from langgraph.graph import START, END, StateGraph
 from app.langgraph.agents.sql_agent import SQLAgent
-from app.config.db_config import DB
+from app.config.db_config import DB, collect_rows
+from app.config.sql_cache import SQLCache, sql_cache
+from app.config.env import FEDERATED_MAX_ROWS, QUERY_FETCH_BATCH, SQL_REPAIR_ATTEMPTS
 from app.config.logging_config import get_logger
+from app.utils.sql_utils import referenced_columns, sqlglot_dialect, validate_sql
+from sqlalchemy import column, literal_column, select, table as sql_table
+from sqlalchemy.engine import make_url
 import datetime
 from decimal import Decimal
 import pandas as pd
@@ -32,6 +37,12 @@ def clean_sql_query(query):
     return cleaned
 
 
+def involved_sources(query: str, source_map: Dict[str, str]) -> set:
+    """Sources whose tables appear in a query."""
+    # Rough check: which keys in source_map are present in the query?
+    return {source for table, source in source_map.items() if table.lower() in query.lower()}
+
+
 class AgentState(TypedDict):
     question: str
     schema: List[Dict]
@@ -41,6 +52,9 @@ class AgentState(TypedDict):
     sql_valid: Optional[bool]
     sql_issues: Optional[str]
     query_result: Optional[List[Any]]
+    truncated: Optional[bool]
+    repair_attempts: Optional[int]
+    sql_cache_id: Optional[int]
     recommended_visualization: Optional[str]
     reason: Optional[str]
     results: Optional[List[Any]]
@@ -54,9 +68,12 @@ class AgentState(TypedDict):
 
 
 class WorkflowManager:
-    def __init__(self, llm: BaseLLM, db: DB):
+    def __init__(self, llm: BaseLLM, db: DB, max_repairs: int = SQL_REPAIR_ATTEMPTS,
+                 cache: SQLCache = sql_cache):
         self.llm = llm
         self.db = db
+        self.max_repairs = max_repairs
+        self.cache = cache
         self.sql_agent = SQLAgent(llm)
 
     def serialize_row(self, row):
@@ -84,6 +101,90 @@ class WorkflowManager:
             return self.serialize_row(value)
         return value
 
+    def cache_keys(self, state: Dict[str, Any]) -> Tuple[str, str]:
+        """SQL cache key of the sources and tables of the question, and their schema fingerprint."""
+        source_map = state.get('source_map') or {}
+        sources = []
+        for table in state['schema']:
+            source = source_map.get(table["table_name"], "system")
+            sources.append((self.db.db_url if source == "system" else source, table["table_name"]))
+        return SQLCache.source_key(sources), SQLCache.schema_fingerprint(state['schema'])
+
+    def check_sql_cache(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Reuse the validated SQL of a similar earlier question on the same schema."""
+        logger.info("========= check_sql_cache ========")
+        if not self.cache.enabled or not state.get('schema'):
+            return None
+        entry = self.cache.lookup(*self.cache_keys(state), state['question'])
+        if entry is None:
+            return None
+        logger.info(f"SQL cache hit with similarity {entry['similarity']}")
+        return {
+            "parsed_question": entry["parsed_question"],
+            "sql_query": entry["sql_query"],
+            "sql_valid": True,
+            "sql_cache_id": entry["id"],
+        }
+
+    def after_cache_check(self, state: Dict[str, Any]) -> str:
+        """Cache hits skip parsing and generating the query, only the local validator runs."""
+        return "validate_sql_locally" if state.get("sql_cache_id") else "parse_question"
+
+    def execute_sql(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the query, and keep the SQL cache in step with how it went."""
+        result = self.run_sql_query(state)
+        if not self.cache.enabled or state.get('sql_query') == "NOT_RELEVANT":
+            return result
+
+        cache_id = state.get("sql_cache_id")
+        if result.get("error"):
+            if cache_id:
+                # The cached query stopped working, e.g. the data behind it changed
+                self.cache.forget(cache_id)
+        elif result.get("query_result") and (not cache_id or state.get("repair_attempts")):
+            self.cache.store(*self.cache_keys(state), state['question'], state['sql_query'],
+                             state.get('parsed_question'))
+        return result
+
+    def query_dialect(self, query: str, source_map: Dict[str, str]) -> Optional[str]:
+        """The sqlglot dialect a query runs in, following the routing of run_sql_query."""
+        involved = involved_sources(query, source_map)
+        if len(involved) > 1:
+            return "duckdb"
+        source_url = next(iter(involved), "system")
+        if source_url == "system":
+            return sqlglot_dialect(self.db.engine.dialect.name)
+        return sqlglot_dialect(make_url(source_url).get_backend_name())
+
+    def validate_sql_locally(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info("========= validate_sql_locally ========")
+        query = state['sql_query']
+        if query == "NOT_RELEVANT":
+            return {"sql_query": query, "sql_valid": True}
+
+        cleaned_query = clean_sql_query(query)
+        try:
+            issues = validate_sql(
+                cleaned_query, state['schema'],
+                self.query_dialect(cleaned_query, state.get('source_map') or {}))
+        except Exception as e:
+            # A query the validator could not check is not run unchecked
+            logger.warning(f"Local SQL validation failed to run: {str(e)}")
+            issues = [f"Local validation could not run: {str(e)}"]
+
+        if issues:
+            logger.info(f"Local SQL validation found issues: {issues}")
+            return {"sql_query": query, "sql_valid": False, "sql_issues": "; ".join(issues)}
+        return {"sql_query": query, "sql_valid": True}
+
+    def after_local_validation(self, state: Dict[str, Any]) -> str:
+        """Only run queries the local validator accepted, rejected ones go to the fixer a bounded number of times."""
+        if state.get("sql_valid"):
+            return "execute_sql"
+        if (state.get("repair_attempts") or 0) < self.max_repairs:
+            return "validate_and_fix_sql"
+        return "report_no_data"
+
     def run_sql_query(self, state: Dict[str, Any]) -> Dict[str, Any]:
         print("========== run_sql_query ==========")
         query = state['sql_query']
@@ -98,69 +199,125 @@ class WorkflowManager:
 
         try:
             # 1. Identify involved tables
-            # Rough check: which keys in source_map are present in the query?
-            involved_sources = set()
-            for table, source in source_map.items():
-                # use word boundaries or just check if table is in query
-                if table.lower() in cleaned_query.lower():
-                    involved_sources.add(source)
+            involved = involved_sources(cleaned_query, source_map)
 
             # 2. Case A: Single Source (Standard Flow)
-            if len(involved_sources) <= 1:
+            if len(involved) <= 1:
                 target_db = self.db
-                if involved_sources:
-                    source_url = list(involved_sources)[0]
+                if involved:
+                    source_url = list(involved)[0]
                     if source_url != "system":
                         target_db = DB(source_url)
                 
-                result = target_db.execute_query(cleaned_query)
-                serialized_result = [self.serialize_row(row) for row in result]
-                return {"query_result": serialized_result}
+                # Rows are serialized as they stream in and capped by the
+                # configured row and byte budgets
+                result = target_db.stream_query(
+                    cleaned_query, serialize=self.serialize_row)
+                return {"query_result": result["rows"], "truncated": result["truncated"], "error": None}
 
             # 3. Case B: Multi-Source Join (Federated Flow)
-            logger.info(f"Multi-source join detected across {len(involved_sources)} sources")
+            logger.info(f"Multi-source join detected across {len(involved)} sources")
             
             import duckdb
             # Create a DuckDB connection for in-memory join
             duck_conn = duckdb.connect(database=':memory:')
             
             # Fetch involved tables into Pandas dataframes and register with DuckDB
+            table_columns = {schema["table_name"]: [entry["name"] for entry in schema["schema"]]
+                             for schema in state.get('schema') or []}
+            used_columns = referenced_columns(cleaned_query, "duckdb")
             for table, source in source_map.items():
                 if table.lower() in cleaned_query.lower():
                     # Fetch table
                     source_db = self.db if source == "system" else DB(source)
-                    # Use pandas to read the entire table (or we could try to be smarter and filter)
-                    # For a massive feature, we'll fetch the whole table for now
-                    df = pd.read_sql(f'SELECT * FROM "{table}"', source_db.engine)
-                    duck_conn.register(table, df)
+                    # Only the columns the query uses are copied, and at most
+                    # FEDERATED_MAX_ROWS rows, the cap is read with the table
+                    names = table_columns.get(table) or []
+                    if used_columns is not None:
+                        names = [name for name in names if name.lower() in used_columns] or names[:1]
+                    statement = select(
+                        *[column(name) for name in names] or [literal_column("*")]
+                    ).select_from(sql_table(table))
+                    # Copy the table into DuckDB chunk by chunk so only one
+                    # chunk is held in pandas at a time
+                    chunks = pd.read_sql(statement.limit(FEDERATED_MAX_ROWS + 1), source_db.engine,
+                                         chunksize=QUERY_FETCH_BATCH)
+                    created, copied = False, 0
+                    for chunk in chunks:
+                        copied += len(chunk)
+                        if copied > FEDERATED_MAX_ROWS:
+                            raise ValueError(
+                                f"Table {table} has more than {FEDERATED_MAX_ROWS} rows, "
+                                "too many to join across data sources")
+                        duck_conn.register("incoming_chunk", chunk)
+                        if created:
+                            duck_conn.execute(f'INSERT INTO "{table}" SELECT * FROM incoming_chunk')
+                        else:
+                            duck_conn.execute(f'CREATE TABLE "{table}" AS SELECT * FROM incoming_chunk')
+                            created = True
+                        duck_conn.unregister("incoming_chunk")
+                    if not created:
+                        empty = pd.read_sql(statement.limit(0), source_db.engine)
+                        duck_conn.register(table, empty)
             
             # Execute the cross-source query in DuckDB
-            final_df = duck_conn.execute(cleaned_query).df()
-            
-            # Convert results to list of dicts
-            serialized_result = final_df.to_dict(orient='records')
-            # Handle Decimals/Dates in the dict
-            serialized_result = [
-                {k: self.serialize_value(v) for k, v in row.items()}
-                for row in serialized_result
-            ]
+            cursor = duck_conn.execute(cleaned_query)
+            columns = [column[0] for column in cursor.description]
+
+            def duck_rows():
+                while True:
+                    batch = cursor.fetchmany(QUERY_FETCH_BATCH)
+                    if not batch:
+                        return
+                    yield from batch
+
+            # Handle Decimals/Dates in the dict and stop at the result budget
+            result = collect_rows(
+                duck_rows(),
+                serialize=lambda row: {k: self.serialize_value(v) for k, v in zip(columns, row)})
             
-            return {"query_result": serialized_result}
+            return {"query_result": result["rows"], "truncated": result["truncated"], "error": None}
 
         except Exception as e:
             logger.error(f"Error executing query: {str(e)}")
-            return {"query_result": [], "error": str(e)}
+            # The driver's own message, without the statement SQLAlchemy appends
+            return {"query_result": [], "error": str(getattr(e, "orig", None) or e).strip()}
+
+    def after_execution(self, state: Dict[str, Any]):
+        """Repair failed queries a few times, and only describe and chart actual data."""
+        if state.get("error") and (state.get("repair_attempts") or 0) < self.max_repairs:
+            return "repair_sql"
+        if state.get("error") or not state.get("query_result"):
+            return "report_no_data"
+        return ["format_results", "choose_visualization"]
+
+    def report_no_data(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer without an LLM call when there is no data to describe."""
+        logger.info("========= report_no_data ========")
+        if state.get("sql_query") == "NOT_RELEVANT":
+            return {"answer": "Sorry, I can only give answers relevant to the database."}
+        if state.get("sql_valid") is False:
+            return {"answer": "Sorry, I could not write a valid read-only query for this question. "
+                              f"The query had these issues: {state.get('sql_issues')}"}
+        if state.get("error"):
+            return {"answer": "Sorry, I could not run a query for this question. "
+                              f"The database returned: {state['error']}"}
+        return {"answer": "The query ran but returned no rows."}
 
     def create_workflow(self) -> StateGraph:
         """Create and configure the workflow graph."""
         workflow = StateGraph(AgentState)
 
         # Add nodes to the graph
+        workflow.add_node("check_sql_cache", self.check_sql_cache)
         workflow.add_node("parse_question", self.sql_agent.get_parse_question)
         workflow.add_node("generate_sql", self.sql_agent.generate_sql_query)
+        workflow.add_node("validate_sql_locally", self.validate_sql_locally)
         workflow.add_node("validate_and_fix_sql",
                           self.sql_agent.validate_and_fix_sql)
-        workflow.add_node("execute_sql", self.run_sql_query)
+        workflow.add_node("execute_sql", self.execute_sql)
+        workflow.add_node("repair_sql", self.sql_agent.repair_sql)
+        workflow.add_node("report_no_data", self.report_no_data)
         workflow.add_node("format_results", self.sql_agent.format_results)
         workflow.add_node("choose_visualization",
                           self.sql_agent.choose_visualization)
@@ -172,7 +329,12 @@ class WorkflowManager:
                           self.sql_agent.conversational_response)
 
         # Define edges
-        workflow.add_edge(START, "parse_question")
+        workflow.add_edge(START, "check_sql_cache")
+        workflow.add_conditional_edges(
+            "check_sql_cache",
+            self.after_cache_check,
+            ["validate_sql_locally", "parse_question"]
+        )
 
         # Add conditional edge to check if the conversation should continue or end
         workflow.add_conditional_edges(
@@ -180,10 +342,25 @@ class WorkflowManager:
             self.should_continue  # Conditional function to determine the next node
         )
 
-        workflow.add_edge("generate_sql", "validate_and_fix_sql")
-        workflow.add_edge("validate_and_fix_sql", "execute_sql")
-        workflow.add_edge("execute_sql", "format_results")
-        workflow.add_edge("execute_sql", "choose_visualization")
+        workflow.add_edge("generate_sql", "validate_sql_locally")
+        # Only queries the local validator accepts are executed, fixed queries
+        # are validated again and refused once the fix attempts run out
+        workflow.add_conditional_edges(
+            "validate_sql_locally",
+            self.after_local_validation,
+            ["execute_sql", "validate_and_fix_sql", "report_no_data"]
+        )
+        workflow.add_edge("validate_and_fix_sql", "validate_sql_locally")
+        # Failed queries go back to the fixer with the database error, a bounded
+        # number of times, and the repaired query is validated again before it
+        # runs. The answer and chart nodes only run on data
+        workflow.add_conditional_edges(
+            "execute_sql",
+            self.after_execution,
+            ["repair_sql", "report_no_data", "format_results", "choose_visualization"]
+        )
+        workflow.add_edge("repair_sql", "validate_sql_locally")
+        workflow.add_edge("report_no_data", END)
         workflow.add_edge("choose_visualization",
                           "format_data_for_visualization")
         workflow.add_edge("format_data_for_visualization", END)
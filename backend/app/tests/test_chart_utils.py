@@ -0,0 +1,52 @@
+import json
+import unittest
+from app.utils.chart_utils import build_chart_data
+
+
+class TestBuildChartData(unittest.TestCase):
+
+    def test_bar_from_label_and_values(self):
+        rows = [{"city": "Paris", "sales": 10.5, "orders": 3},
+                {"city": "Rome", "sales": None, "orders": 4}]
+        chart = build_chart_data(rows, "bar")
+        self.assertEqual(chart, {
+            "labels": ["Paris", "Rome"],
+            "values": [{"data": [10.5, None], "label": "sales"},
+                       {"data": [3, 4], "label": "orders"}],
+        })
+        # Missing values must not leak out as NaN
+        json.dumps(chart, allow_nan=False)
+
+    def test_line_pivots_long_data(self):
+        rows = [{"month": "2024-01", "region": "north", "total": 1},
+                {"month": "2024-01", "region": "south", "total": 2},
+                {"month": "2024-02", "region": "north", "total": 3}]
+        chart = build_chart_data(rows, "line")
+        self.assertEqual(chart["xValues"], ["2024-01", "2024-02"])
+        self.assertEqual(chart["yValues"], [{"data": [1, 3], "label": "north"},
+                                            {"data": [2, None], "label": "south"}])
+
+    def test_integer_key_column_is_the_category(self):
+        rows = [{"year": 2022, "revenue": 5.0}, {"year": 2023, "revenue": 7.0}]
+        self.assertEqual(build_chart_data(rows, "pie"),
+                         [{"label": "2022", "value": 5.0}, {"label": "2023", "value": 7.0}])
+
+    def test_scatter_groups_points_by_label(self):
+        rows = [{"kind": "a", "height": 1.0, "weight": 2.0},
+                {"kind": "b", "height": 3.0, "weight": 4.0},
+                {"kind": "a", "height": 5.0, "weight": 6.0}]
+        chart = build_chart_data(rows, "scatter")
+        self.assertEqual(chart["series"][0], {"label": "a", "data": [
+            {"x": 1.0, "y": 2.0, "id": 0}, {"x": 5.0, "y": 6.0, "id": 2}]})
+        self.assertEqual(chart["series"][1]["label"], "b")
+
+    def test_ambiguous_roles_fall_back(self):
+        rows = [{"a": 1.5, "b": 2.0, "c": 3.0}]
+        self.assertIsNone(build_chart_data(rows, "bar"))
+        self.assertIsNone(build_chart_data(rows, "scatter"))
+        self.assertIsNone(build_chart_data([{"city": "Paris", "a": 1, "b": 2}], "pie"))
+        self.assertIsNone(build_chart_data([{"city": "Paris", "a": 1}], "radar"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import pandas as pd
+from app.utils.dtype_utils import compact_dataframe, memory_usage
+
+
+class TestCompactDataframe(unittest.TestCase):
+
+    def test_compact_dataframe(self):
+        df = pd.DataFrame({
+            "id": range(100),
+            "qty": [None if i % 10 == 0 else float(i) for i in range(100)],
+            "price": [19.99] * 100,
+            "precise": [i * 1234567.891 for i in range(100)],
+            "flag": ["Yes" if i % 2 else "no" for i in range(100)],
+            "count": [str(i) for i in range(100)],
+            "zip": [f"0{i:04d}" for i in range(100)],
+            "day": [f"2024-01-{i % 28 + 1:02d}" for i in range(100)],
+            "city": [f"c{i % 5}" for i in range(100)],
+            "name": [f"name{i}" for i in range(100)],
+        }).astype({"flag": object, "count": object, "zip": object, "day": object,
+                   "city": object, "name": object})
+
+        compacted = compact_dataframe(df)
+
+        dtypes = {name: str(dtype) for name, dtype in compacted.dtypes.items()}
+        self.assertEqual(dtypes["id"], "int8")
+        self.assertEqual(dtypes["qty"], "Int8")
+        self.assertEqual(dtypes["price"], "float32")
+        self.assertEqual(dtypes["precise"], "float64")
+        self.assertEqual(dtypes["flag"], "boolean")
+        self.assertEqual(dtypes["count"], "int8")
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(compacted["day"]))
+        self.assertEqual(dtypes["city"], "category")
+        self.assertEqual(compacted["zip"].tolist(), df["zip"].tolist())
+        self.assertEqual(compacted["name"].tolist(), df["name"].tolist())
+        self.assertLess(memory_usage(compacted), memory_usage(df))
+
+    def test_letters_and_text_columns_stay_text(self):
+        df = pd.DataFrame({
+            "gender": ["F"] * 10,
+            "day": ["01/02/2020"] * 10,
+            "price": [19.99] * 10,
+        }).astype({"gender": object, "day": object})
+
+        compacted = compact_dataframe(df, text_columns={"day", "price"})
+
+        self.assertEqual(compacted["gender"].astype(str).tolist(), ["F"] * 10)
+        self.assertEqual(compacted["day"].tolist(), ["01/02/2020"] * 10)
+        self.assertEqual(compacted["price"].tolist(), ["19.99"] * 10)
+
+    def test_only_full_dates_become_datetimes(self):
+        df = pd.DataFrame({
+            "time": ["10:30", "11:45"] * 10,
+            "range": ["1-2", "3-4"] * 10,
+            "partial": ["2024-01", "2024-02"] * 10,
+            "mixed": ["2024-01-02", "unknown"] * 10,
+            "mixed_formats": ["2024-01-02", "01/03/2024"] * 10,
+            "us": ["01/31/2024", "02/01/2024"] * 10,
+            "iso": ["2024-01-02T10:00", "2024-01-03"] * 10,
+        }).astype(object)
+
+        compacted = compact_dataframe(df)
+
+        for name in ("time", "range", "partial", "mixed", "mixed_formats"):
+            self.assertEqual(compacted[name].astype(str).tolist(), df[name].tolist(), name)
+        self.assertEqual(compacted["us"].iloc[0], pd.Timestamp("2024-01-31"))
+        self.assertEqual(compacted["iso"].iloc[0], pd.Timestamp("2024-01-02 10:00"))
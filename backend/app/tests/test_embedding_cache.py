@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from sqlalchemy import text
+from app.config.db_config import CachedEmbeddings, engine_registry
+
+
+class TestCachedEmbeddings(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        db_url = f"sqlite:///{self.path}"
+        with engine_registry.get_engine(db_url).begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE embedding_cache (model_name VARCHAR(200), text_hash VARCHAR(64), "
+                "embedding BLOB NOT NULL, PRIMARY KEY (model_name, text_hash))"))
+
+        fake = DeterministicFakeEmbedding(size=8)
+        self.service = MagicMock(model_name="fake-model")
+        self.service.embed_documents.side_effect = fake.embed_documents
+        self.service.embed_query.side_effect = fake.embed_query
+        self.cache = CachedEmbeddings(self.service, db_url)
+
+    def tearDown(self):
+        engine_registry.dispose()
+        os.remove(self.path)
+
+    def test_only_cache_misses_are_encoded(self):
+        first = self.cache.embed_documents(["a", "b", "a"])
+        second = self.cache.embed_documents(["a", "b", "c"])
+
+        self.assertEqual(self.service.embed_documents.call_args_list[0].args, (["a", "b"],))
+        self.assertEqual(self.service.embed_documents.call_args_list[1].args, (["c"],))
+        for cached, computed in zip(second[:2], first[:2]):
+            self.assertEqual(len(cached), 8)
+            self.assertAlmostEqual(cached[0], computed[0], places=5)
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+    def test_queries_are_cached_separately(self):
+        self.cache.embed_documents(["question"])
+        self.cache.embed_query("question")
+        self.cache.embed_query("question")
+
+        self.service.embed_query.assert_called_once_with("question")
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 2, "hit_rate": 0.333})
@@ -0,0 +1,33 @@
+import asyncio
+import unittest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from app.config.embedding_config import EmbeddingService
+
+
+class TestEmbeddingService(unittest.TestCase):
+
+    def setUp(self):
+        self.service = EmbeddingService(batch_size=4, workers=1)
+        self.service._model = DeterministicFakeEmbedding(size=8)
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    def test_embed_documents_in_batches(self):
+        texts = [f"chunk {i}" for i in range(10)]
+
+        vectors = self.service.embed_documents(texts)
+
+        self.assertEqual(len(vectors), 10)
+        self.assertEqual(vectors, DeterministicFakeEmbedding(size=8).embed_documents(texts))
+        self.assertEqual(self.service.metrics()["chunks_embedded"], 10)
+
+    def test_async_embedding_matches_sync(self):
+        texts = ["a", "b", "c", "d", "e"]
+
+        vectors = asyncio.run(self.service.aembed_documents(texts))
+        query = asyncio.run(self.service.aembed_query("a"))
+
+        self.assertEqual(vectors, self.service.embed_documents(texts))
+        self.assertEqual(query, self.service.embed_query("a"))
+        self.assertEqual(self.service.metrics()["queries_embedded"], 2)
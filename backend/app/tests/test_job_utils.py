@@ -0,0 +1,64 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+from app.utils.job_utils import IngestionJobs, COMPLETED, FAILED
+
+
+class TestIngestionJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.jobs = IngestionJobs(max_workers=1)
+
+    def tearDown(self):
+        self.jobs.shutdown(wait=True)
+
+    def _wait(self, job_id, user_id=1):
+        self.jobs.shutdown(wait=True)
+        return self.jobs.get(job_id, user_id)
+
+    def test_completed_job_reports_progress_and_result(self):
+        def work(job_id):
+            self.jobs.progress(job_id, rows=10, chunks=1)
+            return {"data_source_id": 42}
+
+        job = self.jobs.submit(1, "spreadsheet", "people.csv", work)
+        finished = self._wait(job["job_id"])
+
+        self.assertEqual(finished["phase"], COMPLETED)
+        self.assertEqual(finished["rows_processed"], 10)
+        self.assertEqual(finished["data_source_id"], 42)
+        self.assertIsNotNone(finished["finished_at"])
+
+    def test_failed_job_records_error(self):
+        def work(job_id):
+            raise ValueError("bad file")
+
+        job = self.jobs.submit(1, "spreadsheet", "people.csv", work)
+        finished = self._wait(job["job_id"])
+
+        self.assertEqual(finished["phase"], FAILED)
+        self.assertEqual(finished["error"], "bad file")
+
+    def test_jobs_cancelled_at_shutdown_are_cleaned_up(self):
+        started, release = threading.Event(), threading.Event()
+
+        def block(job_id):
+            started.set()
+            release.wait(5)
+
+        running_cleanup, queued_cleanup = MagicMock(), MagicMock()
+        self.jobs.submit(1, "spreadsheet", "first.csv", block, cleanup=running_cleanup)
+        queued = self.jobs.submit(1, "spreadsheet", "second.csv", lambda job_id: {}, cleanup=queued_cleanup)
+        started.wait(5)
+        self.jobs.shutdown()
+        release.set()
+
+        queued_cleanup.assert_called_once()
+        running_cleanup.assert_not_called()
+        self.assertEqual(self.jobs.get(queued["job_id"], 1)["phase"], FAILED)
+
+    def test_jobs_are_private_to_their_user(self):
+        job = self.jobs.submit(1, "document", "notes.txt", lambda job_id: {})
+
+        self.assertIsNone(self.jobs.get(job["job_id"], 2))
+        self.assertEqual(self.jobs.list(2), [])
@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import MagicMock
+from app.config.schema_retriever import SchemaRetriever, estimate_tokens
+
+TOPICS = ["revenue", "customer", "shipment", "employee"]
+
+
+def fake_embed(text):
+    # One dimension per topic word, so tables about a topic match questions about it
+    return [float(topic in text.lower()) + 0.01 for topic in TOPICS]
+
+
+def table(name, columns):
+    return {"table_name": name, "schema": [{"name": column, "type": "TEXT", "nullable": True}
+                                           for column in columns]}
+
+
+SCHEMA = [
+    table("orders", ["order_id", "revenue", "region"]),
+    table("customers", ["customer_id", "customer_name"]),
+    table("shipments", ["shipment_id", "carrier"]),
+    table("employees", ["employee_id", "salary"]),
+    table("audit_log", ["event", "changed_at"]),
+]
+
+
+class TestSchemaRetriever(unittest.TestCase):
+
+    def setUp(self):
+        self.embeddings = MagicMock()
+        self.embeddings.embed_documents.side_effect = lambda texts: [fake_embed(text) for text in texts]
+        self.embeddings.embed_query.side_effect = fake_embed
+
+    def test_keeps_the_top_k_relevant_tables(self):
+        retriever = SchemaRetriever(self.embeddings, top_k=2, token_budget=10000)
+
+        selected = retriever.select("total revenue per customer", SCHEMA)
+        self.assertEqual([t["table_name"] for t in selected], ["orders", "customers"])
+        # Tables named in the question win over similarity
+        selected = retriever.select("revenue and salary changes in the audit_log", SCHEMA)
+        self.assertEqual([t["table_name"] for t in selected], ["orders", "audit_log"])
+
+        # Descriptions are embedded once per table
+        self.assertEqual(self.embeddings.embed_documents.call_count, 1)
+        stats = retriever.stats()
+        self.assertEqual((stats["pruned"], stats["tables_in"], stats["tables_out"]), (2, 10, 4))
+        self.assertGreater(stats["prompt_reduction"], 0)
+
+    def test_small_schemas_are_left_alone(self):
+        retriever = SchemaRetriever(self.embeddings, top_k=8, token_budget=10000)
+        self.assertIs(retriever.select("anything", SCHEMA), SCHEMA)
+        self.embeddings.embed_documents.assert_not_called()
+
+    def test_token_budget_cuts_columns(self):
+        wide = [table("metrics", [f"metric_{i}" for i in range(200)] + ["revenue"])]
+        retriever = SchemaRetriever(self.embeddings, top_k=8, token_budget=200)
+
+        selected = retriever.select("show revenue", wide)
+        self.assertLessEqual(estimate_tokens(selected), 200)
+        self.assertIn("revenue", [column["name"] for column in selected[0]["schema"]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from sqlalchemy import text
+from app.config.db_config import engine_registry
+from app.config.sql_cache import SQLCache, question_literals
+
+SCHEMA = [{"table_name": "sales", "schema": [{"name": "region", "type": "TEXT", "nullable": True}]}]
+VECTORS = {
+    "total revenue by region": [1.0, 0.0, 0.1],
+    "revenue per region": [0.95, 0.05, 0.12],
+    "number of customers": [0.0, 1.0, 0.0],
+    "top 5 regions by revenue in 2023": [0.5, 0.5, 0.7],
+    "top 10 regions by revenue in 2023": [0.5, 0.5, 0.7],
+    "top 5 regions by revenue in 2024": [0.5, 0.5, 0.7],
+    "the 5 best regions by revenue in 2023": [0.5, 0.5, 0.69],
+    "total sales in North region": [0.2, 0.9, 0.3],
+    "total sales in South region": [0.2, 0.9, 0.31],
+    "total sales in the north region": [0.2, 0.9, 0.3],
+}
+
+
+class TestSQLCache(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        db_url = f"sqlite:///{self.path}"
+        with engine_registry.get_engine(db_url).begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE sql_cache (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "source_key VARCHAR(64) NOT NULL, schema_fingerprint VARCHAR(64) NOT NULL, "
+                "model_name VARCHAR(200) NOT NULL, question TEXT NOT NULL, embedding BLOB NOT NULL, "
+                "sql_query TEXT NOT NULL, parsed_question JSON, hit_count INTEGER NOT NULL DEFAULT 0, "
+                "created_at DATETIME DEFAULT CURRENT_TIMESTAMP, "
+                "last_used_at DATETIME DEFAULT CURRENT_TIMESTAMP)"))
+
+        embeddings = MagicMock()
+        embeddings.embed_query.side_effect = VECTORS.get
+        self.cache = SQLCache(embeddings, "fake-model", db_url, threshold=0.9)
+        self.key = SQLCache.source_key([("system", "sales")])
+        self.fingerprint = SQLCache.schema_fingerprint(SCHEMA)
+
+    def tearDown(self):
+        engine_registry.dispose()
+        os.remove(self.path)
+
+    def test_similar_questions_reuse_sql(self):
+        self.assertIsNone(self.cache.lookup(self.key, self.fingerprint, "total revenue by region"))
+        self.cache.store(self.key, self.fingerprint, "total revenue by region",
+                         "SELECT region, SUM(revenue) FROM sales GROUP BY region", {"is_relevant": True})
+
+        entry = self.cache.lookup(self.key, self.fingerprint, "revenue per region")
+        self.assertEqual(entry["sql_query"], "SELECT region, SUM(revenue) FROM sales GROUP BY region")
+        self.assertEqual(entry["parsed_question"], {"is_relevant": True})
+        self.assertIsNone(self.cache.lookup(self.key, self.fingerprint, "number of customers"))
+        self.assertEqual(self.cache.stats()["hit_rate"], 0.333)
+
+    def test_questions_with_other_literals_miss(self):
+        self.cache.store(self.key, self.fingerprint, "top 5 regions by revenue in 2023",
+                         "SELECT region FROM sales WHERE year = 2023 ORDER BY revenue DESC LIMIT 5")
+
+        self.assertIsNone(self.cache.lookup(self.key, self.fingerprint, "top 10 regions by revenue in 2023"))
+        self.assertIsNone(self.cache.lookup(self.key, self.fingerprint, "top 5 regions by revenue in 2024"))
+        self.assertIsNotNone(self.cache.lookup(self.key, self.fingerprint, "the 5 best regions by revenue in 2023"))
+        self.assertEqual(question_literals("what's the 'North' total for 01/31/2024 and 2.5"),
+                         ["'North'", "01/31/2024", "2.5"])
+
+    def test_sql_values_must_be_named_in_the_question(self):
+        self.cache.store(self.key, self.fingerprint, "total sales in North region",
+                         "SELECT SUM(amount) FROM sales WHERE region = 'North'")
+
+        self.assertIsNone(self.cache.lookup(self.key, self.fingerprint, "total sales in South region"))
+        self.assertIsNotNone(self.cache.lookup(self.key, self.fingerprint, "total sales in the north region"))
+
+    def test_schema_changes_invalidate_entries(self):
+        self.cache.store(self.key, self.fingerprint, "total revenue by region", "SELECT 1")
+        changed = SQLCache.schema_fingerprint(
+            [{**SCHEMA[0], "schema": SCHEMA[0]["schema"] + [{"name": "year", "type": "INTEGER", "nullable": True}]}])
+
+        self.assertIsNone(self.cache.lookup(self.key, changed, "total revenue by region"))
+        self.assertIsNone(self.cache.lookup(self.key, self.fingerprint, "total revenue by region"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from app.utils.sql_utils import limit_rows, referenced_columns, validate_sql
+
+SCHEMA = [
+    {"table_name": "people", "schema": [
+        {"name": "Name", "type": "TEXT", "nullable": True},
+        {"name": "age", "type": "BIGINT", "nullable": True},
+        {"name": "city", "type": "TEXT", "nullable": True},
+    ]},
+]
+
+
+class TestValidateSQL(unittest.TestCase):
+
+    def test_valid_queries(self):
+        for query in [
+            'SELECT "Name", age FROM people WHERE city = \'Paris\' ORDER BY age DESC LIMIT 5',
+            'WITH by_city AS (SELECT city, AVG(age) AS avg_age FROM people GROUP BY city) '
+            'SELECT city, avg_age FROM by_city ORDER BY avg_age',
+            'SELECT p.city, COUNT(*) FROM People p GROUP BY p.city',
+        ]:
+            self.assertEqual(validate_sql(query, SCHEMA, "postgres"), [], query)
+
+    def test_unknown_tables_and_columns(self):
+        self.assertEqual(validate_sql("SELECT age FROM persons", SCHEMA, "postgres"),
+                         ["Table persons does not exist"])
+        # Unquoted identifiers fold to lower case in Postgres
+        self.assertTrue(validate_sql("SELECT Name FROM people", SCHEMA, "postgres"))
+        self.assertTrue(validate_sql("SELECT salary FROM people", SCHEMA, "postgres"))
+
+    def test_mixed_case_columns_per_dialect(self):
+        schema = [{"table_name": "Orders", "schema": [
+            {"name": "OrderID", "type": "INT", "nullable": False},
+            {"name": "Region", "type": "TEXT", "nullable": True},
+        ]}]
+        for dialect, query in [
+            ("duckdb", "SELECT Region FROM Orders"),
+            ("duckdb", 'SELECT "region", orderid FROM orders'),
+            ("mysql", "SELECT orderid FROM Orders"),
+            ("mysql", "SELECT `REGION` FROM Orders"),
+            ("postgres", 'SELECT "OrderID", "Region" FROM "Orders"'),
+        ]:
+            self.assertEqual(validate_sql(query, schema, dialect), [], f"{dialect}: {query}")
+        # Postgres folds unquoted names to lower case, so these don't exist
+        self.assertTrue(validate_sql('SELECT Region FROM "Orders"', schema, "postgres"))
+        self.assertTrue(validate_sql('SELECT "region" FROM "Orders"', schema, "postgres"))
+
+    def test_syntax_errors(self):
+        issues = validate_sql("SELEC * FROM people", SCHEMA, "postgres")
+        self.assertTrue(issues[0].startswith("Syntax error"))
+        # The terminal highlighting of the error position is stripped
+        self.assertNotIn("\x1b", issues[0])
+
+    def test_only_single_read_only_statements(self):
+        for query in [
+            "DELETE FROM people",
+            "SELECT * INTO copy FROM people",
+            "WITH gone AS (DELETE FROM people RETURNING *) SELECT * FROM gone",
+            "SELECT age FROM people; DROP TABLE people",
+        ]:
+            self.assertTrue(validate_sql(query, SCHEMA, "postgres"), query)
+
+
+class TestLimitRows(unittest.TestCase):
+
+    def test_caps_selects_and_keeps_smaller_limits(self):
+        self.assertEqual(limit_rows("SELECT age FROM people ORDER BY age DESC", 101, "mysql"),
+                         "SELECT age FROM people ORDER BY age DESC LIMIT 101")
+        self.assertEqual(limit_rows("SELECT age FROM people LIMIT 5000 OFFSET 10", 101, "mysql"),
+                         "SELECT age FROM people LIMIT 101 OFFSET 10")
+        self.assertEqual(limit_rows("SELECT age FROM people LIMIT 10", 101, "mysql"),
+                         "SELECT age FROM people LIMIT 10")
+        self.assertEqual(limit_rows("SHOW TABLES", 101, "mysql"), "SHOW TABLES")
+
+
+class TestReferencedColumns(unittest.TestCase):
+
+    def test_columns_used_by_a_query(self):
+        self.assertEqual(
+            referenced_columns("SELECT o.Region, COUNT(*) FROM orders o JOIN people p "
+                               "ON o.person_id = p.id GROUP BY o.Region", "duckdb"),
+            {"region", "person_id", "id"})
+        self.assertIsNone(referenced_columns("SELECT * FROM orders", "duckdb"))
+        self.assertIsNone(referenced_columns("SELECT p.* FROM people p", "duckdb"))
+
+
+if __name__ == '__main__':
+    unittest.main()
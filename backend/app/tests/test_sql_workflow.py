@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import MagicMock
+from app.langgraph.workflows.sql_workflow import WorkflowManager
+
+
+class TestRepairRouting(unittest.TestCase):
+
+    def setUp(self):
+        self.workflow = WorkflowManager(None, None, max_repairs=2)
+
+    def test_failed_queries_are_repaired_a_bounded_number_of_times(self):
+        state = {"sql_query": "SELECT 1 / 0", "query_result": [], "error": "division by zero"}
+        self.assertEqual(self.workflow.after_execution(state), "repair_sql")
+        self.assertEqual(self.workflow.after_execution({**state, "repair_attempts": 1}), "repair_sql")
+        self.assertEqual(self.workflow.after_execution({**state, "repair_attempts": 2}), "report_no_data")
+        answer = self.workflow.report_no_data({**state, "repair_attempts": 2})["answer"]
+        self.assertIn("division by zero", answer)
+
+    def test_only_validated_queries_run(self):
+        state = {"sql_query": "DELETE FROM sales", "sql_valid": False,
+                 "sql_issues": "Only read-only SELECT queries are allowed, found DELETE"}
+        self.assertEqual(self.workflow.after_local_validation(state), "validate_and_fix_sql")
+        self.assertEqual(self.workflow.after_local_validation({**state, "repair_attempts": 1}),
+                         "validate_and_fix_sql")
+        self.assertEqual(self.workflow.after_local_validation({**state, "repair_attempts": 2}),
+                         "report_no_data")
+        self.assertIn("read-only", self.workflow.report_no_data({**state, "repair_attempts": 2})["answer"])
+        self.assertEqual(self.workflow.after_local_validation({**state, "sql_valid": True}), "execute_sql")
+
+    def test_llm_nodes_only_run_on_data(self):
+        self.assertEqual(self.workflow.after_execution({"query_result": [], "error": None}), "report_no_data")
+        self.assertEqual(self.workflow.after_execution({"query_result": [{"a": 1}], "error": None}),
+                         ["format_results", "choose_visualization"])
+
+
+class TestRepairedQueriesAreValidated(unittest.TestCase):
+
+    def test_repaired_writes_never_run(self):
+        db = MagicMock()
+        db.engine.dialect.name = "postgresql"
+        workflow = WorkflowManager(None, db, max_repairs=2, cache=MagicMock(enabled=False))
+        agent = workflow.sql_agent
+        agent.get_parse_question = MagicMock(return_value={"parsed_question": {"is_relevant": True}})
+        agent.generate_sql_query = MagicMock(return_value={"sql_query": "SELECT amount FROM sales"})
+        rewrite = lambda state: {"sql_query": "DELETE FROM sales",
+                                 "repair_attempts": (state.get("repair_attempts") or 0) + 1}
+        agent.repair_sql = MagicMock(side_effect=rewrite)
+        agent.validate_and_fix_sql = MagicMock(side_effect=rewrite)
+        workflow.run_sql_query = MagicMock(return_value={"query_result": [], "error": "timeout"})
+
+        schema = [{"table_name": "sales", "schema": [{"name": "amount", "type": "INTEGER", "nullable": True}]}]
+        final = workflow.returnGraph().invoke({"question": "total sales", "schema": schema})
+
+        workflow.run_sql_query.assert_called_once()
+        self.assertEqual(agent.repair_sql.call_count + agent.validate_and_fix_sql.call_count, 2)
+        self.assertIn("read-only", final["answer"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+import numpy as np
+import pandas as pd
+from app.utils.stats_utils import ColumnStatsCollector, HISTOGRAM_BINS
+
+
+class TestColumnStatsCollector(unittest.TestCase):
+
+    def test_statistics_merge_across_chunks(self):
+        collector = ColumnStatsCollector(seed=0)
+        for start in range(0, 30000, 10000):
+            ids = np.arange(start, start + 10000)
+            collector.update(pd.DataFrame({
+                "id": ids,
+                "city": pd.Series([f"c{i % 3}" for i in ids]).astype("category"),
+                "score": [None if i % 4 == 0 else float(i) for i in ids],
+            }))
+
+        stats = {column["column_name"]: column for column in collector.results()}
+
+        self.assertEqual(stats["id"]["row_count"], 30000)
+        self.assertEqual((stats["id"]["min_value"], stats["id"]["max_value"]), (0, 29999))
+        # Above the sketch size the distinct count is an estimate
+        self.assertAlmostEqual(stats["id"]["distinct_count"], 30000, delta=3000)
+        self.assertEqual(stats["city"]["distinct_count"], 3)
+        self.assertEqual(stats["city"]["top_values"][0]["count"], 10000)
+        self.assertEqual(stats["score"]["null_count"], 7500)
+        # Histogram counts are scaled up from a sample, allow rounding per bucket
+        self.assertAlmostEqual(
+            sum(bucket["count"] for bucket in stats["score"]["histogram"]), 22500,
+            delta=HISTOGRAM_BINS)
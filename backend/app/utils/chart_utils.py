@@ -0,0 +1,125 @@
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+
+# Most series a single chart gets, more usually means the roles were guessed wrong
+MAX_SERIES = 10
+
+
+def _json_values(series: pd.Series) -> List[Any]:
+    """Plain Python values of a column, with missing values as None."""
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def _split_columns(df: pd.DataFrame) -> Tuple[List[str], List[str]]:
+    """Split the result columns into label columns and numeric value columns."""
+    values = [name for name in df.columns
+              if pd.api.types.is_numeric_dtype(df[name].dtype)
+              and not pd.api.types.is_bool_dtype(df[name].dtype)]
+    labels = [name for name in df.columns if name not in values]
+    return labels, values
+
+
+def _is_key(series: pd.Series) -> bool:
+    # Whole, distinct numbers such as years or ids work as categories
+    return pd.api.types.is_integer_dtype(series.dtype) and series.is_unique
+
+
+def _category_series(df: pd.DataFrame) -> Optional[Tuple[pd.Series, Dict[str, pd.Series]]]:
+    """
+    Find the category axis and the value series of a result.
+
+    One label column with any number of value columns is read as wide data.
+    Two label columns with one value column are read as long data and pivoted,
+    the second label naming the series. Returns None when the roles are unclear.
+    """
+    labels, values = _split_columns(df)
+    if not labels and len(values) >= 2 and _is_key(df[values[0]]):
+        labels, values = values[:1], values[1:]
+
+    if len(labels) == 1 and values:
+        return df[labels[0]], {name: df[name] for name in values}
+
+    if len(labels) == 2 and len(values) == 1:
+        category, group = labels
+        if df[group].nunique() > MAX_SERIES:
+            return None
+        pivoted = df.pivot_table(index=category, columns=group, values=values[0],
+                                 aggfunc="sum", sort=False, dropna=False)
+        return (pd.Series(pivoted.index),
+                {str(name): pivoted[name].reset_index(drop=True) for name in pivoted.columns})
+    return None
+
+
+def _bar_data(df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    shaped = _category_series(df)
+    if shaped is None:
+        return None
+    categories, series = shaped
+    return {
+        "labels": categories.astype(str).tolist(),
+        "values": [{"data": _json_values(values), "label": str(name)} for name, values in series.items()],
+    }
+
+
+def _line_data(df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    shaped = _category_series(df)
+    if shaped is None:
+        return None
+    categories, series = shaped
+    return {
+        "xValues": _json_values(categories),
+        "yValues": [{"data": _json_values(values), "label": str(name)} for name, values in series.items()],
+    }
+
+
+def _pie_data(df: pd.DataFrame) -> Optional[List[Dict[str, Any]]]:
+    shaped = _category_series(df)
+    if shaped is None or len(shaped[1]) != 1:
+        return None
+    categories, series = shaped
+    values = next(iter(series.values()))
+    return [{"label": label, "value": value}
+            for label, value in zip(categories.astype(str).tolist(), _json_values(values))]
+
+
+def _scatter_data(df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    labels, values = _split_columns(df)
+    if len(values) != 2 or len(labels) > 1:
+        return None
+    x, y = values
+    points = pd.DataFrame({"x": df[x], "y": df[y], "id": range(len(df))}).dropna(subset=["x", "y"])
+
+    # A label with few distinct values splits the points into series
+    if labels and df[labels[0]].nunique() <= MAX_SERIES:
+        groups = points.groupby(df[labels[0]].astype(str), sort=False)
+    else:
+        groups = [(f"{y} vs {x}", points)]
+    return {
+        "series": [{"data": [{"x": row["x"], "y": row["y"], "id": int(row["id"])}
+                             for row in group.astype(object).to_dict("records")],
+                    "label": str(name)}
+                   for name, group in groups]
+    }
+
+
+CHART_BUILDERS = {
+    "bar": _bar_data,
+    "horizontal_bar": _bar_data,
+    "line": _line_data,
+    "pie": _pie_data,
+    "scatter": _scatter_data,
+}
+
+
+def build_chart_data(rows: List[Dict[str, Any]], chart_type: str) -> Optional[Any]:
+    """
+    Shape query result rows into the data format of a chart type.
+
+    Column roles are inferred from the dtypes: text, dates and booleans are
+    labels, numbers are values. Returns None when the chart type is unknown
+    or the roles are ambiguous, so the caller can fall back to the LLM.
+    """
+    builder = CHART_BUILDERS.get(chart_type)
+    if builder is None or not rows or not all(isinstance(row, dict) for row in rows):
+        return None
+    return builder(pd.DataFrame(rows))
@@ -1,11 +1,10 @@
 from app.langgraph.workflows.sql_workflow import WorkflowManager
 from app.config.llm_config import LLM
-from app.config.db_config import DB, VectorDB
+from app.config.db_config import DB, AsyncDB, vector_db
+from app.config.schema_retriever import schema_retriever
 from fastapi.responses import StreamingResponse, JSONResponse
-from langchain_classic.chains import RetrievalQA
+from fastapi.concurrency import run_in_threadpool
 from langchain_core.prompts import PromptTemplate
-# from langchain_community.retrievers import BM25Retriever (removed for lazy loading)
-# from langchain.retrievers import EnsembleRetriever (removed for lazy loading)
 from typing import List, Optional
 from app.config.logging_config import get_logger
 from app.api.db.chat_history import Messages, Conversations
@@ -18,10 +17,9 @@ import json
 
 logger = get_logger(__name__)
 llm_instance = LLM()
-vectorDB_instance = VectorDB()
 
 
-def execute_workflow(question: str, conversation_id: int, table_list: List[str],llm_model:Optional[str] = "llama-3.1-8b-instant", system_db: Optional[DB] = None, db_url: Optional[str] = None):
+async def execute_workflow(question: str, conversation_id: int, table_list: List[str],llm_model:Optional[str] = "llama-3.1-8b-instant", system_db: Optional[AsyncDB] = None, db_url: Optional[str] = None):
 
     # Initialize db variable
     db: DB
@@ -30,34 +28,42 @@ def execute_workflow(question: str, conversation_id: int, table_list: List[str],
     # Case 1: Use system_db if provided
     if db_url is None:
         logger.info("Using existing DB Connection")
-        db = system_db
+        db = system_db.sync
+        schema = await system_db.get_schemas(table_names=table_list)
     # Case 2: Use db_url if provided
     elif db_url is not None:
-        logger.info("Creating new SYSTEM DB connection")
+        logger.info("Using pooled connection for external DB")
         db = DB(db_url)
+        schema = await run_in_threadpool(db.get_schemas, table_list)
     else:
         raise ValueError("Either system_db or db_url must be provided")
 
+    # Only the tables relevant to the question go into the prompts
+    schema = await run_in_threadpool(schema_retriever.select, question, schema)
+
 
     llm = llm_instance.groq(llm_model)
-    schema = db.get_schemas(table_names=table_list)
 
     workflow = WorkflowManager(llm, db)
     app = workflow.create_workflow().compile()
 
-    # Define a generator to stream the data from LangGraph
-    def event_stream():
+    # Define a generator to stream the data from LangGraph. The graph nodes
+    # are synchronous, astream runs them in the default executor.
+    async def event_stream():
         ai_responses = []
         try:
-            for event in app.stream({"question": question, "schema": schema}):
+            async for event in app.astream({"question": question, "schema": schema}):
                 for value in event.values():
+                    # Nodes that only route, like a SQL cache miss, have no update
+                    if value is None:
+                        continue
                     ai_responses.append(json.dumps(value))
                     # Yield the streamed data as a JSON object
                     yield json.dumps({"data": value}) + "\n"
 
             # After streaming is complete, save all responses as one message
             try:
-                save_message(
+                await save_message(
                     conversation_id=conversation_id,
                     role="assistant",
                     content=json.dumps({"answer":ai_responses}),
@@ -75,14 +81,6 @@ def execute_workflow(question: str, conversation_id: int, table_list: List[str],
         except Exception as e:
             logger.error(f"Error occurred during streaming: {str(e)}")
             yield json.dumps({"error": str(e)}) + "\n"
-        finally:
-            # Clean up resources
-            if app.stream and hasattr(app.stream, 'close'):
-                try:
-                    app.stream.close()
-                except Exception as e:
-                    yield json.dumps({"error": str(e)}) + "\n"
-                    logger.error(f"Error closing stream: {str(e)}")
     # Return the streaming response using event_stream generator
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
@@ -95,14 +93,8 @@ def serialize_document(doc):
     }
 
 
-def execute_document_chat(question: str, embedding_model: str, table_name: str, conversation_id: int, system_db: DB, llm_model: str = "llama-3.1-8b-instant"):
+async def execute_document_chat(question: str, table_name: str, conversation_id: int, system_db: AsyncDB, llm_model: str = "llama-3.1-8b-instant"):
     try:
-        # Initialize embedding
-        vectorDB_instance.initialize_embedding(embedding_model)
-
-        # Get vector store
-        vector_store = vectorDB_instance.get_vector_store(table_name)
-
         # Initialize LLM
         llm = llm_instance.groq(llm_model)
 
@@ -143,71 +135,39 @@ def execute_document_chat(question: str, embedding_model: str, table_name: str,
             template=prompt_template, input_variables=["context", "question"]
         )
 
-        # Build Hybrid Retriever
-        # 1. Fetch all documents for BM25
-        all_docs = vectorDB_instance.get_all_documents(table_name)
-        
-        # 2. Vector Retriever (Semantic)
-        vector_retriever = vector_store.as_retriever(search_kwargs={"k": 2})
-        
-        # 3. BM25 Retriever (Keyword - exact matches)
-        hybrid_retriever = vector_retriever
-        if all_docs:
-            try:
-                from langchain_community.retrievers import BM25Retriever
-                # Try direct import first, then module import
-                try:
-                    from langchain.retrievers.ensemble import EnsembleRetriever
-                except ImportError:
-                    from langchain.retrievers import EnsembleRetriever
-                
-                bm25_retriever = BM25Retriever.from_documents(all_docs)
-                bm25_retriever.k = 2
-                
-                # 4. Hybrid Ensemble
-                hybrid_retriever = EnsembleRetriever(
-                    retrievers=[vector_retriever, bm25_retriever],
-                    weights=[0.5, 0.5]
-                )
-                logger.info("Hybrid Search initialized successfully.")
-            except ImportError as e:
-                logger.warning(f"Hybrid search components not found or error loading: {str(e)}. Falling back to vector-only search.")
-                hybrid_retriever = vector_retriever
-        else:
-            # Fallback to vector only if no documents found (unlikely)
-            hybrid_retriever = vector_retriever
-
-        # Create a RetrievalQA chain
-        qa = RetrievalQA.from_chain_type(
-            llm=llm,
-            chain_type="stuff",
-            retriever=hybrid_retriever,
-            return_source_documents=True,
-            chain_type_kwargs={"prompt": PROMPT}
-        )
+        # Hybrid retriever: vector and full text ranking fused in a single query
+        hybrid_retriever = vector_db.get_hybrid_retriever(table_name)
 
-        # Execute the chain
-        result = qa.invoke({"query": question})
-        
-        # Prepare content for saving and streaming
-        content = {
-            "answer": result['result'],
-            "source_documents": [serialize_document(doc) for doc in result.get('source_documents', [])]
-        }
-        
-        # Save message to database
-        save_message(
-            conversation_id=conversation_id,
-            role="assistant",
-            content=content,
-            db=system_db
-        )
+        # PGVector is configured for sync mode, so retrieve off the loop
+        documents = await run_in_threadpool(hybrid_retriever.invoke, question)
+        source_documents = [serialize_document(doc) for doc in documents]
+        prompt = PROMPT.format(
+            context="\n\n".join(doc.page_content for doc in documents), question=question)
 
+        # Sources go out first and answer tokens follow as the LLM produces them,
+        # the whole answer is sent and saved once generation is done
         async def document_stream():
+            tokens = []
             try:
-                # To match frontend expectations, we yield the content as a JSON string
+                yield json.dumps({"source_documents": source_documents}) + "\n"
+                async for chunk in llm.astream(prompt):
+                    # Chat models stream message chunks, plain LLMs stream strings
+                    token = getattr(chunk, "content", chunk)
+                    if token:
+                        tokens.append(token)
+                        yield json.dumps({"token": token}) + "\n"
+
+                content = {"answer": "".join(tokens), "source_documents": source_documents}
                 yield json.dumps(content) + "\n"
+
+                await save_message(
+                    conversation_id=conversation_id,
+                    role="assistant",
+                    content=content,
+                    db=system_db
+                )
             except Exception as e:
+                logger.error(f"Error occurred during document chat streaming: {str(e)}")
                 yield json.dumps({"error": str(e)}) + "\n"
 
         return StreamingResponse(document_stream(), media_type="text/event-stream")
@@ -217,9 +177,9 @@ def execute_document_chat(question: str, embedding_model: str, table_name: str,
         raise ValueError(f"Failed to execute document chat: {str(e)}")
 
 
-def save_message(conversation_id: int, role: str, content: JSON, db: DB):
+async def save_message(conversation_id: int, role: str, content: JSON, db: AsyncDB):
     try:
-        with db.session() as session:
+        async with db.session() as session:
             # Create DataSources entry
             new_data_source = Messages(
                 conversation_id=conversation_id,
@@ -228,8 +188,8 @@ def save_message(conversation_id: int, role: str, content: JSON, db: DB):
             )
 
             session.add(new_data_source)
-            session.commit()
-            session.refresh(new_data_source)
+            await session.commit()
+            await session.refresh(new_data_source)
 
         return {
             "id": new_data_source.id,
@@ -250,7 +210,7 @@ def save_message(conversation_id: int, role: str, content: JSON, db: DB):
             "error": str(e)
         })
 
-def execute_multi_source_workflow(question: str, conversation_id: int, data_sources: List[DataSources], system_db: DB, llm_model: str = "llama-3.1-8b-instant"):
+async def execute_multi_source_workflow(question: str, conversation_id: int, data_sources: List[DataSources], system_db: AsyncDB, llm_model: str = "llama-3.1-8b-instant"):
     try:
         llm = llm_instance.groq(llm_model)
         
@@ -263,22 +223,25 @@ def execute_multi_source_workflow(question: str, conversation_id: int, data_sour
                 external_db = DB(source.connection_url)
                 # For external DBs, we might not want all tables, but for now get names
                 # Actually, analyst_prompts needs table schemas
-                # We'll use the inspector to get all table names first
-                tables = external_db.inspector.get_table_names()
-                schema = external_db.get_schemas(tables)
+                # The schema catalog loads every table in one query and caches it
+                schema = await run_in_threadpool(external_db.get_all_schemas)
+                tables = [table["table_name"] for table in schema]
                 combined_schema.extend(schema)
                 for t in tables:
                     source_map[t] = source.connection_url
             elif source.type == "spreadsheet":
-                schema = system_db.get_schemas([source.table_name])
+                schema = await system_db.get_schemas([source.table_name])
                 combined_schema.extend(schema)
                 source_map[source.table_name] = "system"
         
+        # Prompt only the tables relevant to the question, not every table of every source
+        combined_schema = await run_in_threadpool(schema_retriever.select, question, combined_schema)
+
         # 2. Initialize Workflow
-        workflow_manager = WorkflowManager(llm, system_db)
+        workflow_manager = WorkflowManager(llm, system_db.sync)
         app = workflow_manager.create_workflow().compile()
         
-        def event_stream():
+        async def event_stream():
             ai_responses = []
             try:
                 # Pass source_map to the state so run_sql_query knows where to go
@@ -288,13 +251,15 @@ def execute_multi_source_workflow(question: str, conversation_id: int, data_sour
                     "source_map": source_map  # New state key
                 }
                 
-                for event in app.stream(initial_state):
+                async for event in app.astream(initial_state):
                     for value in event.values():
+                        if value is None:
+                            continue
                         ai_responses.append(json.dumps(value))
                         yield json.dumps({"data": value}) + "\n"
 
                 # Save the final answer
-                save_message(
+                await save_message(
                     conversation_id=conversation_id,
                     role="assistant",
                     content=json.dumps({"answer": ai_responses}),
@@ -0,0 +1,135 @@
+import warnings
+from typing import Collection
+import pandas as pd
+from app.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Spellings accepted as booleans in text columns
+BOOLEAN_VALUES = {
+    "true": True, "false": False,
+    "yes": True, "no": False,
+}
+
+# Full ISO 8601 dates, optionally with a time and offset. Partial dates
+# like 2024-01 and bare times are left as text
+ISO_DATE_PATTERN = r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?"
+
+# Other date spellings accepted in text columns, tried in order
+DATE_FORMATS = (
+    "%m/%d/%Y", "%d/%m/%Y", "%Y/%m/%d", "%d.%m.%Y",
+    "%m/%d/%Y %H:%M", "%m/%d/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S",
+    "%d %b %Y", "%b %d, %Y", "%d %B %Y", "%B %d, %Y",
+)
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def memory_usage(df: pd.DataFrame) -> int:
+    """Bytes held by a DataFrame, including the contents of string columns."""
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def _is_text(series: pd.Series) -> bool:
+    return pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)
+
+
+def _has_leading_zeros(values: pd.Series) -> bool:
+    # Codes like zip or phone numbers would lose their leading zeros as numbers
+    return bool(values.str.match(r"^[+-]?0\d").any())
+
+
+def _downcast_numeric(series: pd.Series) -> pd.Series:
+    """Shrink a numeric column to the narrowest dtype that keeps every value."""
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series
+    values = series.dropna()
+    if pd.api.types.is_float_dtype(series.dtype):
+        if len(values) and (values % 1 == 0).all() and values.abs().max() < 2 ** 63:
+            # Whole numbers stored as floats because of missing values
+            series = series.astype("Int64")
+        else:
+            narrow = series.astype("float32")
+            # float32 keeps ~7 significant digits, only use it when the printed values survive
+            if pd.to_numeric(narrow.dropna().astype(str)).equals(values):
+                return narrow
+            return series
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return pd.to_numeric(series, downcast="integer")
+    return series
+
+
+def _parse_datetimes(values: pd.Series):
+    """
+    Parse text as datetimes, or return None unless every value is a full date
+    in ISO 8601 or one of DATE_FORMATS. Formats are never guessed, guessing
+    turns times and codes like 1-2 into invented dates.
+    """
+    if values.str.fullmatch(ISO_DATE_PATTERN).all():
+        date_formats = ("ISO8601",)
+    else:
+        date_formats = DATE_FORMATS
+    for date_format in date_formats:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            try:
+                parsed = pd.to_datetime(values, format=date_format, errors="coerce")
+            except (ValueError, TypeError):
+                continue
+        if parsed.notna().all():
+            return parsed
+    return None
+
+
+def _infer_text_column(series: pd.Series) -> pd.Series:
+    """Turn a text column into booleans, numbers, datetimes or a categorical when possible."""
+    values = series.dropna()
+    if values.empty:
+        return series
+    values = values.astype(str).str.strip()
+
+    lowered = values.str.lower()
+    if lowered.isin(BOOLEAN_VALUES.keys()).all():
+        return lowered.map(BOOLEAN_VALUES).reindex(series.index).astype("boolean")
+
+    if not _has_leading_zeros(values):
+        numbers = pd.to_numeric(values, errors="coerce")
+        if numbers.notna().all():
+            return _downcast_numeric(numbers.reindex(series.index))
+
+    # Only bother with date parsing for values that look like dates
+    if values.str.contains(r"\d[-/.]\d|\d\s+\w|\w\s+\d", regex=True).all():
+        parsed = _parse_datetimes(values)
+        if parsed is not None:
+            return parsed.reindex(series.index)
+
+    if values.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+        return series.astype("category")
+    return series
+
+
+def compact_dataframe(df: pd.DataFrame, text_columns: Collection[str] = ()) -> pd.DataFrame:
+    """
+    Give every column the most compact dtype that holds its values.
+
+    Numbers are downcast, text columns holding booleans, numbers or dates are
+    converted and repetitive text becomes categorical. Columns in
+    `text_columns` are kept as their original text.
+    """
+    compacted = {}
+    for name in df.columns:
+        series = df[name]
+        try:
+            if name in text_columns:
+                compacted[name] = series if _is_text(series) else series.astype("string")
+            elif _is_text(series):
+                compacted[name] = _infer_text_column(series)
+            elif pd.api.types.is_numeric_dtype(series.dtype):
+                compacted[name] = _downcast_numeric(series)
+            else:
+                compacted[name] = series
+        except Exception as e:
+            logger.warning(f"Could not infer a compact type for column {name}: {str(e)}")
+            compacted[name] = series
+    return pd.DataFrame(compacted, index=df.index)
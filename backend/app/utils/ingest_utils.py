@@ -0,0 +1,338 @@
+import hashlib
+import os
+import tempfile
+import time
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+import pandas as pd
+from fastapi import UploadFile
+from sqlalchemy import Text, func, select, update
+from sqlalchemy.exc import IntegrityError
+from app.api.db.data_sources import DataSources
+from app.api.db.column_statistics import ColumnStatistics
+from app.api.db.ingested_contents import IngestedContents
+from app.config.db_config import DB, VectorDB, sql_types_for_frame, widen_sql_type
+from app.config.env import SPOOL_CHUNK_BYTES, INGEST_CHUNK_ROWS
+from app.config.logging_config import get_logger
+from app.utils.dtype_utils import compact_dataframe, memory_usage
+from app.utils.job_utils import ingestion_jobs, LOADING, EMBEDDING, REGISTERING
+from app.utils.stats_utils import ColumnStatsCollector
+from app.utils.reader_utils import iter_pdf_documents, text_to_document
+
+logger = get_logger(__name__)
+
+
+async def spool_upload(file: UploadFile) -> Tuple[str, str]:
+    """
+    Copy an upload to a temporary file without holding it in memory.
+
+    Returns the file path and the sha256 of the contents.
+    """
+    suffix = os.path.splitext(file.filename)[1].lower()
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as spooled:
+        while True:
+            chunk = await file.read(SPOOL_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+            spooled.write(chunk)
+        return spooled.name, digest.hexdigest()
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # Convert all column names to lowercase and replace spaces with underscores
+    df.columns = df.columns.astype(str).str.lower().str.replace(' ', '_')
+    return df
+
+
+def _iter_xlsx_chunks(path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [f"unnamed:_{i}" if name is None else name for i, name in enumerate(header)]
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch or not columns:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def iter_spreadsheet_chunks(path: str, file_name: str,
+                            chunk_rows: int = INGEST_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Parse a spooled CSV or Excel file into DataFrames of at most `chunk_rows` rows."""
+    lower_name = file_name.lower()
+    if lower_name.endswith('.csv'):
+        # Read as text so every chunk is typed by the same inference, and
+        # columns can fall back to their original text
+        yield from pd.read_csv(path, chunksize=chunk_rows, dtype=str)
+    elif lower_name.endswith('.xlsx'):
+        yield from _iter_xlsx_chunks(path, chunk_rows)
+    else:
+        # Legacy .xls workbooks can't be read incrementally
+        df = pd.read_excel(path)
+        for start in range(0, max(len(df), 1), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+
+class TextFallback(Exception):
+    """Raised when a later chunk holds values that only fit some columns as text."""
+
+    def __init__(self, columns: Set[str]):
+        super().__init__(f"Columns only fit as text: {sorted(columns)}")
+        self.columns = columns
+
+
+def _text_only_columns(column_types: Dict[str, Any], chunk: pd.DataFrame) -> Set[str]:
+    """Columns of a typed table that would have to be widened to text for a chunk."""
+    return {
+        name for name, incoming_type in sql_types_for_frame(chunk).items()
+        if name in column_types and not isinstance(column_types[name], Text)
+        and chunk[name].notna().any()
+        and isinstance(widen_sql_type(column_types[name], incoming_type), Text)
+    }
+
+
+def _load_chunks(db: DB, path: str, file_name: str, table_name: str, text_columns: Set[str],
+                 progress: Optional[Callable[[int, int], None]]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    rows_processed, chunks, column_types = 0, 0, None
+    memory_before = memory_after = 0
+    column_stats = ColumnStatsCollector()
+    try:
+        for chunk in iter_spreadsheet_chunks(path, file_name):
+            chunk = normalize_columns(chunk)
+            memory_before += memory_usage(chunk)
+            # Columns stored as text keep the original text of later chunks too
+            stored_text = {name for name, column_type in (column_types or {}).items()
+                           if isinstance(column_type, Text)}
+            chunk = compact_dataframe(chunk, text_columns | stored_text)
+            memory_after += memory_usage(chunk)
+            if column_types is None:
+                db.insert_dataframe(chunk, table_name, if_exists='replace')
+                column_types = sql_types_for_frame(chunk)
+            else:
+                conflicts = _text_only_columns(column_types, chunk)
+                if conflicts:
+                    raise TextFallback(conflicts)
+                column_types = db.widen_columns(table_name, column_types, chunk)
+                db.insert_dataframe(chunk, table_name, if_exists='append')
+            column_stats.update(chunk)
+            rows_processed += len(chunk)
+            chunks += 1
+            logger.info(f"Loaded chunk {chunks} into {table_name} ({rows_processed} rows)")
+            if progress:
+                progress(rows_processed, chunks)
+    except Exception:
+        # Don't leave a half-loaded table behind
+        if column_types is not None:
+            db.drop_table(table_name)
+        raise
+
+    if column_types is None:
+        raise ValueError("The uploaded file doesn't contain a header row")
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows_processed": rows_processed,
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows_processed / elapsed, 1) if elapsed > 0 else None,
+        "memory_before_bytes": memory_before,
+        "memory_after_bytes": memory_after,
+        "column_types": {name: column_type.compile(dialect=db.engine.dialect)
+                         for name, column_type in column_types.items()},
+        "column_statistics": column_stats.results()
+    }
+
+
+def load_spreadsheet(db: DB, path: str, file_name: str, table_name: str,
+                     progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Load a spooled spreadsheet into a table one chunk at a time.
+
+    Each chunk is compacted to the narrowest dtypes first and folded into
+    the column statistics. The first chunk creates the table. Later chunks
+    widen column types when their values don't fit, then get appended. When
+    a later chunk only fits a column as text, e.g. dates followed by free
+    text, the file is loaded again with that column kept as its original
+    text, stored rows are never cast to text. `progress` is called with the
+    rows and chunks loaded so far after every chunk.
+    """
+    text_columns: Set[str] = set()
+    while True:
+        try:
+            return _load_chunks(db, path, file_name, table_name, text_columns, progress)
+        except TextFallback as fallback:
+            logger.info(f"Reloading {table_name} with {sorted(fallback.columns)} kept as text")
+            text_columns |= fallback.columns
+
+
+def register_data_source(db: DB, user_id: int, file_name: str, source_type: str,
+                         table_name: str, content_hash: Optional[str] = None,
+                         column_statistics: Optional[List[Dict]] = None) -> int:
+    """
+    Create the DataSources entry of an ingested file, with its column statistics, and return its id.
+
+    With a content hash the table is also added to the content index. That
+    raises IntegrityError when identical content was registered meanwhile.
+    """
+    with db.session() as session:
+        new_data_source = DataSources(
+            name=file_name,
+            type=source_type,
+            table_name=table_name,
+            user_id=user_id
+        )
+        session.add(new_data_source)
+        if content_hash:
+            session.add(IngestedContents(
+                content_hash=content_hash, type=source_type, table_name=table_name, ref_count=1))
+        session.flush()
+        session.add_all([ColumnStatistics(data_source_id=new_data_source.id, **stats)
+                         for stats in column_statistics or []])
+        session.commit()
+        session.refresh(new_data_source)
+        return new_data_source.id
+
+
+def link_duplicate(db: DB, user_id: int, file_name: str, source_type: str,
+                   content_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Point a new data source at the table of an identical earlier upload.
+
+    Returns None when no such table exists.
+    """
+    with db.session() as session:
+        table_name = session.execute(
+            update(IngestedContents)
+            .where(IngestedContents.content_hash == content_hash,
+                   IngestedContents.type == source_type,
+                   IngestedContents.ref_count > 0)
+            .values(ref_count=IngestedContents.ref_count + 1)
+            .returning(IngestedContents.table_name)
+        ).scalar_one_or_none()
+        if table_name is None:
+            return None
+
+        new_data_source = DataSources(
+            name=file_name,
+            type=source_type,
+            table_name=table_name,
+            user_id=user_id
+        )
+        session.add(new_data_source)
+        session.flush()
+
+        # Reuse the statistics computed for the first upload
+        original_id = session.execute(
+            select(func.min(DataSources.id)).where(
+                DataSources.table_name == table_name, DataSources.id != new_data_source.id)
+        ).scalar()
+        copied_columns = [column.name for column in ColumnStatistics.__table__.columns
+                          if column.name not in ("id", "data_source_id", "created_at")]
+        for stats in session.execute(select(ColumnStatistics).where(
+                ColumnStatistics.data_source_id == original_id)).scalars().all():
+            session.add(ColumnStatistics(
+                data_source_id=new_data_source.id,
+                **{name: getattr(stats, name) for name in copied_columns}))
+
+        session.commit()
+        logger.info(f"Linked duplicate upload {file_name} to existing table {table_name}")
+        return {"data_source_id": new_data_source.id, "table_name": table_name, "deduplicated": True}
+
+
+def ingest_once(job_id: str, db: DB, user_id: int, file_name: str, source_type: str,
+                content_hash: str, table_name: str,
+                build: Callable[[], Tuple[Dict[str, Any], Optional[List[Dict]]]],
+                discard: Callable[[str], Any]) -> Dict[str, Any]:
+    """
+    Reuse the storage of identical content, or build it and register it.
+
+    `build` creates the table or collection and returns the job result with
+    the column statistics; `discard` removes it again when registering fails.
+    """
+    duplicate = link_duplicate(db, user_id, file_name, source_type, content_hash)
+    if duplicate:
+        return duplicate
+
+    result, column_statistics = build()
+    ingestion_jobs.update(job_id, phase=REGISTERING)
+    try:
+        data_source_id = register_data_source(
+            db, user_id, file_name, source_type, table_name,
+            content_hash=content_hash, column_statistics=column_statistics)
+    except IntegrityError:
+        # An identical upload finished first, keep its copy and drop ours
+        discard(table_name)
+        duplicate = link_duplicate(db, user_id, file_name, source_type, content_hash)
+        if duplicate is None:
+            raise
+        return {**result, **duplicate}
+    except Exception:
+        discard(table_name)
+        raise
+    return {**result, "data_source_id": data_source_id, "deduplicated": False}
+
+
+def ingest_spreadsheet(job_id: str, user_id: int, db: DB, path: str, file_name: str,
+                       table_name: str, content_hash: str) -> Dict[str, Any]:
+    """Ingestion job body for spreadsheets. Removes the spooled file when done."""
+    def build():
+        ingestion_jobs.update(job_id, phase=LOADING, table_name=table_name)
+        load = load_spreadsheet(
+            db, path, file_name, table_name,
+            progress=lambda rows, chunks: ingestion_jobs.progress(job_id, rows, chunks))
+        return load, load.pop("column_statistics")
+
+    try:
+        return ingest_once(job_id, db, user_id, file_name, 'spreadsheet', content_hash,
+                           table_name, build, db.drop_table)
+    finally:
+        os.remove(path)
+
+
+def ingest_document(job_id: str, user_id: int, db: DB, vector_db: VectorDB, path: str,
+                    file_name: str, table_name: str, content_hash: str) -> Dict[str, Any]:
+    """Ingestion job body for documents. Removes the spooled file when done."""
+    def build():
+        started = time.perf_counter()
+        if file_name.lower().endswith('.pdf'):
+            # Pages are extracted, chunked and embedded as a stream
+            documents = iter_pdf_documents(path, table_name)
+        else:
+            with open(path, 'rb') as spooled:
+                documents = text_to_document(BytesIO(spooled.read()), table_name)
+
+        ingestion_jobs.update(job_id, phase=EMBEDDING, table_name=table_name)
+        try:
+            inserted = vector_db.insert_data(
+                documents, table_name,
+                progress=lambda done: ingestion_jobs.progress(job_id, rows=done, chunks=done))
+        except Exception:
+            # Don't leave a half-embedded collection behind
+            vector_db.delete_collection(table_name)
+            raise
+
+        elapsed = time.perf_counter() - started
+        return {
+            "rows_processed": inserted,
+            "chunks": inserted,
+            "seconds": round(elapsed, 3),
+        }, None
+
+    try:
+        return ingest_once(job_id, db, user_id, file_name, 'document', content_hash,
+                           table_name, build, vector_db.delete_collection)
+    finally:
+        os.remove(path)
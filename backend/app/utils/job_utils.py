@@ -0,0 +1,136 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from app.config.env import INGEST_WORKERS, INGEST_JOB_RETENTION
+from app.config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Job phases in the order they normally happen
+QUEUED = "queued"
+PARSING = "parsing"
+LOADING = "loading"
+EMBEDDING = "embedding"
+REGISTERING = "registering"
+COMPLETED = "completed"
+FAILED = "failed"
+
+FINISHED_PHASES = (COMPLETED, FAILED)
+
+
+class IngestionJobs:
+    """
+    Runs file ingestion in a local worker pool and tracks each job's progress.
+
+    Jobs live in memory only, so their status is lost when the process
+    restarts. Finished jobs are forgotten after the retention period.
+    """
+
+    def __init__(self, max_workers: int = INGEST_WORKERS, retention: int = INGEST_JOB_RETENTION):
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ingest")
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, user_id: int, kind: str, file_name: str,
+               work: Callable[[str], Dict[str, Any]],
+               cleanup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+        """
+        Queue `work(job_id)` and return the new job.
+
+        Whatever `work` returns is merged into the job once it completes.
+        `cleanup` is called instead when the job is cancelled before it
+        starts, e.g. at shutdown, to release what `work` would have.
+        """
+        self._prune()
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "user_id": user_id,
+            "kind": kind,
+            "file_name": file_name,
+            "phase": QUEUED,
+            "rows_processed": 0,
+            "chunks_processed": 0,
+            "rows_per_second": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        future = self._executor.submit(self._run, job_id, work)
+        if cleanup:
+            future.add_done_callback(lambda done: self._cancelled(job_id, done, cleanup))
+        logger.info(f"Queued {kind} ingestion job {job_id} for {file_name}")
+        return dict(job)
+
+    def _run(self, job_id: str, work: Callable[[str], Dict[str, Any]]):
+        self.update(job_id, phase=PARSING, started_at=time.time())
+        try:
+            result = work(job_id)
+            self.update(job_id, phase=COMPLETED, finished_at=time.time(), **(result or {}))
+            logger.info(f"Ingestion job {job_id} completed")
+        except Exception as e:
+            logger.exception(f"Ingestion job {job_id} failed: {str(e)}")
+            error = getattr(e, "detail", None) or str(e)
+            self.update(job_id, phase=FAILED, finished_at=time.time(), error=error)
+
+    def _cancelled(self, job_id: str, future: Future, cleanup: Callable[[], None]):
+        if not future.cancelled():
+            return
+        self.update(job_id, phase=FAILED, finished_at=time.time(), error="Cancelled at shutdown")
+        try:
+            cleanup()
+        except Exception as e:
+            logger.error(f"Cleanup of cancelled ingestion job {job_id} failed: {str(e)}")
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def progress(self, job_id: str, rows: Optional[int] = None, chunks: Optional[int] = None):
+        """Record processed rows or chunks and refresh the job's throughput."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if rows is not None:
+                job["rows_processed"] = rows
+            if chunks is not None:
+                job["chunks_processed"] = chunks
+            elapsed = time.time() - (job["started_at"] or job["created_at"])
+            if elapsed > 0:
+                job["rows_per_second"] = round(job["rows_processed"] / elapsed, 1)
+
+    def get(self, job_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+        """Return a copy of the job when it belongs to the user."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["user_id"] != user_id:
+                return None
+            return dict(job)
+
+    def list(self, user_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values() if job["user_id"] == user_id]
+        return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job["phase"] in FINISHED_PHASES and job["finished_at"] < cutoff]:
+                del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+ingestion_jobs = IngestionJobs()
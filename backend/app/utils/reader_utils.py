@@ -1,8 +1,14 @@
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pypdf import PdfReader
 from langchain_text_splitters import CharacterTextSplitter
 from langchain_core.documents import Document
 from io import BytesIO
-from typing import List
+from typing import Iterator, List, Optional, Tuple
+from app.config.env import PDF_WORKERS, PDF_PAGES_PER_TASK
 
 
 text_splitter = CharacterTextSplitter(
@@ -12,12 +18,81 @@ text_splitter = CharacterTextSplitter(
     length_function=len,
 )
 
+# No point in more extraction processes than cores
+PDF_PROCESSES = max(1, min(PDF_WORKERS, os.cpu_count() or 1))
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
 
-def pdf_to_document(buffer: BytesIO, file_name: str) -> List[Document]:
-    pdf_reader = PdfReader(buffer)
-    raw_text = "".join(page.extract_text() or "" for page in pdf_reader.pages)
-    texts = text_splitter.split_text(raw_text)
-    return [Document(page_content=text, metadata={"source": file_name}) for text in texts]
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # Spawn, forking a process that runs threads can deadlock the children
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+        return _pdf_pool
+
+
+def shutdown_pdf_pool():
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(wait=False, cancel_futures=True)
+            _pdf_pool = None
+
+
+def _extract_pages(path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract the text of pages [start, stop) of a PDF, runs in a worker process.
+
+    The reader only lives for the task, so idle workers hold no PDF, and it
+    reads from the open file instead of loading the whole file into memory.
+    """
+    with open(path, "rb") as pdf_file:
+        reader = PdfReader(pdf_file)
+        return [reader.pages[number].extract_text() or "" for number in range(start, stop)]
+
+
+def iter_pdf_pages(path: str) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page number, text) for every page of a PDF, in page order.
+
+    Pages are extracted in batches by a process pool. Only a few batches are
+    in flight at a time, so memory stays bounded and the caller can chunk
+    and embed early pages while later ones are still being extracted.
+    """
+    with open(path, "rb") as pdf_file:
+        page_count = len(PdfReader(pdf_file).pages)
+    batches = iter(range(0, page_count, PDF_PAGES_PER_TASK))
+    pool = _get_pdf_pool()
+    pending = deque()
+
+    def submit_next():
+        start = next(batches, None)
+        if start is not None:
+            stop = min(start + PDF_PAGES_PER_TASK, page_count)
+            pending.append((start, pool.submit(_extract_pages, path, start, stop)))
+
+    for _ in range(2 * PDF_PROCESSES):
+        submit_next()
+    try:
+        while pending:
+            start, future = pending.popleft()
+            pages = future.result()
+            submit_next()
+            for offset, page_text in enumerate(pages):
+                yield start + offset + 1, page_text
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+def iter_pdf_documents(path: str, file_name: str) -> Iterator[Document]:
+    """Stream the chunks of a PDF, each tagged with the page it comes from."""
+    for page_number, page_text in iter_pdf_pages(path):
+        for text in text_splitter.split_text(page_text):
+            yield Document(page_content=text, metadata={"source": file_name, "page": page_number})
 
 
 def text_to_document(buffer: BytesIO, file_name: str) -> List[Document]:
@@ -0,0 +1,135 @@
+import re
+from typing import Dict, List, Optional, Set
+import sqlglot
+from sqlglot import exp
+from sqlglot.dialects.dialect import Dialect, NormalizationStrategy
+from sqlglot.errors import OptimizeError, ParseError
+from sqlglot.optimizer.qualify import qualify
+from sqlglot.schema import MappingSchema
+
+# SQLAlchemy backend names and the sqlglot dialect that parses them
+SQLGLOT_DIALECTS = {
+    "postgresql": "postgres",
+    "mysql": "mysql",
+    "mariadb": "mysql",
+    "sqlite": "sqlite",
+    "mssql": "tsql",
+    "oracle": "oracle",
+    "duckdb": "duckdb",
+}
+
+# Dialects whose column names are case-insensitive although sqlglot keeps their case
+CASE_INSENSITIVE_COLUMNS = {"mysql"}
+
+# Terminal colour codes sqlglot puts around the offending part of an error message
+ANSI_ESCAPES = re.compile(r"\x1b\[[0-9;]*m")
+
+# Statements and clauses that write, anywhere in the tree
+WRITE_EXPRESSIONS = (exp.Insert, exp.Update, exp.Delete, exp.Merge, exp.Create, exp.Drop,
+                     exp.Alter, exp.TruncateTable, exp.Command, exp.Into, exp.Lock)
+
+
+def sqlglot_dialect(backend_name: str) -> Optional[str]:
+    """The sqlglot dialect of a SQLAlchemy backend, None for the generic one."""
+    return SQLGLOT_DIALECTS.get(backend_name)
+
+
+def strip_ansi(message: str) -> str:
+    """Remove terminal colour codes from an error message."""
+    return ANSI_ESCAPES.sub("", message)
+
+
+def _lowercase_identifiers(statement: exp.Expression) -> exp.Expression:
+    return statement.transform(
+        lambda node: exp.to_identifier(node.name.lower(), quoted=node.quoted)
+        if isinstance(node, exp.Identifier) else node)
+
+
+def validate_sql(query: str, schema: List[Dict], dialect: Optional[str] = None) -> List[str]:
+    """
+    Check a generated query without running it or asking an LLM.
+
+    The query must be a single read-only statement that parses in the target
+    dialect, and every table and column it uses must exist in the schema,
+    given as the table schemas of the workflow state. Returns the issues
+    found, an empty list means the query is valid.
+    """
+    try:
+        statements = [statement for statement in sqlglot.parse(query, read=dialect) if statement]
+    except ParseError as e:
+        return [f"Syntax error: {strip_ansi(str(e))}"]
+    if len(statements) != 1:
+        return ["Expected exactly one SQL statement"]
+    statement = statements[0]
+
+    writes = statement.find(*WRITE_EXPRESSIONS)
+    if not isinstance(statement, exp.Query) or writes is not None:
+        return [f"Only read-only SELECT queries are allowed, found {type(writes or statement).__name__.upper()}"]
+
+    case_insensitive = dialect in CASE_INSENSITIVE_COLUMNS
+    if case_insensitive:
+        statement = _lowercase_identifiers(statement)
+    fold = str.lower if case_insensitive else str
+    columns = {fold(table["table_name"]): {fold(column["name"]): column["type"] for column in table["schema"]}
+               for table in schema}
+    # Names in the schema are exact, like quoted identifiers, the query's own
+    # identifiers are normalized for the dialect by qualify
+    quoted = {exp.to_identifier(table, quoted=True).sql(dialect=dialect):
+              {exp.to_identifier(column, quoted=True).sql(dialect=dialect): column_type
+               for column, column_type in table_columns.items()}
+              for table, table_columns in columns.items()}
+    ignores_quotes = (Dialect.get_or_raise(dialect).NORMALIZATION_STRATEGY
+                      == NormalizationStrategy.CASE_INSENSITIVE)
+    ctes = {cte.alias_or_name for cte in statement.find_all(exp.CTE)}
+    issues = []
+    for table in statement.find_all(exp.Table):
+        identifier = table.this
+        # Table functions such as generate_series have no identifier
+        if not isinstance(identifier, exp.Identifier) or table.name in ctes or table.name in columns:
+            continue
+        # Unquoted names are case insensitive, and quoted ones too in some dialects
+        if (not identifier.quoted or ignores_quotes) and table.name.lower() in {name.lower() for name in columns}:
+            continue
+        issues.append(f"Table {table.name} does not exist")
+    if issues:
+        return issues
+
+    try:
+        # Qualifying resolves every column against the schema, through aliases and CTEs
+        qualify(statement.copy(), schema=MappingSchema(quoted, dialect=dialect),
+                dialect=dialect, validate_qualify_columns=True)
+    except OptimizeError as e:
+        return [strip_ansi(str(e))]
+    return []
+
+
+def referenced_columns(query: str, dialect: Optional[str] = None) -> Optional[Set[str]]:
+    """Lower cased names of the columns a query uses, None when it selects every column."""
+    try:
+        statement = sqlglot.parse_one(query, read=dialect)
+    except ParseError:
+        return None
+    # COUNT(*) needs no columns, any other star needs them all
+    if any(not isinstance(star.parent, exp.Count) for star in statement.find_all(exp.Star)):
+        return None
+    return {column.name.lower() for column in statement.find_all(exp.Column)}
+
+
+def limit_rows(query: str, max_rows: int, dialect: Optional[str] = None) -> str:
+    """
+    Cap a single query at `max_rows` rows with a LIMIT clause.
+
+    A smaller limit of the query itself is kept, and queries that are not a
+    single SELECT come back unchanged.
+    """
+    try:
+        statements = [statement for statement in sqlglot.parse(query, read=dialect) if statement]
+    except ParseError:
+        return query
+    if len(statements) != 1 or not isinstance(statements[0], exp.Query):
+        return query
+    limit = statements[0].args.get("limit")
+    count = limit.expression if limit is not None else None
+    if isinstance(count, exp.Literal) and count.is_int and int(count.name) <= max_rows:
+        return query
+    return statements[0].limit(max_rows).sql(dialect=dialect)
@@ -0,0 +1,174 @@
+import datetime
+from collections import Counter
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Hashes kept per column by the distinct-count sketch, counts below this are exact
+DISTINCT_SKETCH_SIZE = 2048
+# Distinct values tracked per column for the top-k list
+TOP_VALUES_CAPACITY = 1000
+TOP_K = 10
+# Values sampled per column to build histograms
+HISTOGRAM_SAMPLE_SIZE = 10000
+HISTOGRAM_BINS = 10
+
+
+def _to_json_value(value: Any) -> Any:
+    """Convert numpy and pandas scalars into JSON friendly values."""
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _column_kind(dtype) -> str:
+    if pd.api.types.is_bool_dtype(dtype):
+        return "boolean"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "numeric"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return "text"
+
+
+class _ColumnState:
+    """Running statistics of one column, updated chunk by chunk."""
+
+    def __init__(self, name: str, kind: str, rng: np.random.Generator):
+        self.name = name
+        self.kind = kind
+        self.rng = rng
+        self.row_count = 0
+        self.null_count = 0
+        self.min = None
+        self.max = None
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.top_values: Counter = Counter()
+        self.sample = np.empty(0)
+        self.sample_keys = np.empty(0)
+
+    def update(self, series: pd.Series):
+        kind = _column_kind(series.dtype)
+        if kind != self.kind:
+            # The table column was widened to text, ranges no longer apply
+            self.kind = "text"
+            self.min = self.max = None
+            self.sample = self.sample_keys = np.empty(0)
+
+        values = series.dropna()
+        self.row_count += len(series)
+        self.null_count += len(series) - len(values)
+        if values.empty:
+            return
+
+        # K minimum values sketch: keep the smallest distinct hashes seen so far
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        self.hashes = np.unique(np.concatenate([self.hashes, hashes]))[:DISTINCT_SKETCH_SIZE]
+
+        if self.kind in ("numeric", "datetime"):
+            chunk_min, chunk_max = values.min(), values.max()
+            self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+            self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+            self._update_sample(values)
+
+        if not pd.api.types.is_float_dtype(values.dtype):
+            counts = values.value_counts()
+            self.top_values.update(counts[counts > 0].to_dict())
+            if len(self.top_values) > TOP_VALUES_CAPACITY:
+                self.top_values = Counter(dict(self.top_values.most_common(TOP_VALUES_CAPACITY)))
+
+    def _update_sample(self, values: pd.Series):
+        # Bottom-k sampling: rows with the smallest random keys form a uniform sample
+        if self.kind == "datetime":
+            numbers = pd.DatetimeIndex(values).as_unit("ns").asi8.astype(np.float64)
+        else:
+            numbers = values.to_numpy(dtype=np.float64)
+        keys = self.rng.random(len(numbers))
+        sample = np.concatenate([self.sample, numbers])
+        sample_keys = np.concatenate([self.sample_keys, keys])
+        if len(sample) > HISTOGRAM_SAMPLE_SIZE:
+            keep = np.argpartition(sample_keys, HISTOGRAM_SAMPLE_SIZE)[:HISTOGRAM_SAMPLE_SIZE]
+            sample, sample_keys = sample[keep], sample_keys[keep]
+        self.sample, self.sample_keys = sample, sample_keys
+
+    def distinct_count(self) -> int:
+        if len(self.hashes) < DISTINCT_SKETCH_SIZE:
+            return len(self.hashes)
+        kth_hash = float(self.hashes[-1]) / float(2 ** 64)
+        return int(round((DISTINCT_SKETCH_SIZE - 1) / kth_hash))
+
+    def histogram(self) -> Optional[List[Dict[str, Any]]]:
+        if self.kind not in ("numeric", "datetime") or not len(self.sample):
+            return None
+        non_null = self.row_count - self.null_count
+        counts, edges = np.histogram(self.sample, bins=HISTOGRAM_BINS,
+                                     range=(float(np.min(self.sample)), float(np.max(self.sample))))
+        # Scale sampled counts back up to the whole column
+        scale = non_null / len(self.sample)
+        if self.kind == "datetime":
+            edges = [pd.Timestamp(int(edge)) for edge in edges]
+        return [{"lower": _to_json_value(edges[i]), "upper": _to_json_value(edges[i + 1]),
+                 "count": int(round(count * scale))} for i, count in enumerate(counts)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "column_name": self.name,
+            "data_type": self.kind,
+            "row_count": self.row_count,
+            "null_count": self.null_count,
+            "distinct_count": self.distinct_count(),
+            "min_value": _to_json_value(self.min),
+            "max_value": _to_json_value(self.max),
+            # Values seen once aren't "top" values, this keeps keys and timestamps out
+            "top_values": [{"value": _to_json_value(value), "count": int(count)}
+                           for value, count in self.top_values.most_common(TOP_K) if count > 1],
+            "histogram": self.histogram(),
+        }
+
+
+class ColumnStatsCollector:
+    """
+    Builds per-column statistics of a table while it is loaded in chunks.
+
+    Distinct counts come from a K minimum values sketch and histograms from a
+    bounded uniform sample, so memory stays flat however large the table is.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = np.random.default_rng(seed)
+        self._columns: Dict[str, _ColumnState] = {}
+
+    def update(self, df: pd.DataFrame):
+        for name in df.columns:
+            state = self._columns.get(name)
+            if state is None:
+                state = self._columns[name] = _ColumnState(
+                    name, _column_kind(df[name].dtype), self._rng)
+            state.update(df[name])
+
+    def results(self) -> List[Dict[str, Any]]:
+        return [state.to_dict() for state in self._columns.values()]
+
+
+def describe_column_stats(column_statistics: List[Dict[str, Any]]) -> str:
+    """Compact text summary of column statistics for LLM prompts."""
+    lines = []
+    for stats in column_statistics:
+        parts = [f"{stats['column_name']} ({stats['data_type']})",
+                 f"rows={stats['row_count']}", f"nulls={stats['null_count']}",
+                 f"distinct~{stats['distinct_count']}"]
+        if stats.get("min_value") is not None:
+            parts.append(f"min={stats['min_value']}, max={stats['max_value']}")
+        if stats.get("top_values"):
+            top = ", ".join(f"{item['value']} ({item['count']})" for item in stats["top_values"][:5])
+            parts.append(f"top: {top}")
+        lines.append("- " + "; ".join(parts))
+    return "\n".join(lines)
@@ -4,7 +4,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api import api_router
 from app.api.middleware.auth_middleware import AuthMiddleware
 from app.api.db.models import init_db
-from app.dependencies.database import get_db
+from app.dependencies.database import db
+from app.config.db_config import engine_registry
+from app.config.embedding_config import embedding_service
+from app.utils.job_utils import ingestion_jobs
+from app.utils.reader_utils import shutdown_pdf_pool
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
@@ -41,7 +45,17 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     init_db()
-    db = next(get_db())
+    # Load the embedding model once, in the background so startup isn't blocked
+    embedding_service.preload()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    ingestion_jobs.shutdown()
+    embedding_service.shutdown()
+    shutdown_pdf_pool()
+    await db.dispose()
+    engine_registry.dispose()
 
 # Include API routes
 app.include_router(api_router)
@@ -66,18 +66,13 @@ export const DataBarChart: React.FC<{
   const dataKeys = data?.values ? Array.from(new Set(data?.values?.map(series => series.label))) : [];
 
   // Transform the data into the format Recharts expects
-  // const transformedData = data.labels.map((label, index) => ({
-  //   name: label,
-  //   ...data.values.reduce((acc, series) => ({
-  //     ...acc,
-  //     [series.label]: series.data[index]
-  //   }), {})
-  // }));
-
   const transformedData = data.labels.map((label, index) => ({
     name: label,
-    [data.values[index].label]: data.values[index].data
-  })) || [{}];
+    ...data.values.reduce((acc, series) => ({
+      ...acc,
+      [series.label]: series.data[index]
+    }), {})
+  }));
   
 
   // Calculate max label length for left margin in horizontal mode
@@ -21,6 +21,7 @@ const Steps: React.FC<StepsProps> = ({ processingMessages, isProcessing }) => {
           if(message?.query_result) return 
           if(message?.formatted_data_for_visualization) return 
           if(message?.answer) return 
+          if(message?.source_documents) return 
 
           return (
             <div
@@ -36,12 +37,24 @@ const Steps: React.FC<StepsProps> = ({ processingMessages, isProcessing }) => {
                   <p className='text-gray-700'>SQL Query generated 🎉</p>
                 </div>
                 :
+                // Fixer steps carry their attempt count, local validation steps don't
+                (('sql_valid' in message) && ("sql_query" in message) && ('repair_attempts' in message))?
+                <div>
+                  <ChatTyping content={"Corrected SQL query generated 🔧"}/>
+                  <SQLCode sqlCode={message?.sql_query}/>
+                </div>
+                :
                 (('sql_valid' in message) && ("sql_query" in message))?
                 <div>
-                  <ChatTyping content={message.sql_query?"SQL Query validated ✅":"SQL Query validation failed ❌. Valid SQL query generated"}/>
+                  <ChatTyping content={message.sql_valid?"SQL Query validated ✅":"SQL Query failed validation ❌"}/>
+                  {!message.sql_valid && message?.sql_issues &&
+                    <p className='text-gray-700 whitespace-pre-wrap'>{message.sql_issues}</p>}
                   <SQLCode sqlCode={message?.sql_query}/>
                 </div>
                 :
+                message?.partial_answer ?
+                <p className='text-gray-700 whitespace-pre-wrap'>{message.partial_answer}</p>
+                :
                 message?.recommended_visualization ?
                 <div className='text-gray-700'>
                   <p> Recommended visualization : <strong className='text-blue-600 font-bold uppercase'>{message?.recommended_visualization}</strong></p>
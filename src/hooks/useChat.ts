@@ -7,7 +7,7 @@ import { AxiosError } from 'axios';
 import { ApiResponse } from "../interfaces/globalInterfaces";
 import { askQuestion, getConversationHistory, getConversations, initiateConversation } from '../zustand/apis/chatApi';
 import { toast } from 'react-toastify';
-import { parseData } from '../utils/utils';
+import { mergeTokenEvents, parseData } from '../utils/utils';
 import chatStore from '../zustand/stores/chatStore';
 
 interface ErrorResponse {
@@ -101,7 +101,7 @@ export const useStreamChat = (options?: UseStreamChatOptions) => {
         (chunks: any) => {
           console.log(chunks);
           const parsedChunk = parseData(chunks);
-          options?.onStreamData?.(parsedChunk);
+          options?.onStreamData?.(mergeTokenEvents(parsedChunk));
         }
       );
     },
@@ -64,8 +64,8 @@ export const useUploadSpreadsheetMutation = () => {
       toast.success(response.message)
     },
     onError: (error) => {
-      console.log(error.response?.data.message);
-      toast.error(error.response?.data.message)
+      console.log(error.response?.data.message ?? error.message);
+      toast.error(error.response?.data.message ?? error.message)
     },
   });
 }
@@ -86,8 +86,8 @@ export const useUploadDocumentMutation = () => {
       toast.success(response.message)
     },
     onError: (error) => {
-      console.log(error.response?.data.message);
-      toast.error(error.response?.data.message)
+      console.log(error.response?.data.message ?? error.message);
+      toast.error(error.response?.data.message ?? error.message)
     },
   });
 }
@@ -41,8 +41,12 @@ export interface ProcessingMessage {
   parsed_question?: { is_relevant: boolean; relevant_tables: TableInfo[] };
   sql_query?: string;
   sql_valid?: boolean;
+  sql_issues?: string;
+  repair_attempts?: number;
   query_result?: string;
   answer?: string;
+  partial_answer?: string;
+  source_documents?: any[];
   recommended_visualization?: string;
   reason?: string;
   formatted_data_for_visualization?: FormattedData[];
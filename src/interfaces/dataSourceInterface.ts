@@ -33,9 +33,27 @@ export interface GetDataSourcesResponse {
 export interface UploadSpreadSheetResponse {
   table_name: string,
   rows_processed: number,
+  rows_per_second?: number,
   data_source_id: number
 }
 
+export interface IngestionJob {
+  job_id: string,
+  kind: 'spreadsheet' | 'document',
+  file_name: string,
+  phase: 'queued' | 'parsing' | 'loading' | 'embedding' | 'registering' | 'completed' | 'failed',
+  rows_processed: number,
+  chunks_processed: number,
+  rows_per_second: number | null,
+  error: string | null,
+  table_name?: string,
+  data_source_id?: number,
+  deduplicated?: boolean,
+  memory_before_bytes?: number,
+  memory_after_bytes?: number,
+  column_types?: Record<string, string>
+}
+
 export interface GetTablesList {
   db_url: string
 }
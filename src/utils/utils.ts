@@ -113,6 +113,24 @@ export function parseData(input: string): any[] {
   }).filter(Boolean); // Remove any null results
 }
 
+// Fold streamed answer tokens into a single partial answer entry, in place of the first token
+export function mergeTokenEvents(events: any[]): any[] {
+  const merged: any[] = [];
+  let partial: { partial_answer: string } | null = null;
+  events.forEach((event) => {
+    if (typeof event?.token === 'string') {
+      if (!partial) {
+        partial = { partial_answer: '' };
+        merged.push(partial);
+      }
+      partial.partial_answer += event.token;
+    } else {
+      merged.push(event);
+    }
+  });
+  return merged;
+}
+
 interface SQLQueryObject {
   sql_query: string;
   sql_valid?: boolean;  // Optional since not all objects have this
@@ -3,6 +3,7 @@ import { get, post, del } from './apiClient';
 import {
   GetDataSourcesResponse,
   UploadSpreadSheetResponse,
+  IngestionJob,
   AddDataSource,
   AddDataSourceResponse,
   GetTablesList,
@@ -13,6 +14,32 @@ import { ApiResponse } from '../../interfaces/globalInterfaces';
 
 type ApiFunction<TInput, TOutput> = (data: TInput) => Promise<ApiResponse<TOutput>>;
 
+const JOB_POLL_INTERVAL_MS = 1000;
+
+// Uploads are processed in the background, poll the job until it finishes
+const waitForIngestionJob = async (
+  accepted: ApiResponse<IngestionJob>
+): Promise<ApiResponse<UploadSpreadSheetResponse>> => {
+  let job = accepted.data;
+  while (job.phase !== 'completed' && job.phase !== 'failed') {
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    job = (await get<ApiResponse<IngestionJob>>(DATA_SOURCE_ENDPOINTS.INGESTION_JOB(job.job_id))).data;
+  }
+  if (job.phase === 'failed') {
+    throw new Error(job.error || 'Failed to process the uploaded file');
+  }
+  return {
+    status_code: 201,
+    message: 'Data uploaded successfully',
+    data: {
+      table_name: job.table_name as string,
+      rows_processed: job.rows_processed,
+      rows_per_second: job.rows_per_second ?? undefined,
+      data_source_id: job.data_source_id as number
+    }
+  };
+};
+
 export const suggestQuestions: ApiFunction<number, SuggestQuestionsResponse> = async (source_id) => {
   return await get(DATA_SOURCE_ENDPOINTS.SUGGEST_QUESTIONS(source_id));
 };
@@ -21,14 +48,14 @@ export const uploadSpreadsheet: ApiFunction<File, UploadSpreadSheetResponse> = a
   const formData = new FormData();
   formData.append('file', file);
   formData.append('table_name', file.name.split('.')[0]);
-  return await post(DATA_SOURCE_ENDPOINTS.UPLOAD_SPREADSHEET, formData);
+  return await waitForIngestionJob(await post(DATA_SOURCE_ENDPOINTS.UPLOAD_SPREADSHEET, formData));
 }
 
 
 export const uploadDocument: ApiFunction<File, UploadSpreadSheetResponse> = async (file) => {
   const formData = new FormData();
   formData.append('file', file);
-  return await post(DATA_SOURCE_ENDPOINTS.UPLOAD_DOCUMENT, formData);
+  return await waitForIngestionJob(await post(DATA_SOURCE_ENDPOINTS.UPLOAD_DOCUMENT, formData));
 };
 
 export const addDataSource: ApiFunction<AddDataSource, AddDataSourceResponse> = async (data) => {
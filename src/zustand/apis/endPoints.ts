@@ -22,4 +22,5 @@ export const DATA_SOURCE_ENDPOINTS = {
   SUGGEST_QUESTIONS: (source_id: number) => `${API_BASE_URL}/data/v1/suggest-questions/${source_id}`,
   DELETE_DATA_SOURCE: (source_id: number) => `${API_BASE_URL}/data/v1/delete-data-source/${source_id}`,
   ANALYZE_HEALTH: (source_id: number) => `${API_BASE_URL}/data/v1/analyze-health/${source_id}`,
+  INGESTION_JOB: (job_id: string) => `${API_BASE_URL}/data/v1/ingestion-jobs/${job_id}`,
 };
\ No newline at end of file